@@ -0,0 +1,149 @@
+"""Online, non-blocking SQLite backups for CryptoLockerBot.
+
+Snapshots are produced with the SQLite incremental backup API: a few pages
+are copied per step and the source lock is released between steps, so the
+bot keeps serving reads and writes while a backup runs. The copy runs on a
+worker thread, keeping the event loop free.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PAGES_PER_STEP = 256
+DEFAULT_STEP_SLEEP = 0.005
+DEFAULT_KEEP = 7
+DEFAULT_INTERVAL = 24 * 60 * 60.0
+_PREFIX = "cryptolocker-"
+_SUFFIX = ".db"
+
+
+@dataclass(slots=True)
+class BackupStats:
+    """Metrics about completed backups."""
+
+    completed: int = 0
+    failures: int = 0
+    last_duration: float = 0.0
+    last_size: int = 0
+    last_path: Optional[Path] = None
+
+
+def _copy_database(source_path: str, target_path: Path, pages: int, sleep: float) -> None:
+    # as_uri() percent-encodes characters such as "?" and "#" in the path.
+    source = sqlite3.connect(Path(source_path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target, pages=pages, sleep=sleep)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+
+class BackupManager:
+    """Take rotated online snapshots of a database file on a schedule."""
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        backup_dir: str | Path,
+        *,
+        pages_per_step: int = DEFAULT_PAGES_PER_STEP,
+        step_sleep: float = DEFAULT_STEP_SLEEP,
+        keep: int = DEFAULT_KEEP,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        if pages_per_step < 1:
+            raise ValueError("pages_per_step must be positive")
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        self.db_path = str(Path(db_path).expanduser())
+        self.backup_dir = Path(backup_dir).expanduser()
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.keep = keep
+        self.interval = interval
+        self.stats = BackupStats()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def snapshots(self) -> List[Path]:
+        """Existing snapshots, oldest first."""
+        if not self.backup_dir.exists():
+            return []
+        return sorted(self.backup_dir.glob(f"{_PREFIX}*{_SUFFIX}"))
+
+    def _rotate(self) -> None:
+        snapshots = self.snapshots()
+        for stale in snapshots[: max(0, len(snapshots) - self.keep)]:
+            stale.unlink(missing_ok=True)
+
+    async def run_once(self) -> Path:
+        """Write one consistent snapshot and prune old ones."""
+        async with self._lock:
+            self.backup_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")
+            final = self.backup_dir / f"{_PREFIX}{stamp}{_SUFFIX}"
+            partial = final.with_suffix(".partial")
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(_copy_database, self.db_path, partial, self.pages_per_step, self.step_sleep)
+                partial.chmod(0o600)
+                partial.replace(final)
+            except Exception:
+                self.stats.failures += 1
+                partial.unlink(missing_ok=True)
+                raise
+            self.stats.completed += 1
+            self.stats.last_duration = time.perf_counter() - started
+            self.stats.last_size = final.stat().st_size
+            self.stats.last_path = final
+            self._rotate()
+            _LOGGER.info(
+                "Backup written to %s (%d bytes in %.2f s)",
+                final,
+                self.stats.last_size,
+                self.stats.last_duration,
+            )
+            return final
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                _LOGGER.exception("Scheduled backup failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="db-backup")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+__all__ = [
+    "BackupManager",
+    "BackupStats",
+    "DEFAULT_INTERVAL",
+    "DEFAULT_KEEP",
+    "DEFAULT_PAGES_PER_STEP",
+]
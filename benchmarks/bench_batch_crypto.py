@@ -0,0 +1,90 @@
+"""Throughput and event-loop stalls of bulk decryption strategies.
+
+Decrypts the same batch of sealed records inline on the event loop, in one
+``asyncio.to_thread`` call, and with :func:`crypto.decrypt_bytes_many` on
+pools of several sizes. A ticker task measures the longest event-loop stall
+while each runs, which is what interactive handlers would see.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_batch_crypto.py [--count 20000] [--backend aes-256-gcm]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import secrets
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from crypto import (
+    CIPHER_BACKENDS,
+    DEFAULT_CIPHER,
+    build_context,
+    decrypt_bytes,
+    decrypt_bytes_many,
+    encrypt_many,
+)
+from records import SecretRecord, pack_record
+
+
+async def _ticker(stalls: list[float], stop: asyncio.Event) -> None:
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        stalls.append(now - last)
+        last = now
+
+
+async def _measure(label: str, run) -> None:
+    stalls: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stalls, stop))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    count = len(await run())
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    print(f"{label:>21}: {count / elapsed:>9,.0f}/s, longest loop stall {max(stalls) * 1000:7.1f} ms")
+
+
+async def run(count: int, backend: str) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        salt_path = os.path.join(tmp, "salt")
+        with open(salt_path, "wb") as fh:
+            fh.write(secrets.token_bytes(16))
+        context = build_context("benchmark-passphrase", salt_path, backend=backend)
+    plaintext = pack_record(SecretRecord("someone@example.com", secrets.token_urlsafe(24), {"notes": "x" * 200}))
+    ciphertexts = await encrypt_many([plaintext] * count, context)
+
+    async def inline():
+        return [decrypt_bytes(value, context) for value in ciphertexts]
+
+    async def one_thread():
+        return await asyncio.to_thread(lambda: [decrypt_bytes(value, context) for value in ciphertexts])
+
+    print(f"{count:,} records, {backend}")
+    await _measure("inline", inline)
+    await _measure("to_thread", one_thread)
+    for workers in (1, 2, 4):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            await _measure(
+                f"decrypt_bytes_many x{workers}",
+                lambda: decrypt_bytes_many(ciphertexts, context, executor=executor),
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--backend", choices=CIPHER_BACKENDS, default=DEFAULT_CIPHER)
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.backend))
+
+
+if __name__ == "__main__":
+    main()
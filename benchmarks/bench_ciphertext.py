@@ -0,0 +1,71 @@
+"""Compare stored size and throughput of each cipher backend.
+
+AES-256-GCM and ChaCha20-Poly1305 are measured against compact (raw
+binary) and base64 Fernet tokens, for a short field and a full record.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_ciphertext.py [--rounds 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import os
+import secrets
+import tempfile
+import time
+
+from crypto import CIPHER_AES_GCM, CIPHER_CHACHA20, CIPHER_FERNET, build_context, decrypt_bytes, encrypt
+from records import SecretRecord, pack_record
+
+SAMPLES = {
+    "password": secrets.token_urlsafe(24).encode(),
+    "record": pack_record(
+        SecretRecord(
+            username="someone@example.com",
+            password=secrets.token_urlsafe(24),
+            extra={"url": "https://example.com/login", "notes": "x" * 200},
+        )
+    ),
+}
+
+
+def _measure(label: str, context, plaintext: bytes, rounds: int) -> None:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        ciphertext = encrypt(plaintext, context)
+    encrypt_rate = rounds / (time.perf_counter() - started)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        decrypt_bytes(ciphertext, context)
+    decrypt_rate = rounds / (time.perf_counter() - started)
+    print(
+        f"  {label:>17}: {len(ciphertext):>4} bytes (+{len(ciphertext) - len(plaintext)}), "
+        f"encrypt {encrypt_rate:>9,.0f}/s, decrypt {decrypt_rate:>9,.0f}/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        salt_path = os.path.join(tmp, "salt")
+        with open(salt_path, "wb") as fh:
+            fh.write(secrets.token_bytes(16))
+        gcm = build_context("benchmark-passphrase", salt_path, backend=CIPHER_AES_GCM)
+    contexts = {
+        CIPHER_AES_GCM: gcm,
+        CIPHER_CHACHA20: dataclasses.replace(gcm, backend=CIPHER_CHACHA20),
+        "fernet (compact)": dataclasses.replace(gcm, backend=CIPHER_FERNET),
+        "fernet (base64)": dataclasses.replace(gcm, backend=CIPHER_FERNET, key=None),
+    }
+    for field, plaintext in SAMPLES.items():
+        print(f"{field} ({len(plaintext)} bytes)")
+        for label, context in contexts.items():
+            _measure(label, context, plaintext, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
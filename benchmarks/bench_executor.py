@@ -0,0 +1,157 @@
+"""Compare the thread-worker connection pool with the previous aiosqlite pool.
+
+Both sides keep the same long-lived connections (one writer, ``--readers``
+readers, ``balanced`` profile) and run the same statements; the baseline
+drives them through aiosqlite's per-call cursor API, as ``db.py`` did
+before, while the current side runs each operation in one hop on its
+worker thread. Requires ``pip install aiosqlite`` for the baseline.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_executor.py [--ops 2000] [--concurrency 8]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiosqlite
+
+from db import SCHEMA, SQLITE_PROFILES, ConnectionPool, apply_migrations
+
+OWNER_ID = 1
+SECRET = os.urandom(120)
+INSERT_SQL = (
+    "INSERT INTO accounts (owner_id, name, username, password, record, created_at, updated_at) "
+    "VALUES (?, ?, X'', X'', ?, 0, 0)"
+)
+SELECT_SQL = "SELECT id, owner_id, name, record FROM accounts WHERE id=? AND owner_id=?"
+PROFILE = "balanced"
+
+
+class AiosqlitePool:
+    """The pre-worker pool: persistent aiosqlite connections, queue + lock."""
+
+    def __init__(self, db_path: str, readers: int):
+        self.db_path = db_path
+        self.size = readers
+        self.readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self.writer: aiosqlite.Connection
+        self.lock = asyncio.Lock()
+        self.all: list[aiosqlite.Connection] = []
+
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        for pragma, value in SQLITE_PROFILES[PROFILE].items():
+            await conn.execute(f"PRAGMA {pragma}={value}")
+        self.all.append(conn)
+        return conn
+
+    async def open(self) -> None:
+        self.writer = await self._connect()
+        for _ in range(self.size):
+            self.readers.put_nowait(await self._connect())
+
+    async def close(self) -> None:
+        for conn in self.all:
+            await conn.close()
+
+    async def insert(self, index: int) -> int:
+        async with self.lock:
+            cursor = await self.writer.execute(INSERT_SQL, (OWNER_ID, f"Site {index}", SECRET))
+            await self.writer.commit()
+            return cursor.lastrowid
+
+    async def get(self, account_id: int) -> object:
+        conn = await self.readers.get()
+        try:
+            async with conn.execute(SELECT_SQL, (account_id, OWNER_ID)) as cursor:
+                return await cursor.fetchone()
+        finally:
+            self.readers.put_nowait(conn)
+
+
+def _insert(conn, index: int) -> int:
+    cursor = conn.execute(INSERT_SQL, (OWNER_ID, f"Site {index}", SECRET))
+    conn.commit()
+    return cursor.lastrowid
+
+
+def _get(conn, account_id: int) -> object:
+    return conn.execute(SELECT_SQL, (account_id, OWNER_ID)).fetchone()
+
+
+class WorkerPool:
+    """The current pool: one hop per operation on a dedicated thread."""
+
+    def __init__(self, db_path: str, readers: int):
+        self.pool = ConnectionPool(db_path, size=readers, profile=PROFILE)
+
+    async def open(self) -> None:
+        await self.pool.open()
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    async def insert(self, index: int) -> int:
+        return await self.pool.write(_insert, index)
+
+    async def get(self, account_id: int) -> object:
+        return await self.pool.read(_get, account_id)
+
+
+def _prepare(db_path: str) -> None:
+    import sqlite3
+
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(SCHEMA)
+        apply_migrations(conn)
+        conn.execute("INSERT INTO users (telegram_id) VALUES (?)", (OWNER_ID,))
+
+
+async def _drive(op, count: int, concurrency: int) -> float:
+    counter = iter(range(1, count + 1))
+
+    async def worker() -> None:
+        for index in counter:
+            await op(index)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return count / (time.perf_counter() - started)
+
+
+async def bench(label: str, factory, ops: int, readers: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _prepare(db_path)
+        pool = factory(db_path, readers)
+        await pool.open()
+        try:
+            writes = await _drive(pool.insert, ops, concurrency)
+            reads = await _drive(pool.get, ops * 4, concurrency)
+        finally:
+            await pool.close()
+    print(f"{label:>9}: writes {writes:>9,.0f}/s | reads {reads:>9,.0f}/s")
+
+
+async def run(ops: int, readers: int, concurrency: int) -> None:
+    await bench("aiosqlite", AiosqlitePool, ops, readers, concurrency)
+    await bench("workers", WorkerPool, ops, readers, concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args.ops, args.readers, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure the latency/throughput tradeoff of each SQLite profile.
+
+Runs the bot's real account workload (single adds, edits, deletes, list
+and get) against a fresh database per profile.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_profiles.py [--ops 500]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from db import SQLITE_PROFILES, Database
+
+OWNER_ID = 1
+SECRET = os.urandom(120)
+
+
+async def _timed(samples: list[float], coro) -> object:
+    started = time.perf_counter()
+    result = await coro
+    samples.append(time.perf_counter() - started)
+    return result
+
+
+def _describe(label: str, samples: list[float]) -> str:
+    p50 = statistics.median(samples) * 1000
+    p99 = statistics.quantiles(samples, n=100)[98] * 1000 if len(samples) >= 100 else max(samples) * 1000
+    throughput = len(samples) / sum(samples)
+    return f"{label} p50 {p50:.3f} ms, p99 {p99:.3f} ms, {throughput:,.0f} ops/s"
+
+
+async def bench_profile(profile: str, ops: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(os.path.join(tmp, "bench.db"), profile=profile)
+        await database.init()
+        try:
+            await database.ensure_user(OWNER_ID)
+            writes: list[float] = []
+            reads: list[float] = []
+            ids = []
+            for index in range(ops):
+                ids.append(await _timed(writes, database.add_account(OWNER_ID, f"Site {index}", SECRET)))
+            for account_id in ids[: ops // 2]:
+                await _timed(writes, database.update_account_record(account_id, OWNER_ID, SECRET))
+            for account_id in ids:
+                await _timed(reads, database.get_account(account_id, OWNER_ID))
+                await _timed(reads, database.search_accounts(OWNER_ID, "Site 1"))
+            for account_id in ids[: ops // 4]:
+                await _timed(writes, database.delete_account(account_id, OWNER_ID))
+        finally:
+            await database.close()
+    print(f"{profile:>9}: {_describe('writes', writes)} | {_describe('reads', reads)}")
+
+
+async def run(ops: int) -> None:
+    for profile in SQLITE_PROFILES:
+        await bench_profile(profile, ops)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.ops))
+
+
+if __name__ == "__main__":
+    main()
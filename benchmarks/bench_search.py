@@ -0,0 +1,81 @@
+"""Compare FTS5 and LIKE account search at different vault sizes.
+
+Usage::
+
+    PYTHONPATH=. python benchmarks/bench_search.py [--sizes 10000 100000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import string
+import tempfile
+import time
+
+from db import Database
+
+OWNER_ID = 1
+QUERIES = ("mail", "bank", "vpn", "zzz")
+
+
+def _random_name(rng: random.Random) -> str:
+    stem = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+    return f"{rng.choice(('mail', 'bank', 'vpn', 'work', 'shop'))}-{stem}"
+
+
+def _populate(db_path: str, count: int) -> None:
+    rng = random.Random(count)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT OR IGNORE INTO users (telegram_id) VALUES (?)", (OWNER_ID,))
+        conn.executemany(
+            """
+            INSERT INTO accounts (owner_id, name, username, password, created_at, updated_at)
+            VALUES (?, ?, x'00', x'00', 0, 0)
+            """,
+            ((OWNER_ID, _random_name(rng)) for _ in range(count)),
+        )
+
+
+async def _time_search(database: Database, query: str, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await database.search_accounts(OWNER_ID, query)
+    return (time.perf_counter() - started) / rounds
+
+
+async def run(sizes: list[int], rounds: int) -> None:
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            database = Database(db_path)
+            await database.init()
+            await database.close()
+            _populate(db_path, size)
+            results: dict[str, dict[str, float]] = {}
+            for label, use_fts in (("fts5", True), ("like", False)):
+                database = Database(db_path, full_text_search=use_fts)
+                await database.init()
+                try:
+                    if use_fts and not database.fts_enabled:
+                        continue
+                    results[label] = {query: await _time_search(database, query, rounds) for query in QUERIES}
+                finally:
+                    await database.close()
+            for query in QUERIES:
+                summary = ", ".join(f"{label} {timings[query] * 1000:.2f} ms" for label, timings in results.items())
+                print(f"{size:>7} accounts, query {query!r:>7}: {summary}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,18 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import io
 import logging
 from logging.handlers import RotatingFileHandler
 import os
+import signal
+import tempfile
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from html import escape
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Collection, Dict, List, Optional, TypeVar
 
 from dotenv import load_dotenv
 from telegram import (
@@ -28,13 +32,62 @@ from telegram.ext import (
     filters,
 )
 
-from crypto import EncryptionContext, EncryptionError, build_context, decrypt, encrypt
-from db import Database
+from backup import DEFAULT_INTERVAL as DEFAULT_BACKUP_INTERVAL, DEFAULT_KEEP, DEFAULT_PAGES_PER_STEP, BackupManager
+from crypto import (
+    DEFAULT_CIPHER,
+    DEFAULT_CRYPTO_WORKERS,
+    EncryptionContext,
+    EncryptionError,
+    configure_crypto_executor,
+    stream_chunks,
+)
+from db import (
+    DEFAULT_ACQUIRE_TIMEOUT,
+    DEFAULT_GROUP_MAX_OPS,
+    DEFAULT_GROUP_WINDOW,
+    DEFAULT_LANG_CACHE_SIZE,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_PROFILE,
+    DEFAULT_SUMMARY_CACHE_ENTRIES,
+    Account,
+    AccountPage,
+    Database,
+)
+from exporter import ExportWriter
 from i18n import DEFAULT_LANG, SUPPORTED_LANGS, t
+from importer import ImportFormatError, ImportRecord, chunked, iter_records
+from maintenance import (
+    DEFAULT_CHECKPOINT_IDLE,
+    DEFAULT_CHECKPOINT_INTERVAL,
+    DEFAULT_VACUUM_IDLE,
+    DEFAULT_VACUUM_INTERVAL,
+    DEFAULT_VACUUM_STEP_PAGES,
+    DEFAULT_WAL_TRUNCATE_BYTES,
+    CheckpointScheduler,
+    VacuumScheduler,
+)
+from records import SecretRecord, needs_reseal, open_record, open_records, seal_record, seal_records
+from rotation import DEFAULT_ROTATION_BATCH_SIZE, DEFAULT_ROTATION_PAUSE, KeyRotation, pin_vault, unlock_vault
+from sharding import ShardedDatabase, adopt_unsharded, shard_paths
 
 LOGGER = logging.getLogger(__name__)
 STATE_TTL_SECONDS = 300
-MAX_ACCOUNTS_INLINE = 50
+ACCOUNTS_PAGE_SIZE = 20
+IMPORT_CHUNK_SIZE = 500
+MAX_IMPORT_BYTES = 20 * 1024 * 1024
+EXPORT_BATCH_SIZE = 200
+MIN_EXPORT_PASSWORD_LENGTH = 8
+MAX_MULTI_SHOW = 10
+PICK_MARK = "✅ "
+# purpose -> (callback prefix for entry buttons, prompt string key)
+LIST_PURPOSES: Dict[str, tuple[str, str]] = {
+    "remove": ("remove_confirm", "PROMPT_REMOVE"),
+    "edit": ("edit_select", "PROMPT_EDIT"),
+    "show": ("show", "PROMPT_SHOW"),
+    "search": ("show", "SEARCH_RESULTS"),
+    "recent": ("show", "PROMPT_RECENT"),
+    "pick": ("pick", "PROMPT_PICK"),
+}
 
 
 @dataclass
@@ -78,10 +131,16 @@ class StateManager:
 
 @dataclass
 class RuntimeContext:
-    db: Database
+    db: Database | ShardedDatabase
     encryption: EncryptionContext
     admin_id: int
     states: StateManager
+    searches: Dict[int, str] = field(default_factory=dict)
+    selections: Dict[int, set[int]] = field(default_factory=dict)
+    backups: List[BackupManager] = field(default_factory=list)
+    checkpoints: Optional[CheckpointScheduler] = None
+    vacuum: Optional[VacuumScheduler] = None
+    rotation: Optional[KeyRotation] = None
 
 
 def build_main_menu(lang: str) -> ReplyKeyboardMarkup:
@@ -89,7 +148,7 @@ def build_main_menu(lang: str) -> ReplyKeyboardMarkup:
         [
             [t(lang, "BTN_ADD"), t(lang, "BTN_SEARCH")],
             [t(lang, "BTN_REMOVE"), t(lang, "BTN_EDIT")],
-            [t(lang, "BTN_SHOW")],
+            [t(lang, "BTN_SHOW"), t(lang, "BTN_RECENT")],
         ],
         resize_keyboard=True,
         one_time_keyboard=False,
@@ -108,6 +167,10 @@ async def ensure_user(runtime: RuntimeContext, telegram_id: int) -> None:
     await runtime.db.ensure_user(telegram_id)
 
 
+async def ensure_user_lang(runtime: RuntimeContext, telegram_id: int) -> str:
+    return await runtime.db.ensure_user_and_get_lang(telegram_id)
+
+
 async def get_user_lang(runtime: RuntimeContext, telegram_id: int) -> str:
     try:
         return await runtime.db.get_user_lang(telegram_id)
@@ -125,8 +188,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not is_authorized(user.id, runtime):
         await update.message.reply_text(t(DEFAULT_LANG, "NOT_ADMIN"))
         return
-    await ensure_user(runtime, user.id)
-    lang = await get_user_lang(runtime, user.id)
+    lang = await ensure_user_lang(runtime, user.id)
     menu = build_main_menu(lang)
     text = f"{t(lang, 'WELCOME')}\n\n{t(lang, 'MENU_HINT')}"
     await update.message.reply_text(text, reply_markup=menu)
@@ -142,8 +204,7 @@ async def menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not is_authorized(user.id, runtime):
         await update.message.reply_text(t(DEFAULT_LANG, "NOT_ADMIN"))
         return
-    await ensure_user(runtime, user.id)
-    lang = await get_user_lang(runtime, user.id)
+    lang = await ensure_user_lang(runtime, user.id)
     menu_markup = build_main_menu(lang)
     await update.message.reply_text(t(lang, "MENU_HINT"), reply_markup=menu_markup)
 
@@ -191,8 +252,7 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     if not is_authorized(user.id, runtime):
         await message.reply_text(t(DEFAULT_LANG, "NOT_ADMIN"))
         return
-    await ensure_user(runtime, user.id)
-    lang = await get_user_lang(runtime, user.id)
+    lang = await ensure_user_lang(runtime, user.id)
     text = message.text.strip()
     state = runtime.states.get(user.id)
     if state:
@@ -212,6 +272,8 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         await send_account_list(update, context, lang, purpose="edit")
     elif text == t(lang, "BTN_SHOW"):
         await send_account_list(update, context, lang, purpose="show")
+    elif text == t(lang, "BTN_RECENT"):
+        await send_account_list(update, context, lang, purpose="recent")
     else:
         await message.reply_text(t(lang, "MENU_HINT"), reply_markup=build_main_menu(lang))
 
@@ -230,6 +292,8 @@ async def handle_stateful_message(update: Update, context: ContextTypes.DEFAULT_
         await process_search_query(runtime, message, user_id, text, lang)
     elif state.action == "edit_value":
         await handle_edit_value(runtime, message, state, user_id, text, lang)
+    elif state.action == "import":
+        await message.reply_text(t(lang, "ASK_IMPORT"))
     else:
         runtime.states.clear(user_id)
         await message.reply_text(t(lang, "ERR_GENERIC"))
@@ -260,10 +324,8 @@ async def handle_add_flow(runtime: RuntimeContext, message, state: UserState, us
         name = state.data["name"]
         username = state.data["username"]
         try:
-            enc = runtime.encryption
-            username_ct = encrypt(username, enc)
-            password_ct = encrypt(password, enc)
-            await runtime.db.add_account(user_id, name, username_ct, password_ct)
+            record = seal_record(SecretRecord(username=username, password=password), runtime.encryption)
+            await runtime.db.add_account(user_id, name, record)
             await message.reply_text(t(lang, "ADDED_SUCCESS", name=name))
             LOGGER.info("User %s added credential '%s'", user_id, name)
         except EncryptionError:
@@ -276,17 +338,69 @@ async def handle_add_flow(runtime: RuntimeContext, message, state: UserState, us
         await message.reply_text(t(lang, "ERR_GENERIC"))
 
 
+def build_page_markup(
+    page: AccountPage,
+    purpose: str,
+    lang: str,
+    *,
+    selected: Collection[int] = (),
+) -> InlineKeyboardMarkup:
+    callback_prefix, _ = LIST_PURPOSES[purpose]
+    buttons = [
+        [
+            InlineKeyboardButton(
+                text=f"{PICK_MARK}{entry.name}" if entry.id in selected else entry.name,
+                callback_data=f"{callback_prefix}|{entry.id}",
+            )
+        ]
+        for entry in page.items
+    ]
+    nav = []
+    if page.has_prev and page.items:
+        nav.append(InlineKeyboardButton(text=t(lang, "BTN_PREV"), callback_data=f"page|{purpose}|prev|{page.items[0].id}"))
+    if page.has_next and page.items:
+        nav.append(InlineKeyboardButton(text=t(lang, "BTN_NEXT"), callback_data=f"page|{purpose}|next|{page.items[-1].id}"))
+    if nav:
+        buttons.append(nav)
+    if purpose == "show":
+        buttons.append([InlineKeyboardButton(text=t(lang, "BTN_SELECT_MANY"), callback_data="pick_start")])
+    elif purpose == "pick":
+        buttons.append([_show_selected_button(len(selected), lang)])
+    return InlineKeyboardMarkup(buttons)
+
+
+def _show_selected_button(count: int, lang: str) -> InlineKeyboardButton:
+    return InlineKeyboardButton(
+        text=t(lang, "BTN_SHOW_SELECTED", count=count, limit=MAX_MULTI_SHOW),
+        callback_data="pick_show",
+    )
+
+
+async def fetch_page(
+    runtime: RuntimeContext,
+    user_id: int,
+    purpose: str,
+    *,
+    after: Optional[tuple[str, int]] = None,
+    before: Optional[tuple[str, int]] = None,
+) -> AccountPage:
+    if purpose == "recent":
+        # A single page, newest first, straight off the (owner_id, updated_at) index.
+        items = await runtime.db.list_recent_accounts(user_id, limit=ACCOUNTS_PAGE_SIZE)
+        return AccountPage(items=items, has_prev=False, has_next=False)
+    if purpose == "search":
+        query = runtime.searches.get(user_id, "")
+        return await runtime.db.search_accounts_page(user_id, query, after=after, before=before, limit=ACCOUNTS_PAGE_SIZE)
+    return await runtime.db.list_accounts_page(user_id, after=after, before=before, limit=ACCOUNTS_PAGE_SIZE)
+
+
 async def process_search_query(runtime: RuntimeContext, message, user_id: int, query: str, lang: str) -> None:
-    results = await runtime.db.search_accounts(user_id, query)
-    if not results:
+    runtime.searches[user_id] = query
+    page = await fetch_page(runtime, user_id, "search")
+    if not page.items:
         await message.reply_text(t(lang, "NO_MATCH", q=query))
         return
-    buttons = [
-        [InlineKeyboardButton(text=entry.name, callback_data=f"show|{entry.id}")]
-        for entry in results[:MAX_ACCOUNTS_INLINE]
-    ]
-    markup = InlineKeyboardMarkup(buttons)
-    await message.reply_text(t(lang, "SEARCH_RESULTS"), reply_markup=markup)
+    await message.reply_text(t(lang, "SEARCH_RESULTS"), reply_markup=build_page_markup(page, "search", lang))
 
 
 async def send_account_list(update: Update, context: ContextTypes.DEFAULT_TYPE, lang: str, *, purpose: str) -> None:
@@ -295,41 +409,53 @@ async def send_account_list(update: Update, context: ContextTypes.DEFAULT_TYPE,
     user = update.effective_user
     if not chat or not user:
         return
-    accounts = await runtime.db.list_accounts(user.id)
-    if not accounts:
+    page = await fetch_page(runtime, user.id, purpose)
+    if not page.items:
         await context.bot.send_message(chat.id, t(lang, "NO_ACCOUNTS"))
         return
-    if purpose == "remove":
-        callback_prefix = "remove_confirm"
-        prompt_key = "PROMPT_REMOVE"
-    elif purpose == "edit":
-        callback_prefix = "edit_select"
-        prompt_key = "PROMPT_EDIT"
-    else:
-        callback_prefix = "show"
-        prompt_key = "PROMPT_SHOW"
-    buttons = [
-        [InlineKeyboardButton(text=entry.name, callback_data=f"{callback_prefix}|{entry.id}")]
-        for entry in accounts[:MAX_ACCOUNTS_INLINE]
-    ]
-    markup = InlineKeyboardMarkup(buttons)
+    _, prompt_key = LIST_PURPOSES[purpose]
+    markup = build_page_markup(page, purpose, lang)
     await context.bot.send_message(chat.id, t(lang, prompt_key), reply_markup=markup)
 
 
+async def handle_page_callback(query, runtime: RuntimeContext, user_id: int, purpose: str, direction: str, anchor_raw: str, lang: str) -> None:
+    if purpose not in LIST_PURPOSES or direction not in {"prev", "next"} or not anchor_raw.isdigit():
+        await query.edit_message_text(t(lang, "ERR_GENERIC"))
+        return
+    anchor = await runtime.db.get_account_summary(int(anchor_raw), user_id)
+    if anchor is None:
+        # The anchor was removed meanwhile; restart from the first page.
+        page = await fetch_page(runtime, user_id, purpose)
+    elif direction == "next":
+        page = await fetch_page(runtime, user_id, purpose, after=(anchor.name, anchor.id))
+    else:
+        page = await fetch_page(runtime, user_id, purpose, before=(anchor.name, anchor.id))
+    if not page.items:
+        await query.edit_message_text(t(lang, "NO_ACCOUNTS"))
+        return
+    _, prompt_key = LIST_PURPOSES[purpose]
+    markup = build_page_markup(page, purpose, lang, selected=runtime.selections.get(user_id, ()))
+    await query.edit_message_text(t(lang, prompt_key), reply_markup=markup)
+
+
 async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     runtime = get_runtime(context)
     query = update.callback_query
     user = update.effective_user
     if not query or not user:
         return
-    await query.answer()
-    if not is_authorized(user.id, runtime):
+    payload = query.data or ""
+    parts = payload.split("|")
+    authorized = is_authorized(user.id, runtime)
+    # A callback query can be answered only once; selection toggles answer
+    # it themselves so they can report a full selection.
+    if parts[0] != "pick" or not authorized:
+        await query.answer()
+    if not authorized:
         await query.edit_message_text(t(DEFAULT_LANG, "NOT_ADMIN"))
         return
 
     lang = await get_user_lang(runtime, user.id)
-    payload = query.data or ""
-    parts = payload.split("|")
 
     if parts[0] == "show" and len(parts) == 2:
         await handle_show_callback(query, runtime, user.id, parts[1], lang)
@@ -337,6 +463,14 @@ async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await handle_remove_confirm(query, runtime, user.id, parts[1], lang)
     elif parts[0] == "remove_do" and len(parts) == 2:
         await handle_remove_do(query, runtime, user.id, parts[1], lang)
+    elif parts[0] == "pick_start":
+        await handle_pick_start(query, runtime, user.id, lang)
+    elif parts[0] == "pick" and len(parts) == 2:
+        await handle_pick_toggle(query, runtime, user.id, parts[1], lang)
+    elif parts[0] == "pick_show":
+        await handle_pick_show(query, runtime, user.id, lang)
+    elif parts[0] == "page" and len(parts) == 4:
+        await handle_page_callback(query, runtime, user.id, parts[1], parts[2], parts[3], lang)
     elif parts[0] == "cancel":
         await query.edit_message_text(t(lang, "MENU_HINT"))
     elif parts[0] == "edit_select" and len(parts) == 2:
@@ -363,20 +497,115 @@ async def handle_show_callback(query, runtime: RuntimeContext, user_id: int, acc
         await query.edit_message_text(t(lang, "ERR_GENERIC"))
         return
     try:
-        username = decrypt(account.username, runtime.encryption)
-        password = decrypt(account.password, runtime.encryption)
+        record = open_record(account, runtime.encryption)
     except EncryptionError:
         LOGGER.exception("Failed to decrypt account %s for user %s", account_id, user_id)
         await query.edit_message_text(t(lang, "ERR_GENERIC"))
         return
-    text = (
-        f"<b>{escape(account.name)}</b>\n"
-        f"<pre>Username: {escape(username)}\nPassword: {escape(password)}</pre>"
+    close_button = InlineKeyboardMarkup(
+        [[InlineKeyboardButton(text=t(lang, "BTN_CLOSE"), callback_data="close")]]
     )
+    await query.edit_message_text(
+        format_secret(account.name, record),
+        parse_mode=constants.ParseMode.HTML,
+        reply_markup=close_button,
+    )
+    await reseal_stale(runtime, user_id, [(account, record)])
+
+
+def format_secret(name: str, record: SecretRecord) -> str:
+    return (
+        f"<b>{escape(name)}</b>\n"
+        f"<pre>Username: {escape(record.username)}\nPassword: {escape(record.password)}</pre>"
+    )
+
+
+async def reseal_stale(runtime: RuntimeContext, user_id: int, opened: list[tuple[Account, SecretRecord]]) -> int:
+    """Re-encrypt just-read accounts that are stored in an older format.
+
+    Returns how many rows were rewritten; rows edited concurrently are skipped.
+    """
+    resealed = 0
+    for account, record in opened:
+        if needs_reseal(account, runtime.encryption):
+            sealed = seal_record(record, runtime.encryption)
+            resealed += await runtime.db.reseal_account(account.id, user_id, account.record, sealed)
+    return resealed
+
+
+def _pack_messages(blocks: list[str], limit: int = constants.MessageLimit.MAX_TEXT_LENGTH) -> list[str]:
+    messages: list[str] = []
+    for block in blocks:
+        if messages and len(messages[-1]) + 2 + len(block) <= limit:
+            messages[-1] += "\n\n" + block
+        else:
+            messages.append(block)
+    return messages
+
+
+async def handle_pick_start(query, runtime: RuntimeContext, user_id: int, lang: str) -> None:
+    runtime.selections[user_id] = set()
+    page = await fetch_page(runtime, user_id, "pick")
+    if not page.items:
+        await query.edit_message_text(t(lang, "NO_ACCOUNTS"))
+        return
+    await query.edit_message_text(t(lang, "PROMPT_PICK"), reply_markup=build_page_markup(page, "pick", lang))
+
+
+async def handle_pick_toggle(query, runtime: RuntimeContext, user_id: int, account_id_raw: str, lang: str) -> None:
+    if not account_id_raw.isdigit() or query.message is None or query.message.reply_markup is None:
+        await query.answer()
+        await query.edit_message_text(t(lang, "ERR_GENERIC"))
+        return
+    account_id = int(account_id_raw)
+    selected = runtime.selections.setdefault(user_id, set())
+    if account_id in selected:
+        selected.discard(account_id)
+    elif len(selected) < MAX_MULTI_SHOW:
+        selected.add(account_id)
+    else:
+        await query.answer(t(lang, "PICK_LIMIT"), show_alert=False)
+        return
+    await query.answer()
+    # Only the tapped entry's mark and the counter change, so patch the
+    # current keyboard instead of re-querying the page.
+    rows = []
+    for row in query.message.reply_markup.inline_keyboard:
+        button = row[0]
+        if button.callback_data == f"pick|{account_id}":
+            name = button.text.removeprefix(PICK_MARK)
+            row = [InlineKeyboardButton(text=f"{PICK_MARK}{name}" if account_id in selected else name, callback_data=button.callback_data)]
+        elif button.callback_data == "pick_show":
+            row = [_show_selected_button(len(selected), lang)]
+        rows.append(row)
+    await query.edit_message_reply_markup(reply_markup=InlineKeyboardMarkup(rows))
+
+
+async def handle_pick_show(query, runtime: RuntimeContext, user_id: int, lang: str) -> None:
+    selected = runtime.selections.pop(user_id, set())
+    if not selected:
+        await query.edit_message_text(t(lang, "PICK_EMPTY"))
+        return
+    accounts = await runtime.db.get_accounts(user_id, selected)
+    try:
+        records = await open_records(accounts, runtime.encryption)
+    except EncryptionError:
+        LOGGER.exception("Failed to decrypt selected accounts for user %s", user_id)
+        await query.edit_message_text(t(lang, "ERR_GENERIC"))
+        return
+    if not records:
+        await query.edit_message_text(t(lang, "ERR_GENERIC"))
+        return
+    accounts_and_records = sorted(zip(accounts, records), key=lambda pair: pair[0].name.casefold())
+    messages = _pack_messages([format_secret(account.name, record) for account, record in accounts_and_records])
     close_button = InlineKeyboardMarkup(
         [[InlineKeyboardButton(text=t(lang, "BTN_CLOSE"), callback_data="close")]]
     )
-    await query.edit_message_text(text, parse_mode=constants.ParseMode.HTML, reply_markup=close_button)
+    await query.edit_message_text(messages[0], parse_mode=constants.ParseMode.HTML, reply_markup=close_button)
+    for text in messages[1:]:
+        await query.message.reply_text(text, parse_mode=constants.ParseMode.HTML, reply_markup=close_button)
+    LOGGER.info("User %s displayed %d credentials", user_id, len(records))
+    await reseal_stale(runtime, user_id, accounts_and_records)
 
 
 async def handle_remove_confirm(query, runtime: RuntimeContext, user_id: int, account_id_raw: str, lang: str) -> None:
@@ -480,8 +709,12 @@ async def handle_edit_value(runtime: RuntimeContext, message, state: UserState,
         await message.reply_text(t(lang, "INVALID_CREDENTIAL"))
         return
     try:
-        ciphertext = encrypt(value, runtime.encryption)
-        updated = await runtime.db.update_account_field(account_id, user_id, field=field, value=ciphertext)
+        account = await runtime.db.get_account(account_id, user_id)
+        updated = False
+        if account is not None:
+            record = open_record(account, runtime.encryption)
+            setattr(record, field, value)
+            updated = await runtime.db.update_account_record(account_id, user_id, seal_record(record, runtime.encryption))
         if updated:
             runtime.states.clear(user_id)
             field_label = ("Username" if field == "username" else "Password")
@@ -501,6 +734,187 @@ async def handle_edit_value(runtime: RuntimeContext, message, state: UserState,
         await message.reply_text(t(lang, "ERR_GENERIC"))
 
 
+async def import_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    runtime = get_runtime(context)
+    user = update.effective_user
+    chat = update.effective_chat
+    if not user or not chat:
+        return
+    if not is_authorized(user.id, runtime):
+        await update.message.reply_text(t(DEFAULT_LANG, "NOT_ADMIN"))
+        return
+    lang = await ensure_user_lang(runtime, user.id)
+    runtime.states.set(user.id, action="import", step="await_file")
+    await update.message.reply_text(t(lang, "ASK_IMPORT"))
+
+
+def _prepare_import_chunk(chunks) -> Optional[tuple[list[str], list[SecretRecord], int]]:
+    """Parse and validate the next chunk; runs in a worker thread."""
+    chunk: Optional[list[ImportRecord]] = next(chunks, None)
+    if chunk is None:
+        return None
+    names = []
+    secrets = []
+    skipped = 0
+    for record in chunk:
+        if not _validate_name(record.name) or not _validate_secret(record.username) or not _validate_secret(record.password):
+            skipped += 1
+            continue
+        names.append(record.name)
+        secrets.append(SecretRecord(username=record.username, password=record.password))
+    return names, secrets, skipped
+
+
+async def import_records(runtime: RuntimeContext, user_id: int, records, status, lang: str) -> tuple[int, int]:
+    imported = 0
+    skipped = 0
+    chunks = chunked(records, IMPORT_CHUNK_SIZE)
+    while True:
+        prepared = await asyncio.to_thread(_prepare_import_chunk, chunks)
+        if prepared is None:
+            break
+        names, secrets, chunk_skipped = prepared
+        sealed = await seal_records(secrets, runtime.encryption)
+        imported += await runtime.db.add_accounts_bulk(user_id, zip(names, sealed))
+        skipped += chunk_skipped
+        try:
+            await status.edit_text(t(lang, "IMPORT_PROGRESS", count=imported))
+        except Exception:
+            LOGGER.debug("Failed to update import progress for user %s", user_id)
+    return imported, skipped
+
+
+async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    runtime = get_runtime(context)
+    message = update.message
+    user = update.effective_user
+    if not message or not message.document or not user:
+        return
+    if not is_authorized(user.id, runtime):
+        await message.reply_text(t(DEFAULT_LANG, "NOT_ADMIN"))
+        return
+    lang = await get_user_lang(runtime, user.id)
+    state = runtime.states.get(user.id)
+    if not state or state.action != "import":
+        await message.reply_text(t(lang, "MENU_HINT"), reply_markup=build_main_menu(lang))
+        return
+    runtime.states.clear(user.id)
+    document = message.document
+    if document.file_size and document.file_size > MAX_IMPORT_BYTES:
+        await message.reply_text(t(lang, "IMPORT_TOO_LARGE"))
+        return
+    status = await message.reply_text(t(lang, "IMPORT_STARTED"))
+    buffer = io.BytesIO()
+    tg_file = await document.get_file()
+    await tg_file.download_to_memory(buffer)
+    buffer.seek(0)
+    # The upload holds plaintext credentials; do not leave it in the chat.
+    try:
+        await message.delete()
+    except Exception:
+        LOGGER.debug("Failed to delete import file message for user %s", user.id)
+    try:
+        records = iter_records(buffer, document.file_name or "")
+        imported, skipped = await import_records(runtime, user.id, records, status, lang)
+    except (ImportFormatError, EncryptionError):
+        LOGGER.exception("Import failed for user %s", user.id)
+        await status.edit_text(t(lang, "IMPORT_FAILED"))
+        return
+    await status.edit_text(t(lang, "IMPORT_DONE", count=imported, skipped=skipped))
+    LOGGER.info("User %s imported %d credentials (%d skipped)", user.id, imported, skipped)
+
+
+def _open_for_export(accounts: list[Account], encryption: EncryptionContext) -> list[tuple[str, SecretRecord]]:
+    return [(account.name, open_record(account, encryption)) for account in accounts]
+
+
+def _write_export_batch(writer: ExportWriter, batch: list[tuple[str, SecretRecord]]) -> None:
+    for name, record in batch:
+        writer.write(name, record.username, record.password, record.extra)
+
+
+async def write_export(runtime: RuntimeContext, user_id: int, fh, password: str) -> int:
+    """Stream the user's vault into ``fh`` as an encrypted export archive.
+
+    Accounts are decrypted on the crypto pool while earlier batches are
+    being written, in vault order.
+    """
+    writer = await asyncio.to_thread(ExportWriter, fh, password, chunk_size=EXPORT_BATCH_SIZE)
+    batch: list[tuple[str, SecretRecord]] = []
+    opened = stream_chunks(
+        functools.partial(_open_for_export, encryption=runtime.encryption),
+        runtime.db.iter_accounts(user_id, batch_size=EXPORT_BATCH_SIZE),
+    )
+    async for entry in opened:
+        batch.append(entry)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            await asyncio.to_thread(_write_export_batch, writer, batch)
+            batch = []
+    if batch:
+        await asyncio.to_thread(_write_export_batch, writer, batch)
+    await asyncio.to_thread(writer.close)
+    return writer.count
+
+
+async def export_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    runtime = get_runtime(context)
+    message = update.message
+    user = update.effective_user
+    chat = update.effective_chat
+    if not message or not user or not chat:
+        return
+    if not is_authorized(user.id, runtime):
+        await message.reply_text(t(DEFAULT_LANG, "NOT_ADMIN"))
+        return
+    lang = await ensure_user_lang(runtime, user.id)
+    password = " ".join(context.args or []).strip()
+    if len(password) < MIN_EXPORT_PASSWORD_LENGTH:
+        await message.reply_text(t(lang, "EXPORT_USAGE"))
+        return
+    # The command text contains the archive password.
+    try:
+        await message.delete()
+    except Exception:
+        LOGGER.debug("Failed to delete export command for user %s", user.id)
+    status = await context.bot.send_message(chat.id, t(lang, "EXPORT_STARTED"))
+    fd, tmp_name = tempfile.mkstemp(prefix="cryptolocker-export-", suffix=".clexp")
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            count = await write_export(runtime, user.id, fh, password)
+        with tmp_path.open("rb") as fh:
+            await context.bot.send_document(
+                chat.id,
+                document=fh,
+                filename="cryptolocker-export.clexp",
+                caption=t(lang, "EXPORT_DONE", count=count),
+            )
+        await status.delete()
+        LOGGER.info("User %s exported %d credentials", user.id, count)
+    except EncryptionError:
+        LOGGER.exception("Export failed for user %s", user.id)
+        await status.edit_text(t(lang, "ERR_GENERIC"))
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+async def rebalance_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    runtime = get_runtime(context)
+    user = update.effective_user
+    if not user or not update.message:
+        return
+    if not is_authorized(user.id, runtime):
+        await update.message.reply_text(t(DEFAULT_LANG, "NOT_ADMIN"))
+        return
+    lang = await ensure_user_lang(runtime, user.id)
+    if not isinstance(runtime.db, ShardedDatabase):
+        await update.message.reply_text(t(lang, "REBALANCE_NOT_SHARDED"))
+        return
+    moved = await runtime.db.rebalance()
+    await update.message.reply_text(t(lang, "REBALANCE_DONE", owners=len(moved), accounts=sum(moved.values())))
+    LOGGER.info("Rebalanced %d owners across shards", len(moved))
+
+
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
     LOGGER.exception("Unhandled error while processing update: %s", update)
     if isinstance(update, Update):
@@ -552,31 +966,297 @@ def load_configuration() -> tuple[str, int, str, str, str]:
     return token, int(admin_id), db_path, salt_file, passphrase
 
 
-async def prepare_runtime(db_path: str, salt_file: str, passphrase: str, admin_id: int) -> RuntimeContext:
-    database = Database(db_path)
-    await database.init()
-    encryption = build_context(passphrase, salt_file)
-    return RuntimeContext(db=database, encryption=encryption, admin_id=admin_id, states=StateManager())
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    if not raw.isdigit():
+        raise RuntimeError(f"{name} must be numeric")
+    return int(raw)
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError as exc:
+        raise RuntimeError(f"{name} must be a number") from exc
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+T = TypeVar("T")
+
+
+async def timed_phase(timings: Dict[str, float], name: str, awaitable: Awaitable[T]) -> T:
+    """Await one startup phase, recording and logging how long it took."""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = time.perf_counter() - started
+        LOGGER.info("Startup phase '%s' took %.0f ms", name, timings[name] * 1000)
+
+
+async def prepare_runtime(
+    db_path: str,
+    salt_file: str,
+    passphrase: str,
+    admin_id: int,
+    *,
+    timings: Optional[Dict[str, float]] = None,
+) -> RuntimeContext:
+    """Open the database and derive the encryption key concurrently.
+
+    The vault key (and the previous one while a key rotation is due) is
+    derived in a worker thread, so schema checks and migrations proceed on
+    the event loop meanwhile. A new vault gets its key pinned and a pending
+    rotation is started in the background. Phase durations are stored in
+    ``timings``.
+    """
+    timings = {} if timings is None else timings
+    database_options = dict(
+        pool_size=_env_int("DB_POOL_SIZE", DEFAULT_POOL_SIZE),
+        acquire_timeout=_env_float("DB_ACQUIRE_TIMEOUT", DEFAULT_ACQUIRE_TIMEOUT),
+        group_commit=_env_bool("DB_GROUP_COMMIT", False),
+        group_window=_env_float("DB_GROUP_WINDOW_MS", DEFAULT_GROUP_WINDOW * 1000) / 1000,
+        group_max_ops=_env_int("DB_GROUP_MAX_OPS", DEFAULT_GROUP_MAX_OPS),
+        lang_cache_size=_env_int("DB_LANG_CACHE_SIZE", DEFAULT_LANG_CACHE_SIZE),
+        summary_cache_entries=_env_int("DB_SUMMARY_CACHE_ENTRIES", DEFAULT_SUMMARY_CACHE_ENTRIES),
+        profile=os.getenv("DB_PROFILE") or DEFAULT_PROFILE,
+    )
+    shards = _env_int("DB_SHARDS", 1)
+    if shards > 1:
+        database = ShardedDatabase(db_path, shards=shards, **database_options)
+        database_files = [str(path) for path in shard_paths(db_path, shards)]
+    else:
+        database = Database(db_path, **database_options)
+        database_files = [db_path]
+    configure_crypto_executor(_env_int("CRYPTO_WORKERS", DEFAULT_CRYPTO_WORKERS))
+    # The key derivation reads vault metadata from the first shard, so an
+    # unsharded database must become that shard before it starts.
+    await asyncio.to_thread(adopt_unsharded, db_path, shards)
+    unlock = functools.partial(
+        unlock_vault,
+        database_files[0],
+        passphrase,
+        salt_file,
+        backend=os.getenv("CIPHER") or DEFAULT_CIPHER,
+        previous_passphrase=os.getenv("PREVIOUS_ENCRYPTION_PASSPHRASE") or None,
+        previous_salt_file=os.getenv("PREVIOUS_KEY_DERIVATION_SALT_FILE") or None,
+    )
+    vault_key, database_ready = await asyncio.gather(
+        timed_phase(timings, "key derivation", asyncio.to_thread(unlock)),
+        timed_phase(timings, "database", database.init()),
+        return_exceptions=True,
+    )
+    for outcome in (vault_key, database_ready):
+        if isinstance(outcome, BaseException):
+            await database.close()
+            raise outcome
+    runtime: Optional[RuntimeContext] = None
+    try:
+        encryption = vault_key.context
+        if not vault_key.pinned:
+            # Pin the parameters the vault key was derived with, so a later
+            # change of defaults cannot lock existing secrets out.
+            await pin_vault(database, encryption)
+        runtime = RuntimeContext(db=database, encryption=encryption, admin_id=admin_id, states=StateManager())
+        runtime.checkpoints = CheckpointScheduler(
+            database,
+            interval=_env_float("WAL_CHECKPOINT_INTERVAL", DEFAULT_CHECKPOINT_INTERVAL),
+            idle_after=_env_float("WAL_CHECKPOINT_IDLE", DEFAULT_CHECKPOINT_IDLE),
+            truncate_bytes=_env_int("WAL_TRUNCATE_MB", DEFAULT_WAL_TRUNCATE_BYTES // (1024 * 1024)) * 1024 * 1024,
+        )
+        runtime.checkpoints.start()
+        runtime.vacuum = VacuumScheduler(
+            database,
+            interval=_env_float("VACUUM_INTERVAL", DEFAULT_VACUUM_INTERVAL),
+            idle_after=_env_float("VACUUM_IDLE", DEFAULT_VACUUM_IDLE),
+            step_pages=_env_int("VACUUM_STEP_PAGES", DEFAULT_VACUUM_STEP_PAGES),
+        )
+        runtime.vacuum.start()
+        if vault_key.rotating:
+            LOGGER.info("Vault key changed; re-encrypting stored secrets in the background")
+
+            def retire_previous_key() -> None:
+                runtime.encryption = replace(runtime.encryption, retired=())
+
+            runtime.rotation = KeyRotation(
+                database,
+                encryption,
+                batch_size=_env_int("ROTATION_BATCH_SIZE", DEFAULT_ROTATION_BATCH_SIZE),
+                pause=_env_float("ROTATION_PAUSE_MS", DEFAULT_ROTATION_PAUSE * 1000) / 1000,
+                on_complete=retire_previous_key,
+            )
+            runtime.rotation.start()
+        backup_dir = os.getenv("BACKUP_DIR")
+        if backup_dir:
+            for index, path in enumerate(database_files):
+                manager = BackupManager(
+                    path,
+                    Path(backup_dir) / f"shard{index}" if shards > 1 else backup_dir,
+                    pages_per_step=_env_int("BACKUP_PAGES_PER_STEP", DEFAULT_PAGES_PER_STEP),
+                    keep=_env_int("BACKUP_KEEP", DEFAULT_KEEP),
+                    interval=_env_float("BACKUP_INTERVAL_HOURS", DEFAULT_BACKUP_INTERVAL / 3600) * 3600,
+                )
+                manager.start()
+                runtime.backups.append(manager)
+    except BaseException:
+        # Leave nothing running against a database that is about to close.
+        if runtime is not None:
+            await _stop_background(runtime)
+        await database.close()
+        raise
+    return runtime
+
+
+async def _stop_background(runtime: RuntimeContext) -> None:
+    if runtime.rotation is not None:
+        await runtime.rotation.stop()
+    if runtime.checkpoints is not None:
+        await runtime.checkpoints.stop()
+    if runtime.vacuum is not None:
+        await runtime.vacuum.stop()
+    for manager in runtime.backups:
+        await manager.stop()
+
+
+async def shutdown_runtime(application: Application) -> None:
+    runtime: Optional[RuntimeContext] = application.bot_data.get("runtime")
+    if runtime is None:
+        return
+    stats = runtime.db.pool_stats()
+    LOGGER.info(
+        "DB pool: %d acquisitions, %d timeouts, %d busy retries, avg wait %.2f ms, max wait %.2f ms",
+        stats.acquisitions,
+        stats.timeouts,
+        stats.busy_retries,
+        stats.avg_wait * 1000,
+        stats.max_wait * 1000,
+    )
+    lang_stats = runtime.db.lang_cache_stats()
+    LOGGER.info(
+        "Language cache: %d hits, %d misses (%.0f%% hit ratio)",
+        lang_stats.hits,
+        lang_stats.misses,
+        lang_stats.hit_ratio * 100,
+    )
+    if runtime.rotation is not None:
+        await runtime.rotation.stop()
+        rotation_stats = runtime.rotation.stats
+        LOGGER.info(
+            "Key rotation: %d of %d scanned accounts re-encrypted, %d unreadable, %s",
+            rotation_stats.rotated,
+            rotation_stats.scanned,
+            rotation_stats.failed,
+            "complete" if rotation_stats.completed else "resumes on next start",
+        )
+    if runtime.checkpoints is not None:
+        await runtime.checkpoints.stop()
+        checkpoint_stats = runtime.checkpoints.stats
+        LOGGER.info(
+            "WAL checkpoints: %d passive, %d truncate, %d busy, last WAL %d bytes, last took %.1f ms",
+            checkpoint_stats.passive,
+            checkpoint_stats.truncates,
+            checkpoint_stats.busy,
+            checkpoint_stats.last_wal_size,
+            checkpoint_stats.last_duration * 1000,
+        )
+    if runtime.vacuum is not None:
+        await runtime.vacuum.stop()
+        vacuum_stats = runtime.vacuum.stats
+        LOGGER.info(
+            "Incremental vacuum: %d runs released %d pages, %d pages free",
+            vacuum_stats.runs,
+            vacuum_stats.pages_released,
+            vacuum_stats.free_pages,
+        )
+    for manager in runtime.backups:
+        await manager.stop()
+        backup_stats = manager.stats
+        LOGGER.info(
+            "Backups of %s: %d completed, %d failed, last %d bytes in %.2f s",
+            manager.db_path,
+            backup_stats.completed,
+            backup_stats.failures,
+            backup_stats.last_size,
+            backup_stats.last_duration,
+        )
+    await runtime.db.close()
+
+
+async def run_bot(application: Application, db_path: str, salt_file: str, passphrase: str, admin_id: int) -> None:
+    """Start the runtime and the Bot API session concurrently, then poll until signalled.
+
+    ``run_polling`` would only start our runtime after ``getMe`` returns;
+    driving the application lifecycle directly lets key derivation, database
+    init and the Bot API bootstrap overlap.
+    """
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    runtime_task = asyncio.create_task(
+        prepare_runtime(db_path, salt_file, passphrase, admin_id, timings=timings)
+    )
+    try:
+        await timed_phase(timings, "telegram", application.initialize())
+    except BaseException:
+        outcome = (await asyncio.gather(runtime_task, return_exceptions=True))[0]
+        if isinstance(outcome, RuntimeContext):
+            await _stop_background(outcome)
+            await outcome.db.close()
+        raise
+    try:
+        application.bot_data["runtime"] = await runtime_task
+        await application.start()
+        await application.updater.start_polling()
+        LOGGER.info(
+            "Ready to receive updates after %.0f ms (%s)",
+            (time.perf_counter() - started) * 1000,
+            ", ".join(f"{name} {elapsed * 1000:.0f} ms" for name, elapsed in timings.items()),
+        )
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        await stop.wait()
+    finally:
+        if application.updater.running:
+            await application.updater.stop()
+        if application.running:
+            await application.stop()
+        await shutdown_runtime(application)
+        await application.shutdown()
 
 
 def main() -> None:
     log_file = Path.home() / ".cryptolocker" / "cryptolocker.log"
     configure_logging(log_file)
     token, admin_id, db_path, salt_file, passphrase = load_configuration()
-    runtime = asyncio.run(prepare_runtime(db_path, salt_file, passphrase, admin_id))
+
     application = Application.builder().token(token).build()
-    application.bot_data["runtime"] = runtime
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("menu", menu))
     application.add_handler(CommandHandler("lang", change_language))
+    application.add_handler(CommandHandler("import", import_command))
+    application.add_handler(CommandHandler("export", export_command))
+    application.add_handler(CommandHandler("rebalance", rebalance_command))
     application.add_handler(CallbackQueryHandler(handle_callback))
+    application.add_handler(MessageHandler(filters.Document.ALL, handle_document))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
 
     application.add_error_handler(error_handler)
 
     LOGGER.info("Starting CryptoLockerBot")
-    application.run_polling()
+    asyncio.run(run_bot(application, db_path, salt_file, passphrase, admin_id))
 
 
 if __name__ == "__main__":
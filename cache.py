@@ -0,0 +1,94 @@
+"""Small in-process caches used by the database layer."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    weight: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """Bounded mapping that evicts the least recently used entry.
+
+    Besides the entry count, an optional ``max_weight`` caps the summed
+    weights passed to :meth:`put`, which lets callers bound memory for
+    values of varying size.
+    """
+
+    def __init__(self, max_size: int, *, max_weight: Optional[int] = None):
+        if max_size < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.max_size = max_size
+        self.max_weight = max_weight
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._weights: dict[K, int] = {}
+        self._total_weight = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self._misses += 1
+            return None
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def put(self, key: K, value: V, *, weight: int = 1) -> bool:
+        """Store ``value``; returns ``False`` if it alone exceeds ``max_weight``."""
+        self.pop(key)
+        if self.max_weight is not None and weight > self.max_weight:
+            return False
+        self._data[key] = value
+        self._weights[key] = weight
+        self._total_weight += weight
+        while len(self._data) > self.max_size or (
+            self.max_weight is not None and self._total_weight > self.max_weight
+        ):
+            evicted, _ = self._data.popitem(last=False)
+            self._total_weight -= self._weights.pop(evicted)
+            self._evictions += 1
+        return True
+
+    def pop(self, key: K) -> None:
+        if self._data.pop(key, None) is not None:
+            self._total_weight -= self._weights.pop(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._weights.clear()
+        self._total_weight = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._data),
+            weight=self._total_weight,
+        )
+
+
+__all__ = ["CacheStats", "LRUCache"]
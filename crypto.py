@@ -3,35 +3,165 @@
 This module derives per-installation encryption keys from a user-supplied
 passphrase and salt, then offers convenience wrappers for encrypting and
 decrypting sensitive values before they are persisted to disk.
+
+Keys are derived with PBKDF2-HMAC-SHA256, scrypt or Argon2id as described
+by a :class:`KdfParams`; ``kdf.py`` calibrates and stores those per vault.
+
+New values are sealed with the context's cipher backend: AES-256-GCM,
+ChaCha20-Poly1305 or Fernet. The leading byte of every ciphertext names
+its format, so :func:`decrypt` reads all of them whatever the backend.
 """
 from __future__ import annotations
 
+import asyncio
 import base64
+import json
 import logging
-from dataclasses import dataclass
+import os
+import struct
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Final
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
 
+from cryptography.exceptions import InvalidSignature, InvalidTag
 from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import hashes, padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.hmac import HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+except ImportError:  # pragma: no cover - cryptography < 44
+    Argon2id = None
 
 _LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 DEFAULT_ITERATIONS: Final[int] = 240_000
 _KEY_LENGTH: Final[int] = 32
 
+KDF_PBKDF2: Final[str] = "pbkdf2-sha256"
+KDF_SCRYPT: Final[str] = "scrypt"
+KDF_ARGON2ID: Final[str] = "argon2id"
+SCRYPT_BLOCK_SIZE: Final[int] = 8
+
+# Compact ciphertexts are Fernet tokens stored as raw bytes instead of
+# URL-safe base64: version (0x80) | timestamp (8) | IV (16) | AES-128-CBC
+# ciphertext | HMAC-SHA256 tag (32). Base64 tokens always start with "g",
+# so the leading byte tells the two formats apart.
+_FERNET_VERSION: Final[int] = 0x80
+_HEADER = struct.Struct(">BQ")
+_IV_LENGTH: Final[int] = 16
+_TAG_LENGTH: Final[int] = 32
+_MIN_COMPACT_LENGTH: Final[int] = _HEADER.size + _IV_LENGTH + 16 + _TAG_LENGTH
+
+CIPHER_FERNET: Final[str] = "fernet"
+CIPHER_AES_GCM: Final[str] = "aes-256-gcm"
+CIPHER_CHACHA20: Final[str] = "chacha20-poly1305"
+DEFAULT_CIPHER: Final[str] = CIPHER_AES_GCM
+
+# AEAD ciphertexts: format byte | nonce (12) | ciphertext | tag (16). The
+# format byte is authenticated as associated data. Each backend uses its own
+# HKDF subkey of the vault key, never the key itself.
+_AEAD_VERSIONS: Final[dict[str, int]] = {CIPHER_AES_GCM: 0x01, CIPHER_CHACHA20: 0x02}
+_AEAD_FORMATS: Final[dict[int, str]] = {version: name for name, version in _AEAD_VERSIONS.items()}
+_NONCE_LENGTH: Final[int] = 12
+_AEAD_TAG_LENGTH: Final[int] = 16
+
 
 class EncryptionError(Exception):
     """Raised when encryption or decryption fails."""
 
 
+@dataclass(frozen=True)
+class KdfParams:
+    """Key-derivation algorithm and cost parameters.
+
+    ``iterations`` is the PBKDF2 iteration count or the Argon2id time cost.
+    ``memory_kib`` is the Argon2id memory cost, or scrypt's ``n`` (with
+    ``r=8`` each unit of ``n`` costs exactly 1 KiB). ``parallelism`` maps to
+    scrypt ``p`` and Argon2id lanes.
+    """
+
+    algorithm: str = KDF_PBKDF2
+    iterations: int = DEFAULT_ITERATIONS
+    memory_kib: int = 0
+    parallelism: int = 1
+
+    def __post_init__(self) -> None:
+        if self.algorithm not in (KDF_PBKDF2, KDF_SCRYPT, KDF_ARGON2ID):
+            raise EncryptionError(f"Unknown key derivation algorithm: {self.algorithm}")
+        if self.algorithm == KDF_SCRYPT and (self.memory_kib < 2 or self.memory_kib & (self.memory_kib - 1)):
+            raise EncryptionError("scrypt memory_kib (n) must be a power of two")
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "KdfParams":
+        try:
+            return cls(**json.loads(raw))
+        except (TypeError, ValueError) as exc:
+            raise EncryptionError("Malformed key derivation parameters") from exc
+
+    def describe(self) -> str:
+        if self.algorithm == KDF_PBKDF2:
+            return f"PBKDF2-HMAC-SHA256, {self.iterations:,} iterations"
+        if self.algorithm == KDF_SCRYPT:
+            return f"scrypt, n={self.memory_kib} (r={SCRYPT_BLOCK_SIZE}, p={self.parallelism}, {self.memory_kib // 1024} MiB)"
+        return f"Argon2id, t={self.iterations}, m={self.memory_kib // 1024} MiB, lanes={self.parallelism}"
+
+
+DEFAULT_KDF: Final[KdfParams] = KdfParams()
+
+
+def available_kdfs() -> tuple[str, ...]:
+    """Algorithms usable with the installed ``cryptography`` build."""
+    if Argon2id is None:
+        return (KDF_PBKDF2, KDF_SCRYPT)
+    return (KDF_PBKDF2, KDF_SCRYPT, KDF_ARGON2ID)
+
+
 @dataclass(frozen=True)
 class EncryptionContext:
     """Immutable container for reusable encryption parameters."""
 
     cipher: Fernet
     iterations: int = DEFAULT_ITERATIONS
+    key: Optional[bytes] = None
+    """Raw 32-byte key; when set, :func:`encrypt` emits binary ciphertexts."""
+    kdf: KdfParams = field(default=DEFAULT_KDF)
+    backend: str = CIPHER_FERNET
+    """Cipher for new ciphertexts; AEAD backends require ``key``."""
+    retired: tuple["EncryptionContext", ...] = ()
+    """Previous keys still accepted by :func:`decrypt` during a key rotation."""
+    _aeads: Dict[int, Union[AESGCM, ChaCha20Poly1305]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    """AEAD instances for ``key``, keyed by format byte and derived on first use."""
 
 
 def _ensure_bytes(data: bytes | str, *, field: str) -> bytes:
@@ -60,57 +190,397 @@ def load_salt(salt_path: str | Path) -> bytes:
     return data
 
 
-def derive_key(passphrase: str, salt: bytes, *, iterations: int = DEFAULT_ITERATIONS) -> bytes:
-    """Derive a Fernet-compatible key using PBKDF2-HMAC(SHA256)."""
+def _kdf(params: KdfParams, salt: bytes):
+    if params.algorithm == KDF_SCRYPT:
+        return Scrypt(salt=salt, length=_KEY_LENGTH, n=params.memory_kib, r=SCRYPT_BLOCK_SIZE, p=params.parallelism)
+    if params.algorithm == KDF_ARGON2ID:
+        if Argon2id is None:
+            raise EncryptionError("Argon2id requires cryptography 44 or newer")
+        return Argon2id(
+            salt=salt,
+            length=_KEY_LENGTH,
+            iterations=params.iterations,
+            lanes=params.parallelism,
+            memory_cost=params.memory_kib,
+        )
+    return PBKDF2HMAC(algorithm=hashes.SHA256(), length=_KEY_LENGTH, salt=salt, iterations=params.iterations)
+
+
+def derive_key(
+    passphrase: str,
+    salt: bytes,
+    *,
+    iterations: int = DEFAULT_ITERATIONS,
+    kdf: Optional[KdfParams] = None,
+) -> bytes:
+    """Derive a Fernet-compatible key, by default using PBKDF2-HMAC(SHA256).
+
+    ``kdf`` selects another algorithm; when omitted, PBKDF2 runs with
+    ``iterations``.
+    """
     if not passphrase:
         raise EncryptionError("Passphrase is required to derive encryption key")
     passphrase_bytes = passphrase.encode("utf-8")
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=_KEY_LENGTH,
-        salt=salt,
-        iterations=iterations,
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(passphrase_bytes))
+    params = kdf if kdf is not None else KdfParams(iterations=iterations)
+    key = base64.urlsafe_b64encode(_kdf(params, salt).derive(passphrase_bytes))
     return key
 
 
-def build_context(passphrase: str, salt_path: str | Path, *, iterations: int = DEFAULT_ITERATIONS) -> EncryptionContext:
+def build_context(
+    passphrase: str,
+    salt_path: str | Path,
+    *,
+    iterations: int = DEFAULT_ITERATIONS,
+    kdf: Optional[KdfParams] = None,
+    backend: str = DEFAULT_CIPHER,
+) -> EncryptionContext:
     """Create an `EncryptionContext` from configuration values."""
+    if backend not in CIPHER_BACKENDS:
+        raise EncryptionError(f"Unknown cipher backend: {backend}")
     salt = load_salt(salt_path)
-    key = derive_key(passphrase, salt, iterations=iterations)
-    return EncryptionContext(cipher=Fernet(key), iterations=iterations)
+    params = kdf if kdf is not None else KdfParams(iterations=iterations)
+    key = derive_key(passphrase, salt, kdf=params)
+    return EncryptionContext(
+        cipher=Fernet(key),
+        iterations=params.iterations,
+        key=base64.urlsafe_b64decode(key),
+        kdf=params,
+        backend=backend,
+    )
+
+
+CIPHER_BACKENDS: Final[tuple[str, ...]] = (CIPHER_AES_GCM, CIPHER_CHACHA20, CIPHER_FERNET)
+
+
+def ciphertext_backend(ciphertext: bytes) -> str:
+    """Name of the backend that produced ``ciphertext``, from its leading byte."""
+    return _AEAD_FORMATS.get(ciphertext[0], CIPHER_FERNET) if ciphertext else CIPHER_FERNET
+
+
+def is_current(ciphertext: bytes, context: EncryptionContext) -> bool:
+    """Return whether ``ciphertext`` is in the format :func:`encrypt` now emits.
+
+    Anything else is still readable and gets rewritten when next touched.
+    """
+    if context.key is None:
+        return ciphertext_backend(ciphertext) == CIPHER_FERNET
+    if context.backend == CIPHER_FERNET:
+        return is_compact(ciphertext)
+    return ciphertext_backend(ciphertext) == context.backend
+
+
+def is_compact(ciphertext: bytes) -> bool:
+    """Return whether ``ciphertext`` uses the raw binary format."""
+    return bool(ciphertext) and ciphertext[0] == _FERNET_VERSION
+
+
+def _compact_encrypt(data: bytes, key: bytes) -> bytes:
+    signing_key, encryption_key = key[:16], key[16:]
+    iv = os.urandom(_IV_LENGTH)
+    padder = padding.PKCS7(algorithms.AES.block_size).padder()
+    padded = padder.update(data) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(encryption_key), modes.CBC(iv)).encryptor()
+    body = _HEADER.pack(_FERNET_VERSION, int(time.time())) + iv + encryptor.update(padded) + encryptor.finalize()
+    mac = HMAC(signing_key, hashes.SHA256())
+    mac.update(body)
+    return body + mac.finalize()
+
+
+def _compact_decrypt(blob: bytes, key: bytes) -> bytes:
+    if len(blob) < _MIN_COMPACT_LENGTH or (len(blob) - _MIN_COMPACT_LENGTH) % 16:
+        raise InvalidToken
+    signing_key, encryption_key = key[:16], key[16:]
+    body, tag = blob[:-_TAG_LENGTH], blob[-_TAG_LENGTH:]
+    mac = HMAC(signing_key, hashes.SHA256())
+    mac.update(body)
+    try:
+        mac.verify(tag)
+    except InvalidSignature as exc:
+        raise InvalidToken from exc
+    iv = body[_HEADER.size:_HEADER.size + _IV_LENGTH]
+    decryptor = Cipher(algorithms.AES(encryption_key), modes.CBC(iv)).decryptor()
+    padded = decryptor.update(body[_HEADER.size + _IV_LENGTH:]) + decryptor.finalize()
+    unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+    try:
+        return unpadder.update(padded) + unpadder.finalize()
+    except ValueError as exc:
+        raise InvalidToken from exc
+
+
+def _aead(context: EncryptionContext, version: int) -> Union[AESGCM, ChaCha20Poly1305]:
+    aead = context._aeads.get(version)
+    if aead is None:
+        name = _AEAD_FORMATS[version]
+        hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=f"cryptolocker {name}".encode())
+        subkey = hkdf.derive(context.key)
+        aead = AESGCM(subkey) if name == CIPHER_AES_GCM else ChaCha20Poly1305(subkey)
+        context._aeads[version] = aead
+    return aead
+
+
+def _aead_encrypt(data: bytes, context: EncryptionContext, version: int) -> bytes:
+    header = bytes((version,))
+    nonce = os.urandom(_NONCE_LENGTH)
+    return header + nonce + _aead(context, version).encrypt(nonce, data, header)
+
+
+def _aead_decrypt(blob: bytes, context: EncryptionContext) -> bytes:
+    if len(blob) < 1 + _NONCE_LENGTH + _AEAD_TAG_LENGTH:
+        raise InvalidToken
+    header, nonce = blob[:1], blob[1:1 + _NONCE_LENGTH]
+    try:
+        return _aead(context, blob[0]).decrypt(nonce, blob[1 + _NONCE_LENGTH:], header)
+    except InvalidTag as exc:
+        raise InvalidToken from exc
 
 
 def encrypt(plaintext: str | bytes, context: EncryptionContext) -> bytes:
-    """Encrypt plaintext, returning ciphertext bytes for storage."""
+    """Encrypt plaintext with the context's backend, returning bytes for storage."""
     try:
-        return context.cipher.encrypt(_ensure_bytes(plaintext, field="plaintext"))
+        data = _ensure_bytes(plaintext, field="plaintext")
+        if context.key is not None and context.backend in _AEAD_VERSIONS:
+            return _aead_encrypt(data, context, _AEAD_VERSIONS[context.backend])
+        if context.key is not None:
+            return _compact_encrypt(data, context.key)
+        return context.cipher.encrypt(data)
     except Exception as exc:  # pragma: no cover - cryptography internal errors are rare
         _LOGGER.error("Encryption failure: %s", exc)
         raise EncryptionError("Unable to encrypt data") from exc
 
 
-def decrypt(ciphertext: bytes | str, context: EncryptionContext) -> str:
-    """Decrypt ciphertext bytes and return the UTF-8 plaintext."""
+def _decrypt_with(blob: bytes, context: EncryptionContext) -> bytes:
+    if ciphertext_backend(blob) != CIPHER_FERNET:
+        if context.key is None:
+            raise EncryptionError("AEAD ciphertext requires the raw key")
+        return _aead_decrypt(blob, context)
+    if is_compact(blob) and context.key is not None:
+        return _compact_decrypt(blob, context.key)
+    if is_compact(blob):
+        return context.cipher.decrypt(base64.urlsafe_b64encode(blob))
+    return context.cipher.decrypt(blob)
+
+
+def decrypt_bytes(ciphertext: bytes | str, context: EncryptionContext) -> bytes:
+    """Decrypt AEAD, compact or base64 Fernet ciphertext and return the raw plaintext.
+
+    Like ``MultiFernet``, the context's retired keys are tried in order when
+    the current key does not match.
+    """
     try:
-        raw = context.cipher.decrypt(_ensure_bytes(ciphertext, field="ciphertext"))
-        return raw.decode("utf-8")
+        blob = _ensure_bytes(ciphertext, field="ciphertext")
+        try:
+            return _decrypt_with(blob, context)
+        except InvalidToken:
+            for retired in context.retired:
+                try:
+                    return _decrypt_with(blob, retired)
+                except InvalidToken:
+                    continue
+            raise
     except InvalidToken as exc:
         _LOGGER.warning("Invalid encryption token encountered")
         raise EncryptionError("Invalid encryption token") from exc
+    except EncryptionError:
+        raise
     except Exception as exc:  # pragma: no cover - cryptography internal errors are rare
         _LOGGER.error("Decryption failure: %s", exc)
         raise EncryptionError("Unable to decrypt data") from exc
 
 
+def decrypt(ciphertext: bytes | str, context: EncryptionContext) -> str:
+    """Decrypt any supported ciphertext and return the UTF-8 plaintext."""
+    raw = decrypt_bytes(ciphertext, context)
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise EncryptionError("Decrypted data is not valid UTF-8") from exc
+
+
+# -- batch API -----------------------------------------------------------
+#
+# Bulk paths (import, export, rotation, multi-show) hand whole iterables to a
+# shared thread pool in chunks. The cryptography primitives release the GIL,
+# so chunks run on several cores while the event loop keeps serving updates.
+
+DEFAULT_CHUNK_SIZE: Final[int] = 64
+DEFAULT_CRYPTO_WORKERS: Final[int] = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_PENDING: Final[int] = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def crypto_executor() -> ThreadPoolExecutor:
+    """The shared pool used when no executor is passed to the batch API."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DEFAULT_CRYPTO_WORKERS, thread_name_prefix="crypto")
+    return _executor
+
+
+def configure_crypto_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Replace the shared pool with one of ``max_workers`` threads."""
+    global _executor
+    previous, _executor = _executor, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crypto")
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _executor
+
+
+def _chunks(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _achunks(items: Iterable[T] | AsyncIterable[T], size: int) -> AsyncIterator[List[T]]:
+    if not isinstance(items, AsyncIterable):
+        for chunk in _chunks(items, size):
+            yield chunk
+        return
+    chunk: List[T] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def map_chunks(
+    fn: Callable[[List[T]], Sequence[R]],
+    items: Iterable[T],
+    *,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending: int = DEFAULT_MAX_PENDING,
+) -> List[R]:
+    """Run ``fn`` over ``chunk_size`` slices of ``items`` in parallel; results keep input order.
+
+    At most ``max_pending`` chunks are queued at once, which keeps the pool
+    from crowding out the event loop. The first exception raised by any
+    chunk is propagated.
+    """
+    return [
+        result
+        async for result in stream_chunks(fn, items, executor=executor, chunk_size=chunk_size, max_pending=max_pending)
+    ]
+
+
+async def stream_chunks(
+    fn: Callable[[List[T]], Sequence[R]],
+    items: Iterable[T] | AsyncIterable[T],
+    *,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending: int = DEFAULT_MAX_PENDING,
+) -> AsyncIterator[R]:
+    """Yield ``fn``'s results over ``chunk_size`` slices of ``items``, in input order.
+
+    ``items`` may be an async iterable. At most ``max_pending`` chunks are in
+    flight, so memory stays bounded however long the input is.
+    """
+    loop = asyncio.get_running_loop()
+    pool = executor if executor is not None else crypto_executor()
+    pending: deque[asyncio.Future] = deque()
+    try:
+        async for chunk in _achunks(items, chunk_size):
+            pending.append(loop.run_in_executor(pool, fn, chunk))
+            if len(pending) >= max_pending:
+                for result in await pending.popleft():
+                    yield result
+        while pending:
+            for result in await pending.popleft():
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _encrypt_chunk(chunk: List[str | bytes], context: EncryptionContext) -> List[bytes]:
+    return [encrypt(value, context) for value in chunk]
+
+
+def _decrypt_chunk(chunk: List[bytes | str], context: EncryptionContext) -> List[bytes]:
+    return [decrypt_bytes(value, context) for value in chunk]
+
+
+async def encrypt_many(
+    plaintexts: Iterable[str | bytes],
+    context: EncryptionContext,
+    *,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[bytes]:
+    """Encrypt many values on the crypto pool; same results as calling :func:`encrypt` on each."""
+    return await map_chunks(partial(_encrypt_chunk, context=context), plaintexts, executor=executor, chunk_size=chunk_size)
+
+
+async def decrypt_bytes_many(
+    ciphertexts: Iterable[bytes | str],
+    context: EncryptionContext,
+    *,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[bytes]:
+    """Decrypt many values on the crypto pool, returning raw plaintexts like :func:`decrypt_bytes`."""
+    return await map_chunks(partial(_decrypt_chunk, context=context), ciphertexts, executor=executor, chunk_size=chunk_size)
+
+
+def iter_decrypt_bytes(
+    ciphertexts: Iterable[bytes | str] | AsyncIterable[bytes | str],
+    context: EncryptionContext,
+    *,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending: int = DEFAULT_MAX_PENDING,
+) -> AsyncIterator[bytes]:
+    """Ordered async iterator of raw plaintexts for streaming pipelines."""
+    return stream_chunks(
+        partial(_decrypt_chunk, context=context),
+        ciphertexts,
+        executor=executor,
+        chunk_size=chunk_size,
+        max_pending=max_pending,
+    )
+
+
 __all__ = [
+    "CIPHER_AES_GCM",
+    "CIPHER_BACKENDS",
+    "CIPHER_CHACHA20",
+    "CIPHER_FERNET",
+    "DEFAULT_CHUNK_SIZE",
+    "DEFAULT_CIPHER",
+    "DEFAULT_CRYPTO_WORKERS",
     "EncryptionContext",
     "EncryptionError",
     "DEFAULT_ITERATIONS",
+    "DEFAULT_KDF",
+    "KDF_ARGON2ID",
+    "KDF_PBKDF2",
+    "KDF_SCRYPT",
+    "KdfParams",
+    "available_kdfs",
     "build_context",
+    "ciphertext_backend",
+    "configure_crypto_executor",
+    "crypto_executor",
     "derive_key",
     "encrypt",
+    "encrypt_many",
     "decrypt",
+    "decrypt_bytes",
+    "decrypt_bytes_many",
+    "is_compact",
+    "is_current",
+    "iter_decrypt_bytes",
     "load_salt",
+    "map_chunks",
+    "stream_chunks",
 ]
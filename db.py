@@ -2,15 +2,68 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
+import sqlite3
+import string
+import time
+from bisect import bisect_left, bisect_right
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, TypeVar, Union
 
-import aiosqlite
+from cache import CacheStats, LRUCache
+from sqlite_worker import DEFAULT_BUSY_BACKOFF, DEFAULT_BUSY_RETRIES, SQLiteWorker
+
+T = TypeVar("T")
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_ACQUIRE_TIMEOUT = 5.0
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_ITER_BATCH_SIZE = 200
+# Ids bound per ``IN (...)`` query by get_accounts; well under the 999
+# host-parameter limit of older SQLite builds.
+MULTI_GET_CHUNK = 500
+DEFAULT_GROUP_WINDOW = 0.002
+DEFAULT_GROUP_MAX_OPS = 64
+DEFAULT_LANG_CACHE_SIZE = 1024
+DEFAULT_SUMMARY_CACHE_OWNERS = 256
+DEFAULT_SUMMARY_CACHE_ENTRIES = 20_000
+
+# Per-connection PRAGMA sets selectable by name. ``durable`` fsyncs every
+# commit; ``balanced`` relies on WAL + synchronous=NORMAL, which cannot
+# corrupt the database but may lose the last commits on power failure;
+# ``fast`` skips fsync entirely and is meant for tests and bulk loads.
+SQLITE_PROFILES: dict[str, dict[str, int | str]] = {
+    "durable": {
+        "synchronous": "FULL",
+        "cache_size": -8_000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5_000,
+    },
+    "balanced": {
+        "synchronous": "NORMAL",
+        "cache_size": -16_000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,
+    },
+    "fast": {
+        "synchronous": "OFF",
+        "cache_size": -64_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,
+    },
+}
+DEFAULT_PROFILE = "durable"
+
+AUTO_VACUUM_INCREMENTAL = 2
 
 SCHEMA = """
+PRAGMA auto_vacuum=INCREMENTAL;
 PRAGMA journal_mode=WAL;
 PRAGMA foreign_keys=ON;
 
@@ -32,12 +85,546 @@ CREATE TABLE IF NOT EXISTS accounts (
 """
 
 
+def _enable_incremental_vacuum(conn: sqlite3.Connection) -> None:
+    # auto_vacuum can only be switched on an existing file by rebuilding it,
+    # and VACUUM cannot run inside a transaction. This is a one-off cost paid
+    # at startup, before the pool serves any traffic.
+    row = conn.execute("PRAGMA auto_vacuum").fetchone()
+    if row[0] != AUTO_VACUUM_INCREMENTAL:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+
+
+Migration = Union[str, Callable[[sqlite3.Connection], None]]
+
+# Ordered (version, migration) pairs applied on top of SCHEMA. A migration is
+# either an SQL script, run in a transaction, or a function for steps that
+# cannot run inside one. ``PRAGMA user_version`` records the last
+# applied version.
+MIGRATIONS: tuple[tuple[int, Migration], ...] = (
+    (
+        1,
+        """
+        CREATE INDEX IF NOT EXISTS idx_accounts_owner_name
+            ON accounts(owner_id, name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_accounts_owner_updated
+            ON accounts(owner_id, updated_at);
+        """,
+    ),
+    (2, _enable_incremental_vacuum),
+    # Secret fields move into one encrypted ``record`` blob (see records.py).
+    # The legacy per-field columns stay for rows written before this and are
+    # left empty for new rows.
+    (3, "ALTER TABLE accounts ADD COLUMN record BLOB;"),
+    # ISO-8601 text timestamps become integer epoch milliseconds, so
+    # recency queries compare integers straight off idx_accounts_owner_updated.
+    (
+        4,
+        """
+        UPDATE accounts
+        SET created_at = COALESCE(CAST(strftime('%s', created_at) AS INTEGER) * 1000, 0)
+        WHERE typeof(created_at) = 'text';
+        UPDATE accounts
+        SET updated_at = COALESCE(CAST(strftime('%s', updated_at) AS INTEGER) * 1000, 0)
+        WHERE typeof(updated_at) = 'text';
+        """,
+    ),
+    # Small key/value store for per-vault settings such as KDF parameters.
+    (
+        5,
+        """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID;
+        """,
+    ),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+LIST_ACCOUNTS_SQL = """
+SELECT id, name FROM accounts
+WHERE owner_id=?
+ORDER BY name COLLATE NOCASE, id
+"""
+
+SEARCH_ACCOUNTS_SQL = """
+SELECT id, name FROM accounts
+WHERE owner_id=? AND name LIKE ?
+ORDER BY name COLLATE NOCASE, id
+"""
+
+# Both walk idx_accounts_owner_updated backwards; the index carries the rowid,
+# so the ``id`` tie-break needs no sort either.
+RECENT_ACCOUNTS_SQL = """
+SELECT id, name FROM accounts
+WHERE owner_id=?
+ORDER BY updated_at DESC, id DESC
+LIMIT ?
+"""
+
+CHANGED_SINCE_SQL = """
+SELECT id, name FROM accounts
+WHERE owner_id=? AND updated_at > ?
+ORDER BY updated_at DESC, id DESC
+"""
+
+# Trigram FTS5 index over account names, kept in sync with ``accounts`` by
+# triggers. Only created when the SQLite build ships FTS5.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS accounts_fts USING fts5(
+    name,
+    content='accounts',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS accounts_fts_ai AFTER INSERT ON accounts BEGIN
+    INSERT INTO accounts_fts(rowid, name) VALUES (new.id, new.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS accounts_fts_ad AFTER DELETE ON accounts BEGIN
+    INSERT INTO accounts_fts(accounts_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS accounts_fts_au AFTER UPDATE OF name ON accounts BEGIN
+    INSERT INTO accounts_fts(accounts_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO accounts_fts(rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+FTS_SEARCH_SQL = """
+SELECT a.id, a.name FROM accounts_fts
+JOIN accounts AS a ON a.id = accounts_fts.rowid
+WHERE accounts_fts MATCH ? AND a.owner_id=?
+ORDER BY bm25(accounts_fts), a.name COLLATE NOCASE
+"""
+
+# The trigram tokenizer cannot match queries shorter than three characters.
+FTS_MIN_QUERY_LENGTH = 3
+
+
+def _fts5_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp._fts5_probe")
+    return True
+
+
+def setup_fts(conn: sqlite3.Connection) -> bool:
+    """Create the FTS5 index if supported, returning whether it is usable."""
+    if not _fts5_available(conn):
+        return False
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='accounts_fts'"
+    ).fetchone() is not None
+    conn.executescript(FTS_SCHEMA)
+    if not existed:
+        conn.execute("INSERT INTO accounts_fts(accounts_fts) VALUES ('rebuild')")
+    conn.commit()
+    return True
+
+
+def epoch_ms() -> int:
+    """Current wall-clock time in integer epoch milliseconds."""
+    return time.time_ns() // 1_000_000
+
+
+def _fts_phrase(query: str) -> str:
+    return '"' + query.replace('"', '""') + '"'
+
+
+def apply_profile(conn: sqlite3.Connection, profile: str, *, query_only: bool = False) -> None:
+    """Apply the named PRAGMA profile to one connection."""
+    for pragma, value in SQLITE_PROFILES[profile].items():
+        conn.execute(f"PRAGMA {pragma}={value}")
+    conn.execute("PRAGMA foreign_keys=ON")
+    if query_only:
+        conn.execute("PRAGMA query_only=ON")
+
+
+def _get_user_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("PRAGMA user_version").fetchone()
+    return int(row[0]) if row else 0
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations, each in its own transaction.
+
+    Returns the resulting schema version.
+    """
+    version = _get_user_version(conn)
+    for target, migration in MIGRATIONS:
+        if target <= version:
+            continue
+        if isinstance(migration, str):
+            conn.executescript(f"BEGIN;\n{migration}\nPRAGMA user_version={target};\nCOMMIT;")
+        else:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version={target}")
+            conn.commit()
+        version = target
+    return version
+
+
+def read_meta(db_path: str | Path, key: str) -> Optional[str]:
+    """Read one ``meta`` value straight from the file, without a pool.
+
+    Returns ``None`` when the file, the table or the key does not exist yet.
+    Meant for startup code that must not wait for :meth:`Database.init`.
+    """
+    path = Path(db_path).expanduser()
+    if not path.exists():
+        return None
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+    except sqlite3.OperationalError as exc:
+        # Files created before migration 5 have no meta table yet; anything
+        # else (a locked or unreadable file) must not pass for "unset".
+        if "no such table" in str(exc):
+            return None
+        raise
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def _fetchall(conn: sqlite3.Connection, sql: str, params: Iterable[Any] = ()) -> list[sqlite3.Row]:
+    return conn.execute(sql, params).fetchall()
+
+
+def _fetchone(conn: sqlite3.Connection, sql: str, params: Iterable[Any] = ()) -> Optional[sqlite3.Row]:
+    return conn.execute(sql, params).fetchone()
+
+
+def _execute_commit(conn: sqlite3.Connection, sql: str, params: Iterable[Any] = ()) -> WriteResult:
+    cursor = conn.execute(sql, params)
+    conn.commit()
+    return WriteResult(cursor.lastrowid, cursor.rowcount)
+
+
+def _executemany_commit(conn: sqlite3.Connection, sql: str, params: Iterable[Iterable[Any]]) -> None:
+    conn.executemany(sql, params)
+    conn.commit()
+
+
+class PoolTimeoutError(Exception):
+    """Raised when a pooled connection cannot be acquired in time."""
+
+
+@dataclass(slots=True)
+class PoolStats:
+    """Snapshot of connection pool wait-time metrics."""
+
+    acquisitions: int = 0
+    timeouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    busy_retries: int = 0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.acquisitions if self.acquisitions else 0.0
+
+
+class ConnectionPool:
+    """Long-lived SQLite connections: a bounded reader set plus one writer.
+
+    Every connection lives on its own :class:`SQLiteWorker` thread. WAL mode
+    lets readers proceed concurrently with the single writer, so reads are
+    spread over ``size`` workers while writes are serialized through one
+    worker guarded by a lock. :meth:`read` and :meth:`write` run a whole
+    operation on the acquired worker in one hop.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        size: int = DEFAULT_POOL_SIZE,
+        acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+        profile: str = DEFAULT_PROFILE,
+        busy_retries: int = DEFAULT_BUSY_RETRIES,
+        busy_backoff: float = DEFAULT_BUSY_BACKOFF,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        if profile not in SQLITE_PROFILES:
+            raise ValueError(f"Unknown SQLite profile: {profile}")
+        self.db_path = db_path
+        self.profile = profile
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self._busy_retries = busy_retries
+        self._busy_backoff = busy_backoff
+        self._readers: asyncio.Queue[SQLiteWorker] = asyncio.Queue()
+        self._all_readers: List[SQLiteWorker] = []
+        self._writer: Optional[SQLiteWorker] = None
+        self._write_lock = asyncio.Lock()
+        self._stats = PoolStats()
+        self.writes = 0
+        self.last_write = time.monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def _start_worker(self, name: str, *, query_only: bool) -> SQLiteWorker:
+        worker = SQLiteWorker(
+            self.db_path,
+            name=name,
+            setup=partial(apply_profile, profile=self.profile, query_only=query_only),
+            busy_retries=self._busy_retries,
+            busy_backoff=self._busy_backoff,
+        )
+        await worker.start()
+        return worker
+
+    async def open(self) -> None:
+        if self.is_open:
+            return
+        self._writer = await self._start_worker("sqlite-writer", query_only=False)
+        for index in range(self.size):
+            worker = await self._start_worker(f"sqlite-reader-{index}", query_only=True)
+            self._all_readers.append(worker)
+            self._readers.put_nowait(worker)
+
+    async def close(self) -> None:
+        workers = list(self._all_readers)
+        if self._writer is not None:
+            workers.append(self._writer)
+        self._writer = None
+        self._all_readers.clear()
+        self._readers = asyncio.Queue()
+        for worker in workers:
+            self._stats.busy_retries += worker.retries
+            await worker.close()
+
+    def _record_wait(self, started: float) -> None:
+        waited = time.perf_counter() - started
+        self._stats.acquisitions += 1
+        self._stats.total_wait += waited
+        if waited > self._stats.max_wait:
+            self._stats.max_wait = waited
+
+    def stats(self) -> PoolStats:
+        snapshot = self._stats
+        workers = self._all_readers + ([self._writer] if self._writer is not None else [])
+        return PoolStats(
+            acquisitions=snapshot.acquisitions,
+            timeouts=snapshot.timeouts,
+            total_wait=snapshot.total_wait,
+            max_wait=snapshot.max_wait,
+            busy_retries=snapshot.busy_retries + sum(worker.retries for worker in workers),
+        )
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[SQLiteWorker]:
+        if not self.is_open:
+            raise RuntimeError("Connection pool is not open")
+        started = time.perf_counter()
+        try:
+            # Skip wait_for's timer setup when a worker is free.
+            worker = self._readers.get_nowait()
+        except asyncio.QueueEmpty:
+            try:
+                worker = await asyncio.wait_for(self._readers.get(), self.acquire_timeout)
+            except asyncio.TimeoutError as exc:
+                self._stats.timeouts += 1
+                raise PoolTimeoutError("Timed out waiting for a reader connection") from exc
+        self._record_wait(started)
+        try:
+            yield worker
+        finally:
+            if worker in self._all_readers:
+                self._readers.put_nowait(worker)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[SQLiteWorker]:
+        if not self.is_open:
+            raise RuntimeError("Connection pool is not open")
+        started = time.perf_counter()
+        try:
+            if self._write_lock.locked():
+                await asyncio.wait_for(self._write_lock.acquire(), self.acquire_timeout)
+            else:
+                await self._write_lock.acquire()
+        except asyncio.TimeoutError as exc:
+            self._stats.timeouts += 1
+            raise PoolTimeoutError("Timed out waiting for the writer connection") from exc
+        self._record_wait(started)
+        try:
+            yield self._writer
+        finally:
+            self.writes += 1
+            self.last_write = time.monotonic()
+            self._write_lock.release()
+
+    async def read(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(conn, *args)`` on a reader connection."""
+        async with self.reader() as worker:
+            return await worker.run(fn, *args)
+
+    async def write(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(conn, *args)`` on the writer connection.
+
+        ``fn`` owns the transaction: it must commit, and anything it leaves
+        uncommitted when raising is rolled back.
+        """
+        async with self.writer() as worker:
+            return await worker.run(fn, *args)
+
+
+@dataclass(slots=True)
+class CheckpointResult:
+    """Outcome of ``PRAGMA wal_checkpoint``."""
+
+    busy: bool
+    log_frames: int
+    checkpointed_frames: int
+
+
+@dataclass(slots=True)
+class WriteResult:
+    lastrowid: Optional[int]
+    rowcount: int
+
+
+@dataclass(slots=True)
+class _PendingWrite:
+    sql: str
+    params: tuple
+    future: asyncio.Future
+
+
+class GroupCommitter:
+    """Batch concurrent single-statement writes into shared transactions.
+
+    A background task drains queued statements that arrive within ``window``
+    seconds (or until ``max_ops`` are queued), runs each inside its own
+    savepoint so one failure does not abort its neighbours, commits once and
+    then resolves every caller with its own :class:`WriteResult`.
+    """
+
+    def __init__(self, pool: ConnectionPool, *, window: float = DEFAULT_GROUP_WINDOW, max_ops: int = DEFAULT_GROUP_MAX_OPS):
+        self._pool = pool
+        self.window = window
+        self.max_ops = max_ops
+        self._queue: asyncio.Queue[Optional[_PendingWrite]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.operations = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="db-group-commit")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, sql: str, params: tuple) -> WriteResult:
+        if self._task is None:
+            raise RuntimeError("Group committer is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_PendingWrite(sql, params, future))
+        return await future
+
+    async def _collect(self, first: _PendingWrite) -> tuple[list[_PendingWrite], bool]:
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_ops:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch, stopping = await self._collect(first)
+            await self._apply(batch)
+
+    @staticmethod
+    def _apply_batch(
+        conn: sqlite3.Connection, batch: list[_PendingWrite]
+    ) -> list[tuple[_PendingWrite, Optional[WriteResult], Optional[BaseException]]]:
+        results: list[tuple[_PendingWrite, Optional[WriteResult], Optional[BaseException]]] = []
+        conn.execute("BEGIN")
+        for item in batch:
+            conn.execute("SAVEPOINT group_op")
+            try:
+                cursor = conn.execute(item.sql, item.params)
+            except Exception as exc:
+                conn.execute("ROLLBACK TO group_op")
+                results.append((item, None, exc))
+            else:
+                results.append((item, WriteResult(cursor.lastrowid, cursor.rowcount), None))
+            conn.execute("RELEASE group_op")
+        conn.commit()
+        return results
+
+    async def _apply(self, batch: list[_PendingWrite]) -> None:
+        try:
+            # The whole batch runs on the writer thread in a single hop.
+            results = await self._pool.write(self._apply_batch, batch)
+        except Exception as exc:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+        self.batches += 1
+        self.operations += len(batch)
+        for item, result, error in results:
+            if item.future.done():
+                continue
+            if error is not None:
+                item.future.set_exception(error)
+            else:
+                item.future.set_result(result)
+
+
 @dataclass(slots=True)
 class AccountSummary:
     id: int
     name: str
 
 
+@dataclass(slots=True)
+class AccountPage:
+    """One keyset-paginated slice of account summaries ordered by name."""
+
+    items: List[AccountSummary]
+    has_prev: bool
+    has_next: bool
+
+    @property
+    def first_key(self) -> Optional[tuple[str, int]]:
+        return (self.items[0].name, self.items[0].id) if self.items else None
+
+    @property
+    def last_key(self) -> Optional[tuple[str, int]]:
+        return (self.items[-1].name, self.items[-1].id) if self.items else None
+
+
 @dataclass(slots=True)
 class Account:
     id: int
@@ -45,146 +632,661 @@ class Account:
     name: str
     username: bytes
     password: bytes
-    created_at: str
-    updated_at: str
+    created_at: int
+    updated_at: int
+    record: Optional[bytes] = None
+
+
+# SQLite's NOCASE collation folds ASCII letters only.
+_ASCII_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _nocase_key(name: str, account_id: int) -> tuple[str, int]:
+    return name.translate(_ASCII_FOLD), account_id
+
+
+@dataclass(slots=True)
+class _SummaryEntry:
+    """A cached, name-ordered summary list with its keyset sort keys."""
+
+    items: List[AccountSummary]
+    keys: List[tuple[str, int]]
+
+    def page(
+        self,
+        *,
+        after: Optional[tuple[str, int]],
+        before: Optional[tuple[str, int]],
+        limit: int,
+    ) -> AccountPage:
+        if before is not None:
+            end = bisect_left(self.keys, _nocase_key(*before))
+            start = max(0, end - limit)
+            return AccountPage(items=self.items[start:end], has_prev=start > 0, has_next=True)
+        start = bisect_right(self.keys, _nocase_key(*after)) if after is not None else 0
+        end = start + limit
+        return AccountPage(items=self.items[start:end], has_prev=after is not None, has_next=end < len(self.items))
+
+
+def _row_to_account(row: sqlite3.Row) -> Account:
+    return Account(
+        id=row["id"],
+        owner_id=row["owner_id"],
+        name=row["name"],
+        username=row["username"],
+        password=row["password"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        record=row["record"],
+    )
 
 
 class Database:
     """High-level wrapper around the SQLite database."""
 
-    def __init__(self, db_path: str | Path):
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+        full_text_search: bool = True,
+        group_commit: bool = False,
+        group_window: float = DEFAULT_GROUP_WINDOW,
+        group_max_ops: int = DEFAULT_GROUP_MAX_OPS,
+        lang_cache_size: int = DEFAULT_LANG_CACHE_SIZE,
+        summary_cache_owners: int = DEFAULT_SUMMARY_CACHE_OWNERS,
+        summary_cache_entries: int = DEFAULT_SUMMARY_CACHE_ENTRIES,
+        profile: str = DEFAULT_PROFILE,
+    ):
         self.db_path = str(Path(db_path).expanduser())
         self._init_lock = asyncio.Lock()
         self._initialized = False
+        self._want_fts = full_text_search
+        self.fts_enabled = False
+        self._pool = ConnectionPool(self.db_path, size=pool_size, acquire_timeout=acquire_timeout, profile=profile)
+        self._group: Optional[GroupCommitter] = (
+            GroupCommitter(self._pool, window=group_window, max_ops=group_max_ops) if group_commit else None
+        )
+        self._lang_cache: LRUCache[int, str] = LRUCache(lang_cache_size)
+        self._known_users: set[int] = set()
+        # Summary lists are keyed by (owner_id, version); every mutation bumps
+        # the owner's version, so stale lists can never be served.
+        self._summary_cache: LRUCache[tuple[int, int], _SummaryEntry] = LRUCache(
+            summary_cache_owners, max_weight=summary_cache_entries
+        )
+        self._owner_versions: dict[int, int] = {}
+        self._version_counter = itertools.count(1)
+        # Owners whose vault exceeded the summary cache at a given version;
+        # bounded like the summary cache and dropped on every mutation.
+        self._oversized: LRUCache[int, int] = LRUCache(summary_cache_owners)
 
     async def init(self) -> None:
-        """Initialize schema exactly once."""
+        """Initialize schema and open the connection pool exactly once."""
         if self._initialized:
             return
         async with self._init_lock:
             if self._initialized:
                 return
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.executescript(SCHEMA)
-                await db.commit()
+            await self._pool.open()
+            try:
+                self.fts_enabled = await self._pool.write(self._bootstrap)
+            except BaseException:
+                await self._pool.close()
+                raise
+            if self._group is not None:
+                self._group.start()
             self._initialized = True
 
-    @asynccontextmanager
-    async def _connect(self):
-        conn = await aiosqlite.connect(self.db_path)
-        conn.row_factory = aiosqlite.Row
+    def _bootstrap(self, conn: sqlite3.Connection) -> bool:
+        """Create the schema and run migrations; returns whether FTS5 is enabled."""
+        conn.executescript(SCHEMA)
+        conn.commit()
+        apply_migrations(conn)
+        return setup_fts(conn) if self._want_fts else False
+
+    async def close(self) -> None:
+        """Flush pending group commits and close all pooled connections."""
+        async with self._init_lock:
+            if self._group is not None:
+                await self._group.stop()
+            await self._pool.close()
+            self._initialized = False
+
+    def pool_stats(self) -> PoolStats:
+        return self._pool.stats()
+
+    def lang_cache_stats(self) -> CacheStats:
+        return self._lang_cache.stats()
+
+    def summary_cache_stats(self) -> CacheStats:
+        return self._summary_cache.stats()
+
+    def owner_version(self, owner_id: int) -> int:
+        return self._owner_versions.get(owner_id, 0)
+
+    def _bump_owner(self, owner_id: int) -> None:
+        self._summary_cache.pop((owner_id, self.owner_version(owner_id)))
+        self._oversized.pop(owner_id)
+        self._owner_versions[owner_id] = next(self._version_counter)
+
+    async def _summaries(self, owner_id: int) -> Optional[_SummaryEntry]:
+        """Return the owner's cached summary list, loading it on a miss.
+
+        Returns ``None`` when the vault is too large to cache.
+        """
+        version = self.owner_version(owner_id)
+        entry = self._summary_cache.get((owner_id, version))
+        if entry is not None:
+            return entry
+        if self._oversized.get(owner_id) == version:
+            return None
+        cap = self._summary_cache.max_weight
+        rows = await self._pool.read(_fetchall, f"{LIST_ACCOUNTS_SQL} LIMIT ?", (owner_id, cap + 1))
+        if len(rows) > cap:
+            self._oversized.put(owner_id, version)
+            return None
+        items = [AccountSummary(id=row["id"], name=row["name"]) for row in rows]
+        entry = _SummaryEntry(items=items, keys=[_nocase_key(item.name, item.id) for item in items])
+        # A write that committed while we were reading has bumped the version.
+        if self.owner_version(owner_id) == version:
+            self._summary_cache.put((owner_id, version), entry, weight=max(1, len(items)))
+        return entry
+
+    def _reader(self):
+        return self._pool.reader()
+
+    @property
+    def write_generation(self) -> int:
+        """Number of writer-connection uses; changes whenever data may have changed."""
+        return self._pool.writes
+
+    def idle_for(self) -> float:
+        """Seconds since the writer connection was last released."""
+        return time.monotonic() - self._pool.last_write
+
+    def wal_size(self) -> int:
         try:
-            yield conn
-        finally:
-            await conn.close()
+            return Path(f"{self.db_path}-wal").stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    async def checkpoint(self, mode: str = "PASSIVE") -> CheckpointResult:
+        """Run a WAL checkpoint on the writer connection."""
+        if mode not in {"PASSIVE", "FULL", "RESTART", "TRUNCATE"}:
+            raise ValueError(f"Unsupported checkpoint mode: {mode}")
+        row = await self._pool.write(_fetchone, f"PRAGMA wal_checkpoint({mode})")
+        return CheckpointResult(busy=bool(row[0]), log_frames=row[1], checkpointed_frames=row[2])
+
+    async def freelist_count(self) -> int:
+        """Number of unused pages that incremental vacuum could release."""
+        row = await self._pool.read(_fetchone, "PRAGMA freelist_count")
+        return int(row[0])
+
+    async def incremental_vacuum(self, pages: int) -> int:
+        """Release up to ``pages`` free pages; returns the remaining free pages."""
+
+        def vacuum(conn: sqlite3.Connection) -> int:
+            # The pragma frees one page per step, so it must be fully drained.
+            conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+            return int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+
+        return await self._pool.write(vacuum)
+
+    async def merge_search_index(self, pages: int) -> None:
+        """Fold deletion tombstones in the FTS5 index with bounded work."""
+        if not self.fts_enabled:
+            return
+        await self._pool.write(_execute_commit, "INSERT INTO accounts_fts(accounts_fts, rank) VALUES ('merge', ?)", (int(pages),))
+
+    async def _write(self, sql: str, params: tuple) -> WriteResult:
+        """Run one mutating statement, through the group committer if enabled."""
+        if self._group is not None:
+            return await self._group.submit(sql, params)
+        return await self._pool.write(_execute_commit, sql, params)
+
+    async def get_meta(self, key: str) -> Optional[str]:
+        row = await self._pool.read(_fetchone, "SELECT value FROM meta WHERE key=?", (key,))
+        return row["value"] if row else None
+
+    async def set_meta(self, key: str, value: str) -> None:
+        await self._write(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            (key, value),
+        )
+
+    async def set_meta_many(self, values: Dict[str, Optional[str]]) -> None:
+        """Set several meta keys in one transaction; ``None`` deletes a key."""
+
+        def store(conn: sqlite3.Connection) -> None:
+            for key, value in values.items():
+                if value is None:
+                    conn.execute("DELETE FROM meta WHERE key=?", (key,))
+                else:
+                    conn.execute(
+                        "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                        (key, value),
+                    )
+            conn.commit()
+
+        await self._pool.write(store)
 
     async def ensure_user(self, telegram_id: int) -> None:
-        async with self._connect() as db:
-            await db.execute(
-                "INSERT OR IGNORE INTO users (telegram_id) VALUES (?)",
-                (telegram_id,),
-            )
-            await db.commit()
+        if telegram_id in self._known_users:
+            return
+        await self._write(
+            "INSERT OR IGNORE INTO users (telegram_id) VALUES (?)",
+            (telegram_id,),
+        )
+        self._known_users.add(telegram_id)
+
+    async def ensure_user_and_get_lang(self, telegram_id: int) -> str:
+        """Register ``telegram_id`` if needed and return its language.
+
+        Users already seen by this process with a cached language cost no
+        database work; otherwise the upsert and lookup share one connection.
+        """
+        if telegram_id in self._known_users:
+            return await self.get_user_lang(telegram_id)
+
+        def upsert(conn: sqlite3.Connection) -> Optional[sqlite3.Row]:
+            conn.execute("INSERT INTO users (telegram_id) VALUES (?) ON CONFLICT DO NOTHING", (telegram_id,))
+            row = conn.execute("SELECT lang FROM users WHERE telegram_id=?", (telegram_id,)).fetchone()
+            conn.commit()
+            return row
+
+        row = await self._pool.write(upsert)
+        self._known_users.add(telegram_id)
+        lang = row["lang"] if row else "en"
+        self._lang_cache.put(telegram_id, lang)
+        return lang
 
     async def get_user_lang(self, telegram_id: int) -> str:
-        async with self._connect() as db:
-            async with db.execute(
-                "SELECT lang FROM users WHERE telegram_id=?",
-                (telegram_id,),
-            ) as cursor:
-                row = await cursor.fetchone()
-        return row["lang"] if row else "en"
+        cached = self._lang_cache.get(telegram_id)
+        if cached is not None:
+            return cached
+        row = await self._pool.read(_fetchone, "SELECT lang FROM users WHERE telegram_id=?", (telegram_id,))
+        lang = row["lang"] if row else "en"
+        self._lang_cache.put(telegram_id, lang)
+        return lang
 
     async def set_user_lang(self, telegram_id: int, lang: str) -> None:
-        async with self._connect() as db:
-            await db.execute(
+        try:
+            result = await self._write(
                 "UPDATE users SET lang=? WHERE telegram_id=?",
                 (lang, telegram_id),
             )
-            await db.commit()
+        except Exception:
+            self._lang_cache.pop(telegram_id)
+            raise
+        if result.rowcount > 0:
+            self._lang_cache.put(telegram_id, lang)
+        else:
+            self._lang_cache.pop(telegram_id)
 
-    async def add_account(self, owner_id: int, name: str, username: bytes, password: bytes) -> int:
-        now = datetime.utcnow().isoformat(timespec="seconds")
-        async with self._connect() as db:
-            cursor = await db.execute(
-                """
-                INSERT INTO accounts (owner_id, name, username, password, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (owner_id, name, username, password, now, now),
-            )
-            await db.commit()
-            return cursor.lastrowid
+    async def add_account(self, owner_id: int, name: str, record: bytes) -> int:
+        """Insert an account whose secrets are sealed in ``record``."""
+        now = epoch_ms()
+        result = await self._write(
+            """
+            INSERT INTO accounts (owner_id, name, username, password, record, created_at, updated_at)
+            VALUES (?, ?, X'', X'', ?, ?, ?)
+            """,
+            (owner_id, name, record, now, now),
+        )
+        self._bump_owner(owner_id)
+        return result.lastrowid
+
+    async def add_accounts_bulk(self, owner_id: int, rows: Iterable[tuple[str, bytes]]) -> int:
+        """Insert ``(name, record)`` rows in a single transaction.
+
+        Returns the number of inserted rows.
+        """
+        now = epoch_ms()
+        params = [(owner_id, name, record, now, now) for name, record in rows]
+        if not params:
+            return 0
+        await self._pool.write(
+            _executemany_commit,
+            """
+            INSERT INTO accounts (owner_id, name, username, password, record, created_at, updated_at)
+            VALUES (?, ?, X'', X'', ?, ?, ?)
+            """,
+            params,
+        )
+        self._bump_owner(owner_id)
+        return len(params)
 
     async def list_accounts(self, owner_id: int) -> List[AccountSummary]:
-        async with self._connect() as db:
-            async with db.execute(
-                "SELECT id, name FROM accounts WHERE owner_id=? ORDER BY name",
-                (owner_id,),
-            ) as cursor:
-                rows = await cursor.fetchall()
+        entry = await self._summaries(owner_id)
+        if entry is not None:
+            return list(entry.items)
+        rows = await self._pool.read(_fetchall, LIST_ACCOUNTS_SQL, (owner_id,))
         return [AccountSummary(id=row["id"], name=row["name"]) for row in rows]
 
     async def search_accounts(self, owner_id: int, query: str) -> List[AccountSummary]:
-        pattern = f"%{query}%"
-        async with self._connect() as db:
-            async with db.execute(
-                """
-                SELECT id, name FROM accounts
-                WHERE owner_id=? AND LOWER(name) LIKE LOWER(?)
-                ORDER BY name
-                """,
-                (owner_id, pattern),
-            ) as cursor:
-                rows = await cursor.fetchall()
+        if self.fts_enabled and len(query) >= FTS_MIN_QUERY_LENGTH:
+            rows = await self._pool.read(_fetchall, FTS_SEARCH_SQL, (_fts_phrase(query), owner_id))
+            return [AccountSummary(id=row["id"], name=row["name"]) for row in rows]
+        # LIKE is case-insensitive for ASCII, matching the NOCASE index order.
+        rows = await self._pool.read(_fetchall, SEARCH_ACCOUNTS_SQL, (owner_id, f"%{query}%"))
+        return [AccountSummary(id=row["id"], name=row["name"]) for row in rows]
+
+    async def list_accounts_page(
+        self,
+        owner_id: int,
+        *,
+        after: Optional[tuple[str, int]] = None,
+        before: Optional[tuple[str, int]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> AccountPage:
+        """Return up to ``limit`` accounts following ``after`` or preceding ``before``.
+
+        Keys are ``(name, id)`` pairs taken from a previous page. Pages are
+        sliced from the cached summary list when available, otherwise each
+        page is a bounded seek on the ``(owner_id, name)`` index.
+        """
+        if after is not None and before is not None:
+            raise ValueError("Pass either after or before, not both")
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        entry = await self._summaries(owner_id)
+        if entry is not None:
+            return entry.page(after=after, before=before, limit=limit)
+        return await self._page(owner_id, None, after=after, before=before, limit=limit)
+
+    async def search_accounts_page(
+        self,
+        owner_id: int,
+        query: str,
+        *,
+        after: Optional[tuple[str, int]] = None,
+        before: Optional[tuple[str, int]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> AccountPage:
+        """Keyset-paginated variant of :meth:`search_accounts`, ordered by name."""
+        return await self._page(owner_id, query, after=after, before=before, limit=limit)
+
+    async def _page(
+        self,
+        owner_id: int,
+        query: Optional[str],
+        *,
+        after: Optional[tuple[str, int]],
+        before: Optional[tuple[str, int]],
+        limit: int,
+    ) -> AccountPage:
+        if after is not None and before is not None:
+            raise ValueError("Pass either after or before, not both")
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        clauses = ["owner_id=?"]
+        params: list = [owner_id]
+        if query is not None:
+            if self.fts_enabled and len(query) >= FTS_MIN_QUERY_LENGTH:
+                clauses.append("id IN (SELECT rowid FROM accounts_fts WHERE accounts_fts MATCH ?)")
+                params.append(_fts_phrase(query))
+            else:
+                clauses.append("name LIKE ?")
+                params.append(f"%{query}%")
+        backwards = before is not None
+        anchor = before if backwards else after
+        if anchor is not None:
+            # The plain bound lets SQLite seek the index; the row value breaks ties.
+            op = "<" if backwards else ">"
+            clauses.append(f"name COLLATE NOCASE {op}= ? AND (name COLLATE NOCASE, id) {op} (?, ?)")
+            params.extend([anchor[0], anchor[0], anchor[1]])
+        direction = "DESC" if backwards else "ASC"
+        sql = (
+            f"SELECT id, name FROM accounts WHERE {' AND '.join(clauses)} "
+            f"ORDER BY name COLLATE NOCASE {direction}, id {direction} LIMIT ?"
+        )
+        params.append(limit + 1)
+        rows = await self._pool.read(_fetchall, sql, params)
+        more = len(rows) > limit
+        items = [AccountSummary(id=row["id"], name=row["name"]) for row in rows[:limit]]
+        if backwards:
+            items.reverse()
+            return AccountPage(items=items, has_prev=more, has_next=True)
+        return AccountPage(items=items, has_prev=after is not None, has_next=more)
+
+    async def list_recent_accounts(self, owner_id: int, *, limit: int = DEFAULT_PAGE_SIZE) -> List[AccountSummary]:
+        """Return the ``limit`` most recently added or changed accounts."""
+        rows = await self._pool.read(_fetchall, RECENT_ACCOUNTS_SQL, (owner_id, limit))
+        return [AccountSummary(id=row["id"], name=row["name"]) for row in rows]
+
+    async def changed_since(self, owner_id: int, ts: int) -> List[AccountSummary]:
+        """Return accounts added or changed after ``ts`` (epoch ms), newest first."""
+        rows = await self._pool.read(_fetchall, CHANGED_SINCE_SQL, (owner_id, ts))
         return [AccountSummary(id=row["id"], name=row["name"]) for row in rows]
 
+    async def get_account_summary(self, account_id: int, owner_id: int) -> Optional[AccountSummary]:
+        row = await self._pool.read(
+            _fetchone,
+            "SELECT id, name FROM accounts WHERE id=? AND owner_id=?",
+            (account_id, owner_id),
+        )
+        return AccountSummary(id=row["id"], name=row["name"]) if row else None
+
     async def get_account(self, account_id: int, owner_id: int) -> Optional[Account]:
-        async with self._connect() as db:
-            async with db.execute(
-                """
-                SELECT id, owner_id, name, username, password, created_at, updated_at
-                FROM accounts WHERE id=? AND owner_id=?
-                """,
-                (account_id, owner_id),
-            ) as cursor:
-                row = await cursor.fetchone()
+        row = await self._pool.read(
+            _fetchone,
+            """
+            SELECT id, owner_id, name, username, password, record, created_at, updated_at
+            FROM accounts WHERE id=? AND owner_id=?
+            """,
+            (account_id, owner_id),
+        )
         if row is None:
             return None
-        return Account(
-            id=row["id"],
-            owner_id=row["owner_id"],
-            name=row["name"],
-            username=row["username"],
-            password=row["password"],
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
+        return _row_to_account(row)
+
+    async def get_accounts(self, owner_id: int, ids: Iterable[int]) -> List[Account]:
+        """Fetch several accounts of ``owner_id`` with one query per chunk of ids.
+
+        Results follow the order of ``ids``; duplicates are collapsed and ids
+        that are missing or belong to another owner are skipped.
+        """
+        wanted = list(dict.fromkeys(ids))
+
+        def fetch(conn: sqlite3.Connection) -> dict[int, Account]:
+            found: dict[int, Account] = {}
+            for start in range(0, len(wanted), MULTI_GET_CHUNK):
+                chunk = wanted[start:start + MULTI_GET_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"""
+                    SELECT id, owner_id, name, username, password, record, created_at, updated_at
+                    FROM accounts WHERE owner_id=? AND id IN ({placeholders})
+                    """,
+                    (owner_id, *chunk),
+                )
+                for row in cursor:
+                    found[row["id"]] = _row_to_account(row)
+            return found
+
+        found = await self._pool.read(fetch) if wanted else {}
+        return [found[account_id] for account_id in wanted if account_id in found]
+
+    async def iter_accounts(self, owner_id: int, *, batch_size: int = DEFAULT_ITER_BATCH_SIZE) -> AsyncIterator[Account]:
+        """Stream every account of ``owner_id`` in id order.
+
+        Rows are stepped from a single cursor ``batch_size`` at a time, so
+        memory stays flat regardless of vault size. The reader connection is
+        held until the iterator is exhausted or closed.
+        """
+        async with self._reader() as worker:
+            # The cursor stays on the reader's thread; each batch is one hop.
+            cursor = await worker.run(
+                sqlite3.Connection.execute,
+                """
+                SELECT id, owner_id, name, username, password, record, created_at, updated_at
+                FROM accounts WHERE owner_id=? ORDER BY id
+                """,
+                (owner_id,),
+            )
+            try:
+                while rows := await worker.run(lambda _conn: cursor.fetchmany(batch_size)):
+                    for row in rows:
+                        yield _row_to_account(row)
+            finally:
+                await worker.run(lambda _conn: cursor.close())
+
+    async def scan_accounts(self, after_id: int, limit: int) -> List[Account]:
+        """Return up to ``limit`` accounts of any owner with ``id > after_id``, in id order.
+
+        Ids come from AUTOINCREMENT and are never reused, so a scan resumed
+        from a saved ``after_id`` also reaches every row inserted since.
+        """
+        rows = await self._pool.read(
+            _fetchall,
+            """
+            SELECT id, owner_id, name, username, password, record, created_at, updated_at
+            FROM accounts WHERE id > ? ORDER BY id LIMIT ?
+            """,
+            (after_id, limit),
         )
+        return [_row_to_account(row) for row in rows]
 
-    async def delete_account(self, account_id: int, owner_id: int) -> bool:
-        async with self._connect() as db:
-            cursor = await db.execute(
-                "DELETE FROM accounts WHERE id=? AND owner_id=?",
-                (account_id, owner_id),
+    async def list_owner_ids(self) -> List[int]:
+        rows = await self._pool.read(_fetchall, "SELECT telegram_id FROM users ORDER BY telegram_id")
+        return [row["telegram_id"] for row in rows]
+
+    async def restore_owner(self, owner_id: int, lang: str, accounts: Iterable[Account]) -> int:
+        """Insert a user and copies of their accounts, keeping timestamps.
+
+        Account ids are reassigned by this database. Used when moving an owner
+        between databases; returns the number of copied accounts.
+        """
+        params = [
+            (
+                owner_id,
+                account.name,
+                account.username,
+                account.password,
+                account.record,
+                account.created_at,
+                account.updated_at,
+            )
+            for account in accounts
+        ]
+
+        def restore(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "INSERT INTO users (telegram_id, lang) VALUES (?, ?) ON CONFLICT(telegram_id) DO UPDATE SET lang=excluded.lang",
+                (owner_id, lang),
+            )
+            conn.executemany(
+                """
+                INSERT INTO accounts (owner_id, name, username, password, record, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                params,
             )
-            await db.commit()
-            return cursor.rowcount > 0
-
-    async def update_account_field(self, account_id: int, owner_id: int, *, field: str, value: bytes) -> bool:
-        if field not in {"username", "password"}:
-            raise ValueError("Unsupported field for update")
-        now = datetime.utcnow().isoformat(timespec="seconds")
-        async with self._connect() as db:
-            cursor = await db.execute(
-                f"UPDATE accounts SET {field}=?, updated_at=? WHERE id=? AND owner_id=?",
-                (value, now, account_id, owner_id),
+            conn.commit()
+
+        await self._pool.write(restore)
+        self._known_users.add(owner_id)
+        self._lang_cache.put(owner_id, lang)
+        self._bump_owner(owner_id)
+        return len(params)
+
+    async def purge_owner(self, owner_id: int) -> int:
+        """Delete a user and all of their accounts; returns deleted accounts."""
+
+        def purge(conn: sqlite3.Connection) -> int:
+            deleted = conn.execute("DELETE FROM accounts WHERE owner_id=?", (owner_id,)).rowcount
+            conn.execute("DELETE FROM users WHERE telegram_id=?", (owner_id,))
+            conn.commit()
+            return deleted
+
+        deleted = await self._pool.write(purge)
+        self._known_users.discard(owner_id)
+        self._lang_cache.pop(owner_id)
+        self._bump_owner(owner_id)
+        return deleted
+
+    async def delete_account(self, account_id: int, owner_id: int) -> bool:
+        result = await self._write(
+            "DELETE FROM accounts WHERE id=? AND owner_id=?",
+            (account_id, owner_id),
+        )
+        self._bump_owner(owner_id)
+        return result.rowcount > 0
+
+    async def update_account_record(self, account_id: int, owner_id: int, record: bytes) -> bool:
+        """Replace the sealed secrets of an account.
+
+        Legacy per-field ciphertexts are cleared, so rewriting a row written
+        before records existed migrates it.
+        """
+        now = epoch_ms()
+        result = await self._write(
+            "UPDATE accounts SET record=?, username=X'', password=X'', updated_at=? WHERE id=? AND owner_id=?",
+            (record, now, account_id, owner_id),
+        )
+        self._bump_owner(owner_id)
+        return result.rowcount > 0
+
+    async def reseal_account(self, account_id: int, owner_id: int, old_record: Optional[bytes], record: bytes) -> bool:
+        """Swap in a re-encrypted ``record`` if the row still holds ``old_record``.
+
+        Used to migrate ciphertext formats in the background: ``updated_at``
+        is left alone, and a row edited in the meantime is not overwritten.
+        """
+        result = await self._write(
+            "UPDATE accounts SET record=?, username=X'', password=X'' WHERE id=? AND owner_id=? AND record IS ?",
+            (record, account_id, owner_id, old_record),
+        )
+        return result.rowcount > 0
+
+    async def reseal_accounts(
+        self,
+        rows: Iterable[tuple[int, int, Optional[bytes], bytes]],
+        *,
+        checkpoint: Optional[tuple[str, str]] = None,
+    ) -> int:
+        """Apply :meth:`reseal_account` to ``(id, owner_id, old_record, record)`` rows at once.
+
+        All rows, and the optional ``(key, value)`` meta ``checkpoint``, are
+        committed in one transaction. Returns the number of replaced rows.
+        """
+        params = [(record, account_id, owner_id, old_record) for account_id, owner_id, old_record, record in rows]
+
+        def reseal(conn: sqlite3.Connection) -> int:
+            cursor = conn.executemany(
+                "UPDATE accounts SET record=?, username=X'', password=X'' WHERE id=? AND owner_id=? AND record IS ?",
+                params,
             )
-            await db.commit()
-            return cursor.rowcount > 0
+            if checkpoint is not None:
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                    checkpoint,
+                )
+            conn.commit()
+            return cursor.rowcount if params else 0
+
+        return await self._pool.write(reseal)
 
 
 __all__ = [
     "Account",
+    "AccountPage",
     "AccountSummary",
+    "CheckpointResult",
+    "ConnectionPool",
+    "DEFAULT_PROFILE",
     "Database",
+    "GroupCommitter",
+    "MIGRATIONS",
+    "SCHEMA_VERSION",
+    "SQLITE_PROFILES",
+    "PoolStats",
+    "PoolTimeoutError",
+    "WriteResult",
+    "apply_migrations",
+    "apply_profile",
+    "epoch_ms",
+    "read_meta",
+    "setup_fts",
 ]
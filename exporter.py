@@ -0,0 +1,169 @@
+"""Chunked, password-protected export archives for CryptoLockerBot.
+
+Archive layout::
+
+    MAGIC (6 bytes) | iterations (uint32) | salt length (uint8) | salt
+    then repeated: chunk length (uint32) | Fernet token
+
+Each token decrypts to a chunk index (uint32) and a final flag (uint8)
+followed by UTF-8 JSON lines, one credential per line. Binding the index
+and the flag into the authenticated payload lets the reader reject
+reordered, dropped or truncated chunks. Records are buffered only up to
+``chunk_size`` before being encrypted and written, so producing an
+archive needs constant memory.
+
+Archives can be decrypted offline with::
+
+    python -m exporter decrypt cryptolocker-export.clexp > vault.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import getpass
+import json
+import secrets
+import struct
+import sys
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from crypto import DEFAULT_ITERATIONS, EncryptionError, derive_key
+
+EXPORT_MAGIC = b"CLEXP2"
+DEFAULT_CHUNK_SIZE = 200
+_SALT_LENGTH = 16
+_U32 = struct.Struct(">I")
+_CHUNK_HEADER = struct.Struct(">IB")
+
+
+class ExportWriter:
+    """Write credentials to an encrypted export archive chunk by chunk."""
+
+    def __init__(
+        self,
+        fh: BinaryIO,
+        password: str,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        iterations: int = DEFAULT_ITERATIONS,
+    ):
+        salt = secrets.token_bytes(_SALT_LENGTH)
+        self._fh = fh
+        self._cipher = Fernet(derive_key(password, salt, iterations=iterations))
+        self._chunk_size = chunk_size
+        self._pending: List[bytes] = []
+        self._index = 0
+        self._closed = False
+        self.count = 0
+        fh.write(EXPORT_MAGIC + _U32.pack(iterations) + bytes([len(salt)]) + salt)
+
+    def write(self, name: str, username: str, password: str, extra: Optional[Dict[str, str]] = None) -> None:
+        record = {"name": name, "username": username, "password": password}
+        if extra:
+            record["extra"] = dict(extra)
+        self._pending.append(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+        self.count += 1
+        if len(self._pending) >= self._chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._write_chunk(final=False)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        # The final chunk is always written, even when empty, so a reader
+        # can tell a complete archive from one cut at a chunk boundary.
+        self._write_chunk(final=True)
+        self._closed = True
+        self._fh.flush()
+
+    def _write_chunk(self, *, final: bool) -> None:
+        payload = _CHUNK_HEADER.pack(self._index, final) + b"\n".join(self._pending)
+        token = self._cipher.encrypt(payload)
+        self._fh.write(_U32.pack(len(token)) + token)
+        self._pending.clear()
+        self._index += 1
+
+
+def _read_exact(fh: BinaryIO, size: int) -> bytes:
+    data = fh.read(size)
+    if len(data) != size:
+        raise EncryptionError("Export archive is truncated")
+    return data
+
+
+def read_export(path: str | Path, password: str) -> Iterator[dict]:
+    """Yield the records stored in an export archive.
+
+    Raises :class:`EncryptionError` for a wrong password and for archives
+    whose chunks were tampered with, reordered or truncated.
+    """
+    with open(path, "rb") as fh:
+        if fh.read(len(EXPORT_MAGIC)) != EXPORT_MAGIC:
+            raise EncryptionError("Not a CryptoLocker export archive")
+        (iterations,) = _U32.unpack(_read_exact(fh, _U32.size))
+        salt = _read_exact(fh, _read_exact(fh, 1)[0])
+        cipher = Fernet(derive_key(password, salt, iterations=iterations))
+        expected = 0
+        while True:
+            header = fh.read(_U32.size)
+            if len(header) != _U32.size:
+                raise EncryptionError("Export archive is truncated")
+            (length,) = _U32.unpack(header)
+            try:
+                payload = cipher.decrypt(_read_exact(fh, length))
+            except InvalidToken as exc:
+                raise EncryptionError("Wrong password or corrupted export archive") from exc
+            if len(payload) < _CHUNK_HEADER.size:
+                raise EncryptionError("Corrupted export archive")
+            index, final = _CHUNK_HEADER.unpack_from(payload)
+            if index != expected:
+                raise EncryptionError("Export archive chunks are out of order")
+            expected += 1
+            body = payload[_CHUNK_HEADER.size:]
+            if body:
+                for line in body.split(b"\n"):
+                    yield json.loads(line)
+            if final:
+                break
+        if fh.read(1):
+            raise EncryptionError("Unexpected data after the final export chunk")
+
+
+def _decrypt_command(args: argparse.Namespace) -> None:
+    password = getpass.getpass("Export password: ")
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for record in read_export(args.archive, password):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except EncryptionError as exc:
+        raise SystemExit(str(exc)) from exc
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Work with CryptoLocker export archives")
+    commands = parser.add_subparsers(dest="command", required=True)
+    decrypt = commands.add_parser("decrypt", help="Print the credentials of an archive as JSON lines")
+    decrypt.add_argument("archive", help="Path to a .clexp archive")
+    decrypt.add_argument("-o", "--output", help="Write to this file instead of standard output")
+    args = parser.parse_args()
+    _decrypt_command(args)
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "EXPORT_MAGIC",
+    "ExportWriter",
+    "read_export",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,11 @@ LANG_EN = {
     "PROMPT_REMOVE": "Select an account to remove.",
     "PROMPT_EDIT": "Select an account to edit.",
     "PROMPT_SHOW": "Select an account to display.",
+    "PROMPT_RECENT": "Recently changed accounts:",
     "SEARCH_RESULTS": "Select a result:",
+    "PROMPT_PICK": "Tap accounts to select them, then press Show selected.",
+    "PICK_EMPTY": "No accounts selected.",
+    "PICK_LIMIT": "Selection limit reached",
     "ASK_NEW_USERNAME": "Send the new username for {name}.",
     "ASK_NEW_PASSWORD": "Send the new password for {name}.",
     "BTN_EDIT_USERNAME": "Change username",
@@ -30,6 +34,17 @@ LANG_EN = {
     "EDIT_SUCCESS": "{field} updated for {name}.",
     "LANG_CHANGED_EN": "Language switched to English.",
     "LANG_CHANGED_FA": "Language switched to Persian.",
+    "ASK_IMPORT": "Send a CSV or JSON export (Bitwarden/KeePass) as a file.",
+    "IMPORT_STARTED": "Importing…",
+    "IMPORT_PROGRESS": "Importing… {count} entries saved so far.",
+    "IMPORT_DONE": "Import finished ✅ — {count} entries saved, {skipped} skipped.",
+    "IMPORT_FAILED": "Could not read that file. Send a CSV with name/username/password columns or a JSON export.",
+    "IMPORT_TOO_LARGE": "That file is too large to import (20 MB max).",
+    "EXPORT_USAGE": "Usage: /export <password> — the password (8+ characters) protects the export file.",
+    "EXPORT_STARTED": "Preparing your export…",
+    "EXPORT_DONE": "Encrypted export with {count} entries.",
+    "REBALANCE_NOT_SHARDED": "Sharding is not enabled (DB_SHARDS is 1).",
+    "REBALANCE_DONE": "Rebalanced {owners} users ({accounts} entries moved).",
     "NOT_ADMIN": "You are not the bot admin.",
     "ERR_GENERIC": "Something went wrong. Please try again.",
     "BTN_ADD": "Add",
@@ -37,9 +52,14 @@ LANG_EN = {
     "BTN_REMOVE": "Remove",
     "BTN_EDIT": "Edit",
     "BTN_SHOW": "Show",
+    "BTN_RECENT": "Recent",
     "BTN_YES_DELETE": "Yes, delete",
     "BTN_NO_CANCEL": "No, cancel",
     "BTN_CLOSE": "Close",
+    "BTN_PREV": "« Prev",
+    "BTN_NEXT": "Next »",
+    "BTN_SELECT_MANY": "Select several",
+    "BTN_SHOW_SELECTED": "Show selected ({count}/{limit})",
 }
 
 LANG_FA = {
@@ -58,7 +78,11 @@ LANG_FA = {
     "PROMPT_REMOVE": "اکانتی که می‌خوای حذف کنی را انتخاب کن.",
     "PROMPT_EDIT": "اکانتی که می‌خوای ویرایش کنی را انتخاب کن.",
     "PROMPT_SHOW": "اکانتی که می‌خوای ببینی را انتخاب کن.",
+    "PROMPT_RECENT": "اکانت‌هایی که اخیراً تغییر کرده‌اند:",
     "SEARCH_RESULTS": "یکی از نتایج را انتخاب کن:",
+    "PROMPT_PICK": "اکانت‌ها را برای انتخاب لمس کن، سپس «نمایش انتخاب‌شده‌ها» را بزن.",
+    "PICK_EMPTY": "هیچ اکانتی انتخاب نشده است.",
+    "PICK_LIMIT": "به حداکثر تعداد انتخاب رسیدی",
     "ASK_NEW_USERNAME": "نام‌کاربری جدید برای {name} را بفرست.",
     "ASK_NEW_PASSWORD": "رمز جدید برای {name} را بفرست.",
     "BTN_EDIT_USERNAME": "تغییر نام‌کاربری",
@@ -69,6 +93,17 @@ LANG_FA = {
     "EDIT_SUCCESS": "{field} برای {name} به‌روز شد.",
     "LANG_CHANGED_EN": "زبان به انگلیسی تغییر کرد.",
     "LANG_CHANGED_FA": "زبان به فارسی تغییر کرد.",
+    "ASK_IMPORT": "یک فایل خروجی CSV یا JSON (Bitwarden/KeePass) بفرست.",
+    "IMPORT_STARTED": "در حال وارد کردن…",
+    "IMPORT_PROGRESS": "در حال وارد کردن… تا الان {count} مورد ذخیره شد.",
+    "IMPORT_DONE": "وارد کردن تمام شد ✅ — {count} مورد ذخیره شد، {skipped} مورد رد شد.",
+    "IMPORT_FAILED": "این فایل قابل خواندن نیست. یک CSV با ستون‌های name/username/password یا یک خروجی JSON بفرست.",
+    "IMPORT_TOO_LARGE": "این فایل برای وارد کردن خیلی بزرگ است (حداکثر ۲۰ مگابایت).",
+    "EXPORT_USAGE": "استفاده: /export <رمز> — این رمز (حداقل ۸ کاراکتر) از فایل خروجی محافظت می‌کند.",
+    "EXPORT_STARTED": "در حال آماده‌سازی خروجی…",
+    "EXPORT_DONE": "خروجی رمزنگاری‌شده با {count} مورد.",
+    "REBALANCE_NOT_SHARDED": "شاردینگ فعال نیست (DB_SHARDS برابر ۱ است).",
+    "REBALANCE_DONE": "{owners} کاربر جابه‌جا شدند ({accounts} مورد منتقل شد).",
     "NOT_ADMIN": "تو ادمین بات نیستی.",
     "ERR_GENERIC": "مشکلی پیش اومد. دوباره تلاش کن.",
     "BTN_ADD": "افزودن",
@@ -76,9 +111,14 @@ LANG_FA = {
     "BTN_REMOVE": "حذف",
     "BTN_EDIT": "ویرایش",
     "BTN_SHOW": "نمایش",
+    "BTN_RECENT": "اخیر",
     "BTN_YES_DELETE": "بله، حذف شود",
     "BTN_NO_CANCEL": "خیر، انصراف",
     "BTN_CLOSE": "بستن",
+    "BTN_PREV": "« قبلی",
+    "BTN_NEXT": "بعدی »",
+    "BTN_SELECT_MANY": "انتخاب چندتایی",
+    "BTN_SHOW_SELECTED": "نمایش انتخاب‌شده‌ها ({count}/{limit})",
 }
 
 STRINGS: Dict[str, Dict[str, str]] = {
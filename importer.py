@@ -0,0 +1,115 @@
+"""Streaming parsers for credential import files.
+
+Supported inputs are CSV files with a header row (``name``/``title``,
+``username``/``login``, ``password`` columns, as produced by most password
+managers), Bitwarden JSON exports and KeePass-style JSON arrays.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+_NAME_COLUMNS = ("name", "title", "account")
+_USERNAME_COLUMNS = ("username", "login_username", "login", "user", "email")
+_PASSWORD_COLUMNS = ("password", "login_password", "pass")
+
+
+class ImportFormatError(Exception):
+    """Raised when an import file cannot be parsed."""
+
+
+@dataclass(slots=True)
+class ImportRecord:
+    name: str
+    username: str
+    password: str
+
+
+def _pick(row: dict, candidates: Iterable[str]) -> str:
+    for key in candidates:
+        value = row.get(key)
+        if value:
+            return str(value).strip()
+    return ""
+
+
+def iter_csv(stream: BinaryIO) -> Iterator[ImportRecord]:
+    """Yield records from a CSV export, one row at a time."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise ImportFormatError("CSV file has no header row")
+        columns = {name.strip().lower() for name in reader.fieldnames if name}
+        if not columns.intersection(_NAME_COLUMNS) or not columns.intersection(_PASSWORD_COLUMNS):
+            raise ImportFormatError("CSV header must include name and password columns")
+        for raw in reader:
+            row = {(key or "").strip().lower(): value for key, value in raw.items()}
+            yield ImportRecord(
+                name=_pick(row, _NAME_COLUMNS),
+                username=_pick(row, _USERNAME_COLUMNS),
+                password=_pick(row, _PASSWORD_COLUMNS),
+            )
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise ImportFormatError("Invalid CSV document") from exc
+
+
+def iter_json(stream: BinaryIO) -> Iterator[ImportRecord]:
+    """Yield records from a Bitwarden or KeePass-style JSON export.
+
+    The standard library has no incremental JSON parser, so the document is
+    decoded in one go; records are still produced lazily.
+    """
+    try:
+        document = json.load(stream)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise ImportFormatError("Invalid JSON document") from exc
+    if isinstance(document, dict):
+        entries = document.get("items", document.get("entries"))
+    else:
+        entries = document
+    if not isinstance(entries, list):
+        raise ImportFormatError("JSON export must contain a list of entries")
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        # Bitwarden nests credentials under "login"; KeePass exports are flat.
+        login = entry.get("login") if isinstance(entry.get("login"), dict) else entry
+        yield ImportRecord(
+            name=_pick(entry, _NAME_COLUMNS),
+            username=_pick(login, _USERNAME_COLUMNS),
+            password=_pick(login, _PASSWORD_COLUMNS),
+        )
+
+
+def iter_records(stream: BinaryIO, filename: str) -> Iterator[ImportRecord]:
+    """Dispatch to the parser matching ``filename``'s extension."""
+    lowered = filename.lower()
+    if lowered.endswith(".csv"):
+        return iter_csv(stream)
+    if lowered.endswith(".json"):
+        return iter_json(stream)
+    raise ImportFormatError(f"Unsupported import file: {filename}")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Split ``items`` into lists of at most ``size`` elements."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+__all__ = [
+    "ImportFormatError",
+    "ImportRecord",
+    "chunked",
+    "iter_csv",
+    "iter_json",
+    "iter_records",
+]
@@ -104,8 +104,12 @@ config_dir = os.environ["CRYPTOLOCKER_CONFIG_DIR"]
 os.makedirs(config_dir, exist_ok=True)
 db_path = os.environ["CRYPTOLOCKER_DB_PATH"]
 
-db = Database(db_path)
-asyncio.run(db.init())
+async def init_db() -> None:
+    db = Database(db_path)
+    await db.init()
+    await db.close()
+
+asyncio.run(init_db())
 PY
 
 SERVICE_FILE=/etc/systemd/system/cryptolocker.service
@@ -0,0 +1,205 @@
+"""Key-derivation calibration and per-vault KDF parameters.
+
+The KDF a vault was created with is stored in the database ``meta`` table
+under :data:`KDF_META_KEY`, so the unlock cost is a property of the
+deployment rather than of the code. New parameters for a vault that
+already holds a key are stored under :data:`KDF_NEXT_META_KEY` and take
+effect through a key rotation (see ``rotation.py``). :func:`calibrate` benchmarks PBKDF2,
+scrypt and Argon2id on the current host and picks parameters that hit a
+target derivation time.
+
+Run ``python kdf.py --help`` for the command-line tool.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from crypto import (
+    DEFAULT_KDF,
+    KDF_ARGON2ID,
+    KDF_PBKDF2,
+    KDF_SCRYPT,
+    EncryptionError,
+    KdfParams,
+    available_kdfs,
+    derive_key,
+)
+from db import Database, read_meta
+from sharding import ShardedDatabase
+
+KDF_META_KEY = "kdf"
+KDF_NEXT_META_KEY = "kdf.next"
+KEY_CHECK_META_KEY = "key_check"
+
+DEFAULT_TARGET_SECONDS = 0.5
+DEFAULT_MAX_MEMORY_KIB = 256 * 1024
+
+# Lower bounds that calibration never goes below, whatever the hardware
+# (OWASP password storage minimums).
+MIN_PBKDF2_ITERATIONS = 240_000
+MIN_SCRYPT_N = 2**15
+MIN_ARGON2_MEMORY_KIB = 19 * 1024
+MIN_ARGON2_TIME_COST = 2
+
+# Memory-hard algorithms first: preferred when several are available.
+PREFERENCE = (KDF_ARGON2ID, KDF_SCRYPT, KDF_PBKDF2)
+
+_PROBE_PASSPHRASE = "calibration"
+
+
+@dataclass(slots=True)
+class Calibration:
+    """Parameters chosen for one algorithm and their measured cost."""
+
+    params: KdfParams
+    seconds: float
+
+
+def time_kdf(params: KdfParams, salt: Optional[bytes] = None) -> float:
+    """Seconds one key derivation with ``params`` takes on this host."""
+    salt = salt if salt is not None else secrets.token_bytes(16)
+    started = time.perf_counter()
+    derive_key(_PROBE_PASSPHRASE, salt, kdf=params)
+    return time.perf_counter() - started
+
+
+def _calibrate_pbkdf2(target: float) -> KdfParams:
+    probe = KdfParams(KDF_PBKDF2, iterations=100_000)
+    per_iteration = time_kdf(probe) / probe.iterations
+    iterations = int(target / per_iteration) // 10_000 * 10_000
+    return KdfParams(KDF_PBKDF2, iterations=max(MIN_PBKDF2_ITERATIONS, iterations))
+
+
+def _calibrate_scrypt(target: float, max_memory_kib: int) -> KdfParams:
+    # scrypt cost is linear in n, which must be a power of two.
+    n = MIN_SCRYPT_N
+    per_unit = time_kdf(KdfParams(KDF_SCRYPT, iterations=1, memory_kib=n)) / n
+    while n * 2 <= max_memory_kib and n * 2 * per_unit <= target:
+        n *= 2
+    return KdfParams(KDF_SCRYPT, iterations=1, memory_kib=n)
+
+
+def _calibrate_argon2id(target: float, max_memory_kib: int) -> KdfParams:
+    # Spend the budget on memory first, then on passes over it.
+    memory = max(MIN_ARGON2_MEMORY_KIB, min(64 * 1024, max_memory_kib))
+    per_pass = time_kdf(KdfParams(KDF_ARGON2ID, iterations=1, memory_kib=memory))
+    while per_pass * MIN_ARGON2_TIME_COST > target and memory // 2 >= MIN_ARGON2_MEMORY_KIB:
+        memory //= 2
+        per_pass /= 2
+    while memory * 2 <= max_memory_kib and per_pass * 2 * MIN_ARGON2_TIME_COST <= target:
+        memory *= 2
+        per_pass *= 2
+    time_cost = max(MIN_ARGON2_TIME_COST, int(target / per_pass))
+    return KdfParams(KDF_ARGON2ID, iterations=time_cost, memory_kib=memory)
+
+
+def calibrate(
+    target: float = DEFAULT_TARGET_SECONDS,
+    *,
+    algorithms: Optional[List[str]] = None,
+    max_memory_kib: int = DEFAULT_MAX_MEMORY_KIB,
+) -> List[Calibration]:
+    """Pick parameters per algorithm so one derivation takes about ``target`` seconds.
+
+    Results are ordered by :data:`PREFERENCE`; each is re-measured with the
+    chosen parameters. Minimum costs are enforced even on slow hosts.
+    """
+    results = []
+    for algorithm in PREFERENCE:
+        if algorithm not in available_kdfs() or (algorithms and algorithm not in algorithms):
+            continue
+        if algorithm == KDF_PBKDF2:
+            params = _calibrate_pbkdf2(target)
+        elif algorithm == KDF_SCRYPT:
+            params = _calibrate_scrypt(target, max_memory_kib)
+        else:
+            params = _calibrate_argon2id(target, max_memory_kib)
+        results.append(Calibration(params=params, seconds=time_kdf(params)))
+    return results
+
+
+def load_stored_kdf(db_path: str | Path) -> Optional[KdfParams]:
+    """Read the vault's KDF parameters without opening a connection pool."""
+    raw = read_meta(db_path, KDF_META_KEY)
+    return KdfParams.from_json(raw) if raw is not None else None
+
+
+async def get_kdf(database: Database | ShardedDatabase) -> Optional[KdfParams]:
+    raw = await database.get_meta(KDF_META_KEY)
+    return KdfParams.from_json(raw) if raw is not None else None
+
+
+async def store_kdf(database: Database | ShardedDatabase, params: KdfParams) -> None:
+    await database.set_meta(KDF_META_KEY, params.to_json())
+
+
+async def _vault_is_empty(database: Database | ShardedDatabase) -> bool:
+    for owner_id in await database.list_owner_ids():
+        if await database.list_accounts(owner_id):
+            return False
+    return True
+
+
+async def _apply(db_path: str, shards: int, params: KdfParams) -> None:
+    database: Database | ShardedDatabase = (
+        ShardedDatabase(db_path, shards=shards) if shards > 1 else Database(db_path)
+    )
+    await database.init()
+    try:
+        if await database.get_meta(KEY_CHECK_META_KEY) is None and await _vault_is_empty(database):
+            # No key has been pinned or used yet: adopt the parameters directly.
+            await database.set_meta_many({KDF_META_KEY: params.to_json(), KDF_NEXT_META_KEY: None})
+            print(f"Stored {params.describe()}")
+        elif (await get_kdf(database) or DEFAULT_KDF) == params:
+            await database.set_meta_many({KDF_NEXT_META_KEY: None})
+            print("Vault already uses these parameters")
+        else:
+            # The KDF output is the vault key, so existing secrets must be
+            # re-encrypted; the bot does that on its next start.
+            await database.set_meta(KDF_NEXT_META_KEY, params.to_json())
+            print(f"Scheduled {params.describe()}; the vault is re-keyed in the background after the next restart")
+    finally:
+        await database.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate the vault key derivation for this host")
+    parser.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_SECONDS * 1000, help="Target unlock time")
+    parser.add_argument("--max-memory-mib", type=int, default=DEFAULT_MAX_MEMORY_KIB // 1024)
+    parser.add_argument("--algorithm", choices=PREFERENCE, action="append", help="Limit to these algorithms")
+    parser.add_argument("--apply", action="store_true", help="Store the preferred result in the database")
+    parser.add_argument("--db", help="Database path (defaults to DB_PATH from config.env)")
+    args = parser.parse_args()
+
+    results = calibrate(
+        args.target_ms / 1000,
+        algorithms=args.algorithm,
+        max_memory_kib=args.max_memory_mib * 1024,
+    )
+    for result in results:
+        print(f"{result.seconds * 1000:8.0f} ms  {result.params.describe()}")
+    if not args.apply:
+        return
+    config_path = Path.home() / ".cryptolocker" / "config.env"
+    load_dotenv(config_path if config_path.exists() else None)
+    db_path = args.db or os.getenv("DB_PATH")
+    if not db_path:
+        raise SystemExit("Pass --db or configure DB_PATH")
+    shards = int(os.getenv("DB_SHARDS") or 1)
+    try:
+        asyncio.run(_apply(db_path, shards, results[0].params))
+    except EncryptionError as exc:
+        raise SystemExit(str(exc)) from exc
+
+
+if __name__ == "__main__":
+    main()
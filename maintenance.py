@@ -0,0 +1,217 @@
+"""Background database maintenance tasks for CryptoLockerBot."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from db import CheckpointResult, Database
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+DEFAULT_CHECKPOINT_IDLE = 5.0
+DEFAULT_WAL_TRUNCATE_BYTES = 64 * 1024 * 1024
+DEFAULT_VACUUM_INTERVAL = 300.0
+DEFAULT_VACUUM_IDLE = 30.0
+DEFAULT_VACUUM_STEP_PAGES = 256
+DEFAULT_VACUUM_MIN_FREE_PAGES = 64
+DEFAULT_FTS_MERGE_PAGES = 64
+
+
+@dataclass(slots=True)
+class CheckpointStats:
+    """Metrics about WAL checkpoints run by the scheduler."""
+
+    passive: int = 0
+    truncates: int = 0
+    busy: int = 0
+    last_duration: float = 0.0
+    last_wal_size: int = 0
+
+
+class CheckpointScheduler:
+    """Keep the ``-wal`` file short without getting in the way of traffic.
+
+    Every ``interval`` seconds the WAL is checked. A ``PASSIVE`` checkpoint
+    runs once the database has seen no writes for ``idle_after`` seconds;
+    when the WAL grows past ``truncate_bytes`` a ``TRUNCATE`` checkpoint is
+    forced regardless of load so that the file shrinks back to zero.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        *,
+        interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+        idle_after: float = DEFAULT_CHECKPOINT_IDLE,
+        truncate_bytes: int = DEFAULT_WAL_TRUNCATE_BYTES,
+    ):
+        self.database = database
+        self.interval = interval
+        self.idle_after = idle_after
+        self.truncate_bytes = truncate_bytes
+        self.stats = CheckpointStats()
+        self._checkpointed_generation = -1
+        self._task: Optional[asyncio.Task] = None
+
+    def _choose_mode(self, wal_size: int) -> Optional[str]:
+        if wal_size >= self.truncate_bytes:
+            return "TRUNCATE"
+        if wal_size == 0 or self.database.write_generation == self._checkpointed_generation:
+            return None
+        if self.database.idle_for() >= self.idle_after:
+            return "PASSIVE"
+        return None
+
+    async def tick(self) -> Optional[CheckpointResult]:
+        """Run one checkpoint if one is due; returns its result."""
+        wal_size = self.database.wal_size()
+        self.stats.last_wal_size = wal_size
+        mode = self._choose_mode(wal_size)
+        if mode is None:
+            return None
+        started = time.perf_counter()
+        result = await self.database.checkpoint(mode)
+        self.stats.last_duration = time.perf_counter() - started
+        self._checkpointed_generation = self.database.write_generation
+        if mode == "TRUNCATE":
+            self.stats.truncates += 1
+        else:
+            self.stats.passive += 1
+        if result.busy:
+            self.stats.busy += 1
+        _LOGGER.debug(
+            "WAL checkpoint %s: %d bytes, %d/%d frames in %.1f ms",
+            mode,
+            wal_size,
+            result.checkpointed_frames,
+            result.log_frames,
+            self.stats.last_duration * 1000,
+        )
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception:
+                _LOGGER.exception("WAL checkpoint failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="db-checkpoint")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+@dataclass(slots=True)
+class VacuumStats:
+    """Metrics about incremental vacuum runs."""
+
+    runs: int = 0
+    pages_released: int = 0
+    free_pages: int = 0
+    last_duration: float = 0.0
+
+
+class VacuumScheduler:
+    """Return space left by deleted credentials without a blocking VACUUM.
+
+    While the database is idle, the FTS5 index is merged a little (folding
+    its deletion tombstones) and ``PRAGMA incremental_vacuum`` releases free
+    pages ``step_pages`` at a time. Work stops as soon as a write arrives, so
+    each step holds the writer only briefly.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        *,
+        interval: float = DEFAULT_VACUUM_INTERVAL,
+        idle_after: float = DEFAULT_VACUUM_IDLE,
+        step_pages: int = DEFAULT_VACUUM_STEP_PAGES,
+        min_free_pages: int = DEFAULT_VACUUM_MIN_FREE_PAGES,
+        merge_pages: int = DEFAULT_FTS_MERGE_PAGES,
+    ):
+        self.database = database
+        self.interval = interval
+        self.idle_after = idle_after
+        self.step_pages = step_pages
+        self.min_free_pages = min_free_pages
+        self.merge_pages = merge_pages
+        self.stats = VacuumStats()
+        self._task: Optional[asyncio.Task] = None
+
+    async def tick(self) -> int:
+        """Run bounded vacuum steps if idle; returns pages released."""
+        free = await self.database.freelist_count()
+        self.stats.free_pages = free
+        if free < self.min_free_pages or self.database.idle_for() < self.idle_after:
+            return 0
+        started = time.perf_counter()
+        await self.database.merge_search_index(self.merge_pages)
+        released = 0
+        while free >= self.min_free_pages:
+            generation = self.database.write_generation
+            remaining = await self.database.incremental_vacuum(self.step_pages)
+            progressed = remaining < free
+            released += max(0, free - remaining)
+            free = remaining
+            await asyncio.sleep(0)
+            # Our own step bumps the generation by one; anything more is traffic.
+            if not progressed or self.database.write_generation != generation + 1:
+                break
+        self.stats.runs += 1
+        self.stats.pages_released += released
+        self.stats.free_pages = free
+        self.stats.last_duration = time.perf_counter() - started
+        _LOGGER.debug("Incremental vacuum released %d pages, %d still free", released, free)
+        return released
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception:
+                _LOGGER.exception("Incremental vacuum failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="db-vacuum")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+__all__ = [
+    "CheckpointScheduler",
+    "CheckpointStats",
+    "DEFAULT_CHECKPOINT_IDLE",
+    "DEFAULT_CHECKPOINT_INTERVAL",
+    "DEFAULT_VACUUM_IDLE",
+    "DEFAULT_VACUUM_INTERVAL",
+    "DEFAULT_VACUUM_STEP_PAGES",
+    "DEFAULT_WAL_TRUNCATE_BYTES",
+    "VacuumScheduler",
+    "VacuumStats",
+]
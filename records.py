@@ -0,0 +1,213 @@
+"""Encrypted secret records for CryptoLockerBot.
+
+Every account stores its secret fields as one encrypted blob: a compact
+binary serialization encrypted with a single :func:`crypto.encrypt` call.
+The plaintext layout is::
+
+    version (1 byte) | field*
+
+    field := tag (1 byte) [name] value
+    name  := varint length | UTF-8 bytes     (only for ``TAG_CUSTOM``)
+    value := varint length | UTF-8 bytes
+
+Well-known fields use a one-byte tag, anything else is stored under
+``TAG_CUSTOM`` with its name, so new fields need no schema change. The
+version byte is bumped only if the framing itself changes.
+"""
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Dict, Final, Iterable, List, Optional, Protocol
+
+from crypto import (
+    EncryptionContext,
+    EncryptionError,
+    decrypt,
+    decrypt_bytes,
+    encrypt,
+    is_current,
+    map_chunks,
+)
+
+RECORD_VERSION: Final[int] = 1
+
+TAG_CUSTOM: Final[int] = 0
+TAG_USERNAME: Final[int] = 1
+TAG_PASSWORD: Final[int] = 2
+TAG_URL: Final[int] = 3
+TAG_NOTES: Final[int] = 4
+
+_KNOWN_FIELDS: Final[Dict[str, int]] = {"url": TAG_URL, "notes": TAG_NOTES}
+_KNOWN_TAGS: Final[Dict[int, str]] = {tag: name for name, tag in _KNOWN_FIELDS.items()}
+
+
+class RecordFormatError(EncryptionError):
+    """Raised when a decrypted record cannot be parsed."""
+
+
+@dataclass(slots=True)
+class SecretRecord:
+    """Decrypted secret fields of one account."""
+
+    username: str
+    password: str
+    extra: Dict[str, str] = field(default_factory=dict)
+    """Optional fields such as ``url`` or ``notes``, keyed by name."""
+
+
+class _StoredAccount(Protocol):
+    record: Optional[bytes]
+    username: bytes
+    password: bytes
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _put_text(out: bytearray, text: str) -> None:
+    data = text.encode("utf-8")
+    _put_varint(out, len(data))
+    out += data
+
+
+def pack_record(record: SecretRecord) -> bytes:
+    """Serialize ``record`` to its binary plaintext form."""
+    out = bytearray((RECORD_VERSION, TAG_USERNAME))
+    _put_text(out, record.username)
+    out.append(TAG_PASSWORD)
+    _put_text(out, record.password)
+    for name, value in record.extra.items():
+        tag = _KNOWN_FIELDS.get(name, TAG_CUSTOM)
+        out.append(tag)
+        if tag == TAG_CUSTOM:
+            _put_text(out, name)
+        _put_text(out, value)
+    return bytes(out)
+
+
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    def byte(self) -> int:
+        if self.pos >= len(self.data):
+            raise RecordFormatError("Truncated record")
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def varint(self) -> int:
+        value = shift = 0
+        while True:
+            byte = self.byte()
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def text(self) -> str:
+        length = self.varint()
+        end = self.pos + length
+        if end > len(self.data):
+            raise RecordFormatError("Truncated record")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        try:
+            return chunk.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            raise RecordFormatError("Record field is not valid UTF-8") from exc
+
+
+def unpack_record(data: bytes) -> SecretRecord:
+    """Parse the binary plaintext produced by :func:`pack_record`."""
+    reader = _Reader(data)
+    version = reader.byte()
+    if version != RECORD_VERSION:
+        raise RecordFormatError(f"Unsupported record version {version}")
+    username = password = ""
+    extra: Dict[str, str] = {}
+    while reader.pos < len(data):
+        tag = reader.byte()
+        if tag == TAG_USERNAME:
+            username = reader.text()
+        elif tag == TAG_PASSWORD:
+            password = reader.text()
+        elif tag == TAG_CUSTOM:
+            name = reader.text()
+            extra[name] = reader.text()
+        elif tag in _KNOWN_TAGS:
+            extra[_KNOWN_TAGS[tag]] = reader.text()
+        else:
+            raise RecordFormatError(f"Unknown record field tag {tag}")
+    return SecretRecord(username=username, password=password, extra=extra)
+
+
+def seal_record(record: SecretRecord, context: EncryptionContext) -> bytes:
+    """Serialize and encrypt ``record`` for storage."""
+    return encrypt(pack_record(record), context)
+
+
+def open_record(account: _StoredAccount, context: EncryptionContext) -> SecretRecord:
+    """Decrypt the secret fields of a stored account.
+
+    Rows written before records existed keep separately encrypted
+    ``username``/``password`` columns and no ``record``; they are read with
+    two decrypts until the account is next rewritten.
+    """
+    if account.record is None:
+        return SecretRecord(username=decrypt(account.username, context), password=decrypt(account.password, context))
+    return unpack_record(decrypt_bytes(account.record, context))
+
+
+def _seal_chunk(chunk: List[SecretRecord], context: EncryptionContext) -> List[bytes]:
+    return [seal_record(record, context) for record in chunk]
+
+
+def _open_chunk(chunk: List[_StoredAccount], context: EncryptionContext) -> List[SecretRecord]:
+    return [open_record(account, context) for account in chunk]
+
+
+async def seal_records(
+    records: Iterable[SecretRecord], context: EncryptionContext, *, executor: Optional[Executor] = None
+) -> List[bytes]:
+    """:func:`seal_record` for many records, in parallel on the crypto pool."""
+    return await map_chunks(partial(_seal_chunk, context=context), records, executor=executor)
+
+
+async def open_records(
+    accounts: Iterable[_StoredAccount], context: EncryptionContext, *, executor: Optional[Executor] = None
+) -> List[SecretRecord]:
+    """:func:`open_record` for many accounts, in parallel on the crypto pool."""
+    return await map_chunks(partial(_open_chunk, context=context), accounts, executor=executor)
+
+
+def needs_reseal(account: _StoredAccount, context: EncryptionContext) -> bool:
+    """Return whether the account should be re-encrypted with ``context``.
+
+    True for legacy per-field rows and for records sealed by another cipher
+    backend; both are migrated lazily when the account is next read.
+    """
+    return account.record is None or not is_current(account.record, context)
+
+
+__all__ = [
+    "RECORD_VERSION",
+    "RecordFormatError",
+    "SecretRecord",
+    "needs_reseal",
+    "open_record",
+    "open_records",
+    "pack_record",
+    "seal_record",
+    "seal_records",
+    "unpack_record",
+]
@@ -0,0 +1,342 @@
+"""Online master-key rotation for CryptoLockerBot.
+
+The vault key is derived from the passphrase, the salt file and the stored
+KDF parameters; changing any of them means every stored secret has to be
+re-encrypted. The ``meta`` table holds a *key check* (a known value
+encrypted with the current vault key), so startup can tell which key the
+vault is in:
+
+* it opens with the configured key: nothing to do;
+* it opens with the previous key (``PREVIOUS_ENCRYPTION_PASSPHRASE`` /
+  ``PREVIOUS_KEY_DERIVATION_SALT_FILE``, or the current ones when only
+  the KDF parameters changed through ``kdf.py --apply``):
+  the bot starts with both keys and :class:`KeyRotation` re-encrypts the
+  accounts in the background;
+* it opens with neither: the passphrase is wrong and startup fails.
+
+Rotation walks each database file in id order, ``batch_size`` rows per
+transaction, and commits its checkpoint with every batch, so it resumes
+where it stopped after a crash or restart. Once every row is re-encrypted,
+the new key check and KDF parameters are stored and the old key retires.
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from crypto import (
+    DEFAULT_CIPHER,
+    EncryptionContext,
+    EncryptionError,
+    KdfParams,
+    build_context,
+    decrypt_bytes,
+    encrypt,
+    is_current,
+    map_chunks,
+)
+from db import Account, Database, read_meta
+from kdf import KDF_META_KEY, KDF_NEXT_META_KEY, KEY_CHECK_META_KEY, load_stored_kdf
+from records import open_record, seal_record
+from sharding import ShardedDatabase
+
+_LOGGER = logging.getLogger(__name__)
+
+ROTATION_META_KEY = "rotation"
+
+DEFAULT_ROTATION_BATCH_SIZE = 200
+DEFAULT_ROTATION_PAUSE = 0.05
+
+_KEY_CHECK_PLAINTEXT = b"cryptolocker key check"
+_VERIFY_SAMPLE = 20
+
+
+@dataclass(slots=True)
+class VaultKey:
+    """Outcome of :func:`unlock_vault`."""
+
+    context: EncryptionContext
+    """Context for the configured key; carries the previous key while rotating."""
+    pinned: bool
+    """Whether the vault already stores its key check."""
+
+    @property
+    def rotating(self) -> bool:
+        return bool(self.context.retired)
+
+
+def key_check(context: EncryptionContext) -> str:
+    """Meta value proving that ``context`` holds the vault key."""
+    return encrypt(_KEY_CHECK_PLAINTEXT, context).hex()
+
+
+def _opens(check: str, context: EncryptionContext) -> bool:
+    try:
+        return decrypt_bytes(bytes.fromhex(check), context) == _KEY_CHECK_PLAINTEXT
+    except (EncryptionError, ValueError):
+        return False
+
+
+def unlock_vault(
+    db_path: str | Path,
+    passphrase: str,
+    salt_file: str | Path,
+    *,
+    backend: str = DEFAULT_CIPHER,
+    previous_passphrase: Optional[str] = None,
+    previous_salt_file: Optional[str | Path] = None,
+) -> VaultKey:
+    """Derive the vault key, and the previous one if a rotation is due.
+
+    Reads the vault file directly (no pool needed) and runs the KDF, so it
+    belongs in a worker thread. The previous passphrase and salt default to
+    the current ones, which covers a change of KDF parameters alone.
+    """
+    stored = load_stored_kdf(db_path)
+    check = read_meta(db_path, KEY_CHECK_META_KEY)
+    pending = read_meta(db_path, KDF_NEXT_META_KEY)
+    if check is None:
+        # Nothing pinned yet: existing rows, if any, use the stored parameters.
+        # pin_vault() checks the key against them before it is pinned.
+        current = build_context(passphrase, salt_file, kdf=stored, backend=backend)
+        target = KdfParams.from_json(pending) if pending is not None else stored
+        if target == stored:
+            return VaultKey(current, pinned=False)
+        # kdf.py --apply scheduled new parameters before the key was pinned.
+        context = build_context(passphrase, salt_file, kdf=target, backend=backend)
+        return VaultKey(dataclasses.replace(context, retired=(current,)), pinned=False)
+    target = KdfParams.from_json(pending) if pending is not None else stored
+    context = build_context(passphrase, salt_file, kdf=target, backend=backend)
+    if _opens(check, context):
+        return VaultKey(context, pinned=True)
+    previous = build_context(
+        previous_passphrase or passphrase,
+        previous_salt_file or salt_file,
+        kdf=stored,
+        backend=backend,
+    )
+    if not _opens(check, previous):
+        raise EncryptionError(
+            "Passphrase or salt does not match this vault "
+            "(set PREVIOUS_ENCRYPTION_PASSPHRASE / PREVIOUS_KEY_DERIVATION_SALT_FILE to rotate to a new key)"
+        )
+    return VaultKey(dataclasses.replace(context, retired=(previous,)), pinned=True)
+
+
+def _database_files(database: Database | ShardedDatabase) -> Sequence[Database]:
+    # Account ids are per file, so each shard is scanned on its own.
+    return database.shards if isinstance(database, ShardedDatabase) else [database]
+
+
+def _opens_any(accounts: List[Account], context: EncryptionContext) -> bool:
+    for account in accounts:
+        try:
+            open_record(account, context)
+        except EncryptionError:
+            continue
+        return True
+    return False
+
+
+async def verify_key(database: Database | ShardedDatabase, context: EncryptionContext) -> None:
+    """Raise :class:`EncryptionError` unless ``context``'s own key opens stored data.
+
+    The first ``_VERIFY_SAMPLE`` accounts of every file are tried; an empty
+    vault passes. Retired keys are ignored, so this also holds once a
+    rotation has finished.
+    """
+    current = dataclasses.replace(context, retired=())
+    sampled = False
+    for file in _database_files(database):
+        accounts = await file.scan_accounts(0, _VERIFY_SAMPLE)
+        if not accounts:
+            continue
+        sampled = True
+        if any(await map_chunks(lambda chunk: [_opens_any(chunk, current)], accounts)):
+            return
+    if sampled:
+        raise EncryptionError("Passphrase or salt does not match the secrets stored in this vault")
+
+
+async def pin_vault(database: Database | ShardedDatabase, context: EncryptionContext) -> None:
+    """Store the key check and KDF parameters of the key the vault is in.
+
+    That is ``context`` itself, which also clears any pending parameters and
+    rotation checkpoint. For a rotating ``context`` it is the retired key,
+    and both are kept so the rotation to ``context`` can run. Refuses with
+    :class:`EncryptionError` when the key cannot open any stored account
+    (see :func:`verify_key`).
+    """
+    vault = context.retired[0] if context.retired else context
+    await verify_key(database, vault)
+    values: Dict[str, Optional[str]] = {
+        KDF_META_KEY: vault.kdf.to_json(),
+        KEY_CHECK_META_KEY: key_check(vault),
+    }
+    if not context.retired:
+        values.update({KDF_NEXT_META_KEY: None, ROTATION_META_KEY: None})
+    await database.set_meta_many(values)
+
+
+def _reseal_batch(
+    accounts: List[Account], context: EncryptionContext
+) -> tuple[list[tuple[int, int, Optional[bytes], bytes]], int]:
+    """Re-encrypt the accounts not yet under the current key; runs on the crypto pool.
+
+    Returns the rows for :meth:`db.Database.reseal_accounts` and the number
+    of accounts no configured key could open.
+    """
+    current = dataclasses.replace(context, retired=())
+    rows = []
+    failed = 0
+    for account in accounts:
+        if account.record is not None and is_current(account.record, current):
+            try:
+                decrypt_bytes(account.record, current)
+                continue
+            except EncryptionError:
+                pass
+        try:
+            record = open_record(account, context)
+        except EncryptionError:
+            failed += 1
+            continue
+        rows.append((account.id, account.owner_id, account.record, seal_record(record, current)))
+    return rows, failed
+
+
+@dataclass(slots=True)
+class RotationStats:
+    """Progress of a key rotation."""
+
+    scanned: int = 0
+    rotated: int = 0
+    failed: int = 0
+    batches: int = 0
+    completed: bool = False
+    last_duration: float = 0.0
+
+
+class KeyRotation:
+    """Re-encrypt the vault from ``context.retired`` keys to ``context``'s key.
+
+    Each batch reads ``batch_size`` rows, re-encrypts them on the crypto
+    pool and swaps them in with one transaction that also saves the
+    checkpoint; rows changed meanwhile by the bot are left alone (they are
+    already under the new key). ``pause`` seconds between batches keep the
+    writer free for interactive traffic. ``on_complete`` runs once the new
+    key is pinned.
+    """
+
+    def __init__(
+        self,
+        database: Database | ShardedDatabase,
+        context: EncryptionContext,
+        *,
+        batch_size: int = DEFAULT_ROTATION_BATCH_SIZE,
+        pause: float = DEFAULT_ROTATION_PAUSE,
+        on_complete: Optional[Callable[[], None]] = None,
+    ):
+        self.database = database
+        self.context = context
+        self.batch_size = batch_size
+        self.pause = pause
+        self.on_complete = on_complete
+        self.stats = RotationStats()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def _files(self) -> Sequence[Database]:
+        return _database_files(self.database)
+
+    async def step(self, database: Database) -> int:
+        """Rotate one batch of ``database``; returns the number of rows scanned."""
+        raw = await database.get_meta(ROTATION_META_KEY)
+        after_id = json.loads(raw)["after_id"] if raw is not None else 0
+        accounts = await database.scan_accounts(after_id, self.batch_size)
+        if not accounts:
+            return 0
+        # One (rows, failed) result per chunk, computed on the crypto pool.
+        results = await map_chunks(lambda chunk: [_reseal_batch(chunk, self.context)], accounts)
+        rows = [row for chunk_rows, _ in results for row in chunk_rows]
+        failed = sum(chunk_failed for _, chunk_failed in results)
+        checkpoint = json.dumps({"after_id": accounts[-1].id})
+        self.stats.rotated += await database.reseal_accounts(rows, checkpoint=(ROTATION_META_KEY, checkpoint))
+        self.stats.scanned += len(accounts)
+        self.stats.failed += failed
+        self.stats.batches += 1
+        if failed:
+            _LOGGER.warning("Key rotation could not decrypt %d accounts; they are left unchanged", failed)
+        return len(accounts)
+
+    async def run(self) -> RotationStats:
+        """Rotate every file to the end, then retire the old key."""
+        started = time.perf_counter()
+        # Repeat until a full round finds nothing new: rows copied in by a
+        # shard move get fresh ids past the checkpoint of their new file.
+        while True:
+            progressed = False
+            for database in self._files:
+                while await self.step(database):
+                    progressed = True
+                    await asyncio.sleep(self.pause)
+            if not progressed:
+                break
+        # Checkpoints are cleared before the new key is pinned: a crash in
+        # between only means a quick re-scan on the next start.
+        for database in self._files[1:]:
+            await database.set_meta_many({ROTATION_META_KEY: None})
+        await pin_vault(self.database, dataclasses.replace(self.context, retired=()))
+        self.stats.completed = True
+        self.stats.last_duration = time.perf_counter() - started
+        _LOGGER.info(
+            "Key rotation finished: %d of %d accounts re-encrypted in %.1f s",
+            self.stats.rotated,
+            self.stats.scanned,
+            self.stats.last_duration,
+        )
+        if self.on_complete is not None:
+            self.on_complete()
+        return self.stats
+
+    async def _run(self) -> None:
+        try:
+            await self.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            _LOGGER.exception("Key rotation failed; it resumes from its checkpoint on the next start")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="key-rotation")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+__all__ = [
+    "DEFAULT_ROTATION_BATCH_SIZE",
+    "DEFAULT_ROTATION_PAUSE",
+    "KeyRotation",
+    "ROTATION_META_KEY",
+    "RotationStats",
+    "VaultKey",
+    "key_check",
+    "pin_vault",
+    "unlock_vault",
+    "verify_key",
+]
@@ -0,0 +1,411 @@
+"""Sharded storage: spread owners over several SQLite files.
+
+A single SQLite file admits one writer at a time. :class:`ShardedDatabase`
+routes every ``owner_id`` to one of N files with a consistent-hash ring, so
+each shard has its own writer connection and write throughput grows with
+the shard count. It exposes the same coroutine API as :class:`db.Database`.
+
+Placement normally follows the ring. Owners whose data lives elsewhere
+(for example after the shard count was raised) are pinned by overrides in
+``<db>.shards.json`` until :meth:`ShardedDatabase.rebalance` moves them.
+An unsharded database found at the base path is adopted as shard 0 the
+first time it is opened with shards, and its owners are pinned there.
+Run ``python sharding.py --help`` for the command-line tool.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from bisect import bisect_right
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from cache import CacheStats
+from db import (
+    DEFAULT_ITER_BATCH_SIZE,
+    DEFAULT_PAGE_SIZE,
+    Account,
+    AccountPage,
+    AccountSummary,
+    CheckpointResult,
+    Database,
+    PoolStats,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_VIRTUAL_NODES = 64
+
+
+class HashRing:
+    """Consistent-hash ring mapping integer keys to shard indexes."""
+
+    def __init__(self, shards: int, *, virtual_nodes: int = DEFAULT_VIRTUAL_NODES):
+        if shards < 1:
+            raise ValueError("At least one shard is required")
+        points = sorted(
+            (self._hash(f"shard-{shard}-vnode-{vnode}"), shard)
+            for shard in range(shards)
+            for vnode in range(virtual_nodes)
+        )
+        self._points = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def shard_for(self, key: int) -> int:
+        index = bisect_right(self._points, self._hash(str(key))) % len(self._points)
+        return self._shards[index]
+
+
+def shard_paths(db_path: str | Path, shards: int) -> List[Path]:
+    path = Path(db_path).expanduser()
+    return [path.with_name(f"{path.stem}.shard{index}{path.suffix or '.db'}") for index in range(shards)]
+
+
+def _map_path(db_path: str | Path) -> Path:
+    return Path(f"{Path(db_path).expanduser()}.shards.json")
+
+
+def _write_map(path: Path, shards: int, overrides: Dict[int, int]) -> None:
+    payload = {
+        "shards": shards,
+        "overrides": {str(owner): shard for owner, shard in sorted(overrides.items())},
+    }
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload, indent=2))
+    os.chmod(tmp, 0o600)
+    tmp.replace(path)
+
+
+def adopt_unsharded(db_path: str | Path, shards: int) -> bool:
+    """Turn an unsharded database at ``db_path`` into shard 0.
+
+    Called before the shards are opened when ``DB_SHARDS`` is raised above
+    one for the first time. The file is renamed rather than copied and the
+    map records a single previous shard, so opening the
+    :class:`ShardedDatabase` pins every existing owner to shard 0 until
+    :meth:`ShardedDatabase.rebalance` runs. Returns whether a file was
+    adopted; raises :class:`RuntimeError` if sharded files already exist
+    next to it, since the two cannot be merged automatically.
+    """
+    legacy = Path(db_path).expanduser()
+    if shards < 2 or not legacy.exists():
+        return False
+    paths = shard_paths(legacy, shards)
+    if _map_path(legacy).exists() or any(path.exists() for path in paths):
+        raise RuntimeError(
+            f"Unsharded database {legacy} exists next to sharded files; move it aside or merge it first"
+        )
+    # Fold the WAL into the main file so the rename carries every commit.
+    conn = sqlite3.connect(legacy)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    for suffix in ("-wal", "-shm"):
+        sidecar = Path(f"{legacy}{suffix}")
+        if sidecar.exists():
+            sidecar.replace(f"{paths[0]}{suffix}")
+    legacy.replace(paths[0])
+    _write_map(_map_path(legacy), 1, {})
+    _LOGGER.info("Adopted unsharded database %s as %s", legacy, paths[0])
+    return True
+
+
+class ShardedDatabase:
+    """Drop-in replacement for :class:`db.Database` backed by N SQLite files."""
+
+    def __init__(self, db_path: str | Path, *, shards: int, **database_options: Any):
+        self.db_path = str(Path(db_path).expanduser())
+        self.ring = HashRing(shards)
+        self.shards = [Database(path, **database_options) for path in shard_paths(self.db_path, shards)]
+        self._map_path = _map_path(self.db_path)
+        self._overrides: Dict[int, int] = {}
+        self._owner_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    # -- placement -----------------------------------------------------
+
+    def shard_index(self, owner_id: int) -> int:
+        return self._overrides.get(owner_id, self.ring.shard_for(owner_id))
+
+    def _shard(self, owner_id: int) -> Database:
+        return self.shards[self.shard_index(owner_id)]
+
+    def _save_map(self) -> None:
+        _write_map(self._map_path, len(self.shards), self._overrides)
+
+    async def _load_map(self) -> None:
+        if not self._map_path.exists():
+            self._save_map()
+            return
+        payload = json.loads(self._map_path.read_text())
+        self._overrides = {int(owner): int(shard) for owner, shard in payload.get("overrides", {}).items()}
+        previous = int(payload.get("shards", len(self.shards)))
+        if previous > len(self.shards):
+            raise RuntimeError(f"Database has {previous} shards; cannot open it with {len(self.shards)}")
+        if previous < len(self.shards):
+            # Shards were added: pin owners to where their rows are today so
+            # nothing moves until rebalance() is run.
+            for index, shard in enumerate(self.shards[:previous]):
+                for owner_id in await shard.list_owner_ids():
+                    if owner_id not in self._overrides and self.ring.shard_for(owner_id) != index:
+                        self._overrides[owner_id] = index
+            self._save_map()
+
+    # -- lifecycle and metrics -----------------------------------------
+
+    async def init(self) -> None:
+        await asyncio.to_thread(adopt_unsharded, self.db_path, len(self.shards))
+        await asyncio.gather(*(shard.init() for shard in self.shards))
+        await self._load_map()
+
+    async def close(self) -> None:
+        await asyncio.gather(*(shard.close() for shard in self.shards))
+
+    def pool_stats(self) -> PoolStats:
+        total = PoolStats()
+        for stats in (shard.pool_stats() for shard in self.shards):
+            total.acquisitions += stats.acquisitions
+            total.timeouts += stats.timeouts
+            total.total_wait += stats.total_wait
+            total.max_wait = max(total.max_wait, stats.max_wait)
+            total.busy_retries += stats.busy_retries
+        return total
+
+    @staticmethod
+    def _sum_cache_stats(all_stats: Iterable[CacheStats]) -> CacheStats:
+        total = CacheStats()
+        for stats in all_stats:
+            total.hits += stats.hits
+            total.misses += stats.misses
+            total.evictions += stats.evictions
+            total.size += stats.size
+            total.weight += stats.weight
+        return total
+
+    def lang_cache_stats(self) -> CacheStats:
+        return self._sum_cache_stats(shard.lang_cache_stats() for shard in self.shards)
+
+    def summary_cache_stats(self) -> CacheStats:
+        return self._sum_cache_stats(shard.summary_cache_stats() for shard in self.shards)
+
+    def owner_version(self, owner_id: int) -> int:
+        return self._shard(owner_id).owner_version(owner_id)
+
+    @property
+    def write_generation(self) -> int:
+        return sum(shard.write_generation for shard in self.shards)
+
+    def idle_for(self) -> float:
+        return min(shard.idle_for() for shard in self.shards)
+
+    def wal_size(self) -> int:
+        return max(shard.wal_size() for shard in self.shards)
+
+    async def checkpoint(self, mode: str = "PASSIVE") -> CheckpointResult:
+        results = await asyncio.gather(*(shard.checkpoint(mode) for shard in self.shards))
+        return CheckpointResult(
+            busy=any(result.busy for result in results),
+            log_frames=sum(result.log_frames for result in results),
+            checkpointed_frames=sum(result.checkpointed_frames for result in results),
+        )
+
+    async def freelist_count(self) -> int:
+        return sum(await asyncio.gather(*(shard.freelist_count() for shard in self.shards)))
+
+    async def incremental_vacuum(self, pages: int) -> int:
+        return sum(await asyncio.gather(*(shard.incremental_vacuum(pages) for shard in self.shards)))
+
+    async def merge_search_index(self, pages: int) -> None:
+        await asyncio.gather(*(shard.merge_search_index(pages) for shard in self.shards))
+
+    # -- users ---------------------------------------------------------
+
+    async def ensure_user(self, telegram_id: int) -> None:
+        async with self._owner_locks[telegram_id]:
+            await self._shard(telegram_id).ensure_user(telegram_id)
+
+    async def ensure_user_and_get_lang(self, telegram_id: int) -> str:
+        async with self._owner_locks[telegram_id]:
+            return await self._shard(telegram_id).ensure_user_and_get_lang(telegram_id)
+
+    async def get_user_lang(self, telegram_id: int) -> str:
+        return await self._shard(telegram_id).get_user_lang(telegram_id)
+
+    async def set_user_lang(self, telegram_id: int, lang: str) -> None:
+        async with self._owner_locks[telegram_id]:
+            await self._shard(telegram_id).set_user_lang(telegram_id, lang)
+
+    async def list_owner_ids(self) -> List[int]:
+        owners: set[int] = set()
+        for ids in await asyncio.gather(*(shard.list_owner_ids() for shard in self.shards)):
+            owners.update(ids)
+        return sorted(owners)
+
+    # -- metadata ------------------------------------------------------
+
+    # Vault-wide settings live in the first shard.
+
+    async def get_meta(self, key: str) -> Optional[str]:
+        return await self.shards[0].get_meta(key)
+
+    async def set_meta(self, key: str, value: str) -> None:
+        await self.shards[0].set_meta(key, value)
+
+    async def set_meta_many(self, values: Dict[str, Optional[str]]) -> None:
+        await self.shards[0].set_meta_many(values)
+
+    # -- accounts ------------------------------------------------------
+
+    async def add_account(self, owner_id: int, name: str, record: bytes) -> int:
+        async with self._owner_locks[owner_id]:
+            return await self._shard(owner_id).add_account(owner_id, name, record)
+
+    async def add_accounts_bulk(self, owner_id: int, rows: Iterable[tuple[str, bytes]]) -> int:
+        async with self._owner_locks[owner_id]:
+            return await self._shard(owner_id).add_accounts_bulk(owner_id, rows)
+
+    async def list_accounts(self, owner_id: int) -> List[AccountSummary]:
+        return await self._shard(owner_id).list_accounts(owner_id)
+
+    async def search_accounts(self, owner_id: int, query: str) -> List[AccountSummary]:
+        return await self._shard(owner_id).search_accounts(owner_id, query)
+
+    async def list_accounts_page(
+        self,
+        owner_id: int,
+        *,
+        after: Optional[tuple[str, int]] = None,
+        before: Optional[tuple[str, int]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> AccountPage:
+        return await self._shard(owner_id).list_accounts_page(owner_id, after=after, before=before, limit=limit)
+
+    async def search_accounts_page(
+        self,
+        owner_id: int,
+        query: str,
+        *,
+        after: Optional[tuple[str, int]] = None,
+        before: Optional[tuple[str, int]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> AccountPage:
+        return await self._shard(owner_id).search_accounts_page(owner_id, query, after=after, before=before, limit=limit)
+
+    async def list_recent_accounts(self, owner_id: int, *, limit: int = DEFAULT_PAGE_SIZE) -> List[AccountSummary]:
+        return await self._shard(owner_id).list_recent_accounts(owner_id, limit=limit)
+
+    async def changed_since(self, owner_id: int, ts: int) -> List[AccountSummary]:
+        return await self._shard(owner_id).changed_since(owner_id, ts)
+
+    async def get_account_summary(self, account_id: int, owner_id: int) -> Optional[AccountSummary]:
+        return await self._shard(owner_id).get_account_summary(account_id, owner_id)
+
+    async def get_account(self, account_id: int, owner_id: int) -> Optional[Account]:
+        return await self._shard(owner_id).get_account(account_id, owner_id)
+
+    async def get_accounts(self, owner_id: int, ids: Iterable[int]) -> List[Account]:
+        return await self._shard(owner_id).get_accounts(owner_id, ids)
+
+    async def iter_accounts(self, owner_id: int, *, batch_size: int = DEFAULT_ITER_BATCH_SIZE) -> AsyncIterator[Account]:
+        async for account in self._shard(owner_id).iter_accounts(owner_id, batch_size=batch_size):
+            yield account
+
+    async def delete_account(self, account_id: int, owner_id: int) -> bool:
+        async with self._owner_locks[owner_id]:
+            return await self._shard(owner_id).delete_account(account_id, owner_id)
+
+    async def update_account_record(self, account_id: int, owner_id: int, record: bytes) -> bool:
+        async with self._owner_locks[owner_id]:
+            return await self._shard(owner_id).update_account_record(account_id, owner_id, record)
+
+    async def reseal_account(self, account_id: int, owner_id: int, old_record: Optional[bytes], record: bytes) -> bool:
+        async with self._owner_locks[owner_id]:
+            return await self._shard(owner_id).reseal_account(account_id, owner_id, old_record, record)
+
+    # -- rebalancing ---------------------------------------------------
+
+    async def move_owner(self, owner_id: int, target: int) -> int:
+        """Move one owner's rows to shard ``target`` while the bot runs.
+
+        The owner's writes wait for the move; reads keep being served from
+        the source shard until the copy is committed. Account ids are
+        reassigned by the target shard. Returns the number of moved accounts.
+        """
+        if not 0 <= target < len(self.shards):
+            raise ValueError(f"No shard {target}")
+        async with self._owner_locks[owner_id]:
+            source_index = self.shard_index(owner_id)
+            if source_index == target:
+                return 0
+            source, destination = self.shards[source_index], self.shards[target]
+            lang = await source.get_user_lang(owner_id)
+            accounts = [account async for account in source.iter_accounts(owner_id)]
+            await destination.purge_owner(owner_id)
+            moved = await destination.restore_owner(owner_id, lang, accounts)
+            if target == self.ring.shard_for(owner_id):
+                self._overrides.pop(owner_id, None)
+            else:
+                self._overrides[owner_id] = target
+            self._save_map()
+            await source.purge_owner(owner_id)
+        _LOGGER.info("Moved owner %s from shard %d to %d (%d accounts)", owner_id, source_index, target, moved)
+        return moved
+
+    async def rebalance(self) -> Dict[int, int]:
+        """Move every pinned owner to its ring shard; returns moved counts."""
+        moved = {}
+        for owner_id in list(self._overrides):
+            moved[owner_id] = await self.move_owner(owner_id, self.ring.shard_for(owner_id))
+        return moved
+
+
+__all__ = [
+    "HashRing",
+    "ShardedDatabase",
+    "adopt_unsharded",
+    "shard_paths",
+]
+
+
+async def _main(args: argparse.Namespace) -> None:
+    database = ShardedDatabase(args.db, shards=args.shards)
+    await database.init()
+    try:
+        if args.command == "rebalance":
+            moved = await database.rebalance()
+            print(f"Rebalanced {len(moved)} owners ({sum(moved.values())} accounts)")
+        elif args.command == "move":
+            count = await database.move_owner(args.owner, args.target)
+            print(f"Moved {count} accounts of owner {args.owner} to shard {args.target}")
+        else:
+            for owner_id in await database.list_owner_ids():
+                print(f"{owner_id}\tshard {database.shard_index(owner_id)}")
+    finally:
+        await database.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and rebalance sharded CryptoLocker databases")
+    parser.add_argument("--db", required=True, help="Base database path (DB_PATH)")
+    parser.add_argument("--shards", type=int, required=True, help="Number of shards (DB_SHARDS)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show the shard of every owner")
+    commands.add_parser("rebalance", help="Move pinned owners to their hash-ring shard")
+    move = commands.add_parser("move", help="Move one owner to a given shard")
+    move.add_argument("owner", type=int)
+    move.add_argument("target", type=int)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Dedicated SQLite connection threads for CryptoLockerBot.
+
+A :class:`SQLiteWorker` owns one ``sqlite3`` connection on one long-lived
+thread. Callers submit whole operations (``fn(conn, *args)``) that run on
+that thread in FIFO order, so a query and its fetch cost a single hop from
+the event loop instead of one hop per cursor call.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+from typing import Any, Callable, Optional, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_BUSY_RETRIES = 5
+DEFAULT_BUSY_BACKOFF = 0.01
+MAX_BUSY_BACKOFF = 0.5
+
+_BUSY_CODES = frozenset({sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED})
+
+
+def is_busy_error(exc: BaseException) -> bool:
+    """Return whether ``exc`` is SQLITE_BUSY/SQLITE_LOCKED, including extended codes."""
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    code = getattr(exc, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in _BUSY_CODES
+    message = str(exc)
+    return "database is locked" in message or "database table is locked" in message
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class SQLiteWorker:
+    """One thread owning one SQLite connection.
+
+    ``setup`` runs on the thread right after connecting (PRAGMAs and the
+    like). Operations that fail with SQLITE_BUSY are retried with
+    exponential backoff; any transaction an operation leaves open after
+    raising is rolled back first, so operations must be safe to re-run.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        name: str = "sqlite-worker",
+        setup: Optional[Callable[[sqlite3.Connection], None]] = None,
+        busy_retries: int = DEFAULT_BUSY_RETRIES,
+        busy_backoff: float = DEFAULT_BUSY_BACKOFF,
+    ):
+        self.db_path = db_path
+        self.name = name
+        self.busy_retries = busy_retries
+        self.busy_backoff = busy_backoff
+        self.retries = 0
+        self._setup = setup
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    async def start(self) -> None:
+        """Start the thread and wait until its connection is ready."""
+        if self._thread is not None:
+            return
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        self._thread = threading.Thread(target=self._main, args=(loop, ready), name=self.name, daemon=True)
+        self._thread.start()
+        try:
+            await ready
+        except BaseException:
+            self._thread = None
+            raise
+
+    async def close(self) -> None:
+        """Close the connection after queued operations and stop the thread."""
+        if self._thread is None:
+            return
+        thread, self._thread = self._thread, None
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put((None, (), future, asyncio.get_running_loop()))
+        await future
+        thread.join()
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(conn, *args)`` on the worker thread and return its result."""
+        attempt = 0
+        while True:
+            try:
+                return await self._submit(fn, args)
+            except sqlite3.OperationalError as exc:
+                if attempt >= self.busy_retries or not is_busy_error(exc):
+                    raise
+            self.retries += 1
+            await asyncio.sleep(min(self.busy_backoff * 2 ** attempt, MAX_BUSY_BACKOFF))
+            attempt += 1
+
+    async def _submit(self, fn: Callable[..., T], args: tuple) -> T:
+        if self._thread is None:
+            raise RuntimeError(f"{self.name} is not running")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((fn, args, future, loop))
+        return await future
+
+    def _main(self, loop: asyncio.AbstractEventLoop, ready: asyncio.Future) -> None:
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            if self._setup is not None:
+                self._setup(conn)
+        except BaseException as exc:
+            loop.call_soon_threadsafe(_resolve, ready, None, exc)
+            return
+        loop.call_soon_threadsafe(_resolve, ready, None, None)
+        while True:
+            fn, args, future, caller_loop = self._queue.get()
+            if fn is None:
+                conn.close()
+                caller_loop.call_soon_threadsafe(_resolve, future, None, None)
+                return
+            result = error = None
+            try:
+                result = fn(conn, *args)
+            except BaseException as exc:
+                error = exc
+                if conn.in_transaction:
+                    conn.rollback()
+            try:
+                caller_loop.call_soon_threadsafe(_resolve, future, result, error)
+            except RuntimeError:
+                # The caller's loop closed while the operation ran.
+                _LOGGER.debug("Dropping result for closed event loop on %s", self.name)
+
+
+__all__ = [
+    "DEFAULT_BUSY_BACKOFF",
+    "DEFAULT_BUSY_RETRIES",
+    "SQLiteWorker",
+    "is_busy_error",
+]
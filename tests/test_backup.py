@@ -0,0 +1,53 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from backup import BackupManager
+from db import Database
+
+
+class BackupTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "cryptolocker.db")
+        self.database = Database(self.db_path)
+        await self.database.init()
+        await self.database.ensure_user(1)
+        await self.database.add_accounts_bulk(1, [(f"Entry {index}", b"r" * 128) for index in range(500)])
+
+    async def asyncTearDown(self) -> None:
+        await self.database.close()
+        self.temp_dir.cleanup()
+
+    async def test_snapshot_while_serving_and_rotation(self) -> None:
+        manager = BackupManager(self.db_path, os.path.join(self.temp_dir.name, "backups"), pages_per_step=2, keep=2)
+        for _ in range(3):
+            path = await manager.run_once()
+            await self.database.add_account(1, "During backup", b"r")
+        self.assertEqual(len(manager.snapshots()), 2)
+        self.assertEqual(manager.stats.completed, 3)
+        self.assertGreater(manager.stats.last_size, 0)
+        with sqlite3.connect(path) as conn:
+            self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0], 502)
+
+    async def test_source_path_with_uri_characters(self) -> None:
+        source_dir = os.path.join(self.temp_dir.name, "vault #1?")
+        os.mkdir(source_dir)
+        source_path = os.path.join(source_dir, "cryptolocker.db")
+        database = Database(source_path)
+        await database.init()
+        try:
+            await database.ensure_user(1)
+            await database.add_account(1, "Bank", b"r")
+            manager = BackupManager(source_path, os.path.join(self.temp_dir.name, "backups"))
+            path = await manager.run_once()
+        finally:
+            await database.close()
+        with sqlite3.connect(path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0], 1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from cache import LRUCache
+
+
+class LRUCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used(self) -> None:
+        cache: LRUCache[int, str] = LRUCache(2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        self.assertEqual(cache.get(1), "a")
+        cache.put(3, "c")
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), "c")
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions, stats.size), (2, 1, 1, 2))
+
+    def test_weight_cap(self) -> None:
+        cache: LRUCache[str, list] = LRUCache(10, max_weight=5)
+        self.assertTrue(cache.put("a", [1, 2, 3], weight=3))
+        self.assertTrue(cache.put("b", [1, 2], weight=2))
+        self.assertTrue(cache.put("c", [1], weight=1))
+        self.assertIsNone(cache.get("a"))
+        self.assertFalse(cache.put("huge", [0] * 6, weight=6))
+        self.assertEqual(cache.stats().weight, 3)
+
+    def test_rejects_empty_capacity(self) -> None:
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
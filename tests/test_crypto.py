@@ -1,8 +1,30 @@
+import base64
 import os
 import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
-from crypto import build_context, decrypt, encrypt
+from crypto import (
+    CIPHER_AES_GCM,
+    CIPHER_CHACHA20,
+    CIPHER_FERNET,
+    KDF_ARGON2ID,
+    KDF_SCRYPT,
+    EncryptionError,
+    KdfParams,
+    available_kdfs,
+    build_context,
+    ciphertext_backend,
+    decrypt,
+    decrypt_bytes_many,
+    derive_key,
+    encrypt,
+    encrypt_many,
+    is_compact,
+    is_current,
+    iter_decrypt_bytes,
+)
 
 
 class CryptoTests(unittest.TestCase):
@@ -23,6 +45,124 @@ class CryptoTests(unittest.TestCase):
         recovered = decrypt(ciphertext, self.context)
         self.assertEqual(recovered, plaintext)
 
+    def test_compact_format_is_smaller_and_fernet_compatible(self) -> None:
+        self.context = build_context("test-passphrase", self.salt_path, backend=CIPHER_FERNET)
+        ciphertext = encrypt("secret123", self.context)
+        self.assertTrue(is_compact(ciphertext))
+        legacy = self.context.cipher.encrypt(b"secret123")
+        self.assertLess(len(ciphertext), len(legacy))
+        # A compact blob is a Fernet token without the base64 layer.
+        self.assertEqual(self.context.cipher.decrypt(base64.urlsafe_b64encode(ciphertext)), b"secret123")
+
+    def test_decrypts_legacy_tokens(self) -> None:
+        legacy = self.context.cipher.encrypt("old-row".encode("utf-8"))
+        self.assertFalse(is_compact(legacy))
+        self.assertEqual(decrypt(legacy, self.context), "old-row")
+
+    def test_aead_backends_are_versioned_and_read_by_any_context(self) -> None:
+        fernet = build_context("test-passphrase", self.salt_path, backend=CIPHER_FERNET)
+        chacha = build_context("test-passphrase", self.salt_path, backend=CIPHER_CHACHA20)
+        self.assertEqual(self.context.backend, CIPHER_AES_GCM)
+        gcm_blob = encrypt("secret123", self.context)
+        chacha_blob = encrypt("secret123", chacha)
+        fernet_blob = encrypt("secret123", fernet)
+        self.assertEqual(ciphertext_backend(gcm_blob), CIPHER_AES_GCM)
+        self.assertEqual(ciphertext_backend(chacha_blob), CIPHER_CHACHA20)
+        self.assertEqual(ciphertext_backend(fernet_blob), CIPHER_FERNET)
+        self.assertEqual(len(gcm_blob), 1 + 12 + len("secret123") + 16)
+        self.assertLess(len(gcm_blob), len(fernet_blob))
+        for context in (self.context, chacha, fernet):
+            for blob in (gcm_blob, chacha_blob, fernet_blob):
+                self.assertEqual(decrypt(blob, context), "secret123")
+        self.assertTrue(is_current(gcm_blob, self.context))
+        self.assertFalse(is_current(fernet_blob, self.context))
+        self.assertFalse(is_current(gcm_blob, chacha))
+
+    def test_aead_instances_are_cached_per_context(self) -> None:
+        encrypt("secret123", self.context)
+        self.assertEqual(list(self.context._aeads), [0x01])
+        other = build_context("test-passphrase", self.salt_path)
+        self.assertEqual(other._aeads, {})
+
+    def test_tampered_aead_ciphertext_is_rejected(self) -> None:
+        ciphertext = bytearray(encrypt("secret123", self.context))
+        ciphertext[0] = 0x02  # claims ChaCha20-Poly1305; the header is authenticated
+        with self.assertRaises(EncryptionError):
+            decrypt(bytes(ciphertext), self.context)
+        with self.assertRaises(EncryptionError):
+            decrypt(encrypt("secret123", self.context)[:20], self.context)
+
+    def test_tampered_compact_ciphertext_is_rejected(self) -> None:
+        fernet = build_context("test-passphrase", self.salt_path, backend=CIPHER_FERNET)
+        ciphertext = bytearray(encrypt("secret123", fernet))
+        ciphertext[30] ^= 0x01
+        with self.assertRaises(EncryptionError):
+            decrypt(bytes(ciphertext), fernet)
+
+    def test_memory_hard_kdfs_derive_distinct_keys(self) -> None:
+        salt = b"0123456789abcdef"
+        scrypt = KdfParams(KDF_SCRYPT, iterations=1, memory_kib=1024)
+        keys = {derive_key("test-passphrase", salt, kdf=scrypt), derive_key("test-passphrase", salt)}
+        if KDF_ARGON2ID in available_kdfs():
+            keys.add(derive_key("test-passphrase", salt, kdf=KdfParams(KDF_ARGON2ID, iterations=1, memory_kib=1024)))
+        self.assertEqual(len(keys), len(available_kdfs()))
+        context = build_context("test-passphrase", self.salt_path, kdf=scrypt)
+        self.assertEqual(context.kdf, scrypt)
+        self.assertEqual(decrypt(encrypt("secret123", context), context), "secret123")
+
+    def test_kdf_params_json_roundtrip(self) -> None:
+        params = KdfParams(KDF_SCRYPT, iterations=1, memory_kib=2**15, parallelism=2)
+        self.assertEqual(KdfParams.from_json(params.to_json()), params)
+        with self.assertRaises(EncryptionError):
+            KdfParams.from_json('{"algorithm": "md5"}')
+        with self.assertRaises(EncryptionError):
+            KdfParams(KDF_SCRYPT, memory_kib=1000)
+
+
+class BatchCryptoTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        salt_path = os.path.join(self.temp_dir.name, "salt")
+        with open(salt_path, "wb") as fh:
+            fh.write(b"0123456789abcdef")
+        self.context = build_context("test-passphrase", salt_path)
+        self.executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="test-crypto")
+
+    async def asyncTearDown(self) -> None:
+        self.executor.shutdown()
+        self.temp_dir.cleanup()
+
+    async def test_many_roundtrip_keeps_order(self) -> None:
+        plaintexts = [f"secret {index}" for index in range(250)]
+        ciphertexts = await encrypt_many(plaintexts, self.context, executor=self.executor, chunk_size=16)
+        self.assertEqual(len(set(ciphertexts)), len(plaintexts))
+        self.assertEqual(decrypt(ciphertexts[17], self.context), "secret 17")
+        recovered = await decrypt_bytes_many(ciphertexts, self.context, executor=self.executor, chunk_size=16)
+        self.assertEqual(recovered, [value.encode() for value in plaintexts])
+        self.assertEqual(await decrypt_bytes_many([], self.context), [])
+
+    async def test_many_raises_on_bad_ciphertext(self) -> None:
+        ciphertexts = await encrypt_many(["a", "b", "c"], self.context)
+        with self.assertRaises(EncryptionError):
+            await decrypt_bytes_many([*ciphertexts, b"\x01garbage"], self.context, chunk_size=2)
+
+    async def test_iter_decrypt_streams_async_input_in_order(self) -> None:
+        ciphertexts = await encrypt_many([str(index) for index in range(100)], self.context, executor=self.executor)
+        threads = set()
+
+        async def source():
+            for ciphertext in ciphertexts:
+                threads.add(threading.current_thread().name)
+                yield ciphertext
+
+        stream = iter_decrypt_bytes(source(), self.context, executor=self.executor, chunk_size=7, max_pending=2)
+        self.assertEqual([int(value) async for value in stream], list(range(100)))
+        self.assertEqual(threads, {threading.current_thread().name})
+
+        stream = iter_decrypt_bytes(ciphertexts, self.context, chunk_size=5)
+        self.assertEqual(await anext(stream), b"0")
+        await stream.aclose()
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -1,9 +1,21 @@
 import asyncio
 import os
+import sqlite3
 import tempfile
 import unittest
 
-from db import Database
+from db import (
+    CHANGED_SINCE_SQL,
+    LIST_ACCOUNTS_SQL,
+    MULTI_GET_CHUNK,
+    RECENT_ACCOUNTS_SQL,
+    SCHEMA_VERSION,
+    SEARCH_ACCOUNTS_SQL,
+    Database,
+    PoolTimeoutError,
+    epoch_ms,
+    read_meta,
+)
 
 
 class DatabaseTests(unittest.IsolatedAsyncioTestCase):
@@ -16,14 +28,13 @@ class DatabaseTests(unittest.IsolatedAsyncioTestCase):
         await self.database.ensure_user(self.user_id)
 
     async def asyncTearDown(self) -> None:
+        await self.database.close()
         self.temp_dir.cleanup()
 
     async def test_account_crud_flow(self) -> None:
-        username = b"user"
-        password = b"pass"
         account_name = "Email"
 
-        account_id = await self.database.add_account(self.user_id, account_name, username, password)
+        account_id = await self.database.add_account(self.user_id, account_name, b"sealed")
         self.assertIsInstance(account_id, int)
 
         accounts = await self.database.list_accounts(self.user_id)
@@ -37,15 +48,310 @@ class DatabaseTests(unittest.IsolatedAsyncioTestCase):
         account = await self.database.get_account(account_id, self.user_id)
         self.assertIsNotNone(account)
         self.assertEqual(account.name, account_name)
+        self.assertEqual(account.record, b"sealed")
 
-        updated = await self.database.update_account_field(account_id, self.user_id, field="password", value=b"newpass")
+        updated = await self.database.update_account_record(account_id, self.user_id, b"resealed")
         self.assertTrue(updated)
+        account = await self.database.get_account(account_id, self.user_id)
+        self.assertEqual(account.record, b"resealed")
 
         deleted = await self.database.delete_account(account_id, self.user_id)
         self.assertTrue(deleted)
         remaining = await self.database.list_accounts(self.user_id)
         self.assertEqual(len(remaining), 0)
 
+    async def test_pool_reuses_connections(self) -> None:
+        await self.database.list_accounts(self.user_id)
+        await self.database.get_user_lang(self.user_id)
+        stats = self.database.pool_stats()
+        self.assertGreaterEqual(stats.acquisitions, 3)
+        self.assertEqual(stats.timeouts, 0)
+
+    async def test_reader_acquire_timeout(self) -> None:
+        database = Database(os.path.join(self.temp_dir.name, "tiny.db"), pool_size=1, acquire_timeout=0.05)
+        await database.init()
+        try:
+            async with database._reader():
+                with self.assertRaises(PoolTimeoutError):
+                    await database.list_accounts(self.user_id)
+            self.assertEqual(database.pool_stats().timeouts, 1)
+        finally:
+            await database.close()
+
+    async def test_migrations_set_user_version(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        self.assertEqual(version, SCHEMA_VERSION)
+        await self.database.close()
+        await self.database.init()
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+
+    async def test_list_and_search_use_indexes(self) -> None:
+        for index in range(50):
+            await self.database.add_account(self.user_id, f"entry-{index}", b"r")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("ANALYZE")
+            for sql, params in ((LIST_ACCOUNTS_SQL, (self.user_id,)), (SEARCH_ACCOUNTS_SQL, (self.user_id, "%ry%"))):
+                plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+                self.assertIn("idx_accounts_owner_name", plan)
+                self.assertNotIn("SCAN", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+    async def test_full_text_search_folds_unicode_case(self) -> None:
+        if not self.database.fts_enabled:
+            self.skipTest("SQLite built without FTS5")
+        first = await self.database.add_account(self.user_id, "École Portal", b"r")
+        await self.database.add_account(self.user_id, "Bank", b"r")
+        results = await self.database.search_accounts(self.user_id, "éco")
+        self.assertEqual([entry.id for entry in results], [first])
+
+        await self.database.delete_account(first, self.user_id)
+        self.assertEqual(await self.database.search_accounts(self.user_id, "éco"), [])
+
+    async def test_short_query_falls_back_to_like(self) -> None:
+        account_id = await self.database.add_account(self.user_id, "Email", b"r")
+        results = await self.database.search_accounts(self.user_id, "ma")
+        self.assertEqual([entry.id for entry in results], [account_id])
+
+    async def test_keyset_pagination_walks_all_accounts(self) -> None:
+        names = [f"Site {index:02d}" for index in range(25)] + ["site 05"]
+        for name in names:
+            await self.database.add_account(self.user_id, name, b"r")
+        expected = [entry.id for entry in await self.database.list_accounts(self.user_id)]
+
+        seen = []
+        page = await self.database.list_accounts_page(self.user_id, limit=10)
+        self.assertFalse(page.has_prev)
+        seen.extend(entry.id for entry in page.items)
+        while page.has_next:
+            page = await self.database.list_accounts_page(self.user_id, after=page.last_key, limit=10)
+            seen.extend(entry.id for entry in page.items)
+        self.assertEqual(seen, expected)
+
+        previous = await self.database.list_accounts_page(self.user_id, before=page.first_key, limit=10)
+        self.assertEqual([entry.id for entry in previous.items], expected[10:20])
+        self.assertTrue(previous.has_prev)
+        self.assertTrue(previous.has_next)
+
+    async def test_search_pagination(self) -> None:
+        for index in range(15):
+            await self.database.add_account(self.user_id, f"mail {index:02d}", b"r")
+        await self.database.add_account(self.user_id, "Bank", b"r")
+        first = await self.database.search_accounts_page(self.user_id, "mail", limit=10)
+        self.assertEqual(len(first.items), 10)
+        self.assertTrue(first.has_next)
+        second = await self.database.search_accounts_page(self.user_id, "mail", after=first.last_key, limit=10)
+        self.assertEqual(len(second.items), 5)
+        self.assertFalse(second.has_next)
+
+    async def test_add_accounts_bulk(self) -> None:
+        rows = [(f"Bulk {index}", b"r") for index in range(1200)]
+        inserted = await self.database.add_accounts_bulk(self.user_id, rows)
+        self.assertEqual(inserted, 1200)
+        self.assertEqual(len(await self.database.list_accounts(self.user_id)), 1200)
+        self.assertEqual(await self.database.add_accounts_bulk(self.user_id, []), 0)
+
+    async def test_iter_accounts_streams_in_batches(self) -> None:
+        await self.database.add_accounts_bulk(self.user_id, [(f"Entry {index}", b"r") for index in range(25)])
+        names = [account.name async for account in self.database.iter_accounts(self.user_id, batch_size=4)]
+        self.assertEqual(names, [f"Entry {index}" for index in range(25)])
+
+    async def test_group_commit_batches_concurrent_writes(self) -> None:
+        database = Database(os.path.join(self.temp_dir.name, "group.db"), group_commit=True, group_window=0.05)
+        await database.init()
+        try:
+            await database.ensure_user(self.user_id)
+            ids = await asyncio.gather(
+                *(database.add_account(self.user_id, f"Entry {index}", b"r") for index in range(20))
+            )
+            self.assertEqual(len(set(ids)), 20)
+            self.assertLess(database._group.batches, 20)
+            deleted, missing = await asyncio.gather(
+                database.delete_account(ids[0], self.user_id),
+                database.delete_account(10_000, self.user_id),
+            )
+            self.assertTrue(deleted)
+            self.assertFalse(missing)
+            with self.assertRaises(sqlite3.IntegrityError):
+                await database.add_account(999, "Orphan", b"r")
+            self.assertEqual(len(await database.list_accounts(self.user_id)), 19)
+        finally:
+            await database.close()
+
+    async def test_user_lang_is_cached_and_written_through(self) -> None:
+        self.assertEqual(await self.database.get_user_lang(self.user_id), "en")
+        self.assertEqual(await self.database.get_user_lang(self.user_id), "en")
+        await self.database.set_user_lang(self.user_id, "fa")
+        reads_before = self.database.pool_stats().acquisitions
+        self.assertEqual(await self.database.get_user_lang(self.user_id), "fa")
+        self.assertEqual(self.database.pool_stats().acquisitions, reads_before)
+        stats = self.database.lang_cache_stats()
+        self.assertEqual((stats.hits, stats.misses), (2, 1))
+
+    async def test_ensure_user_is_memoized(self) -> None:
+        acquisitions = self.database.pool_stats().acquisitions
+        await self.database.ensure_user(self.user_id)
+        self.assertEqual(self.database.pool_stats().acquisitions, acquisitions)
+
+    async def test_ensure_user_and_get_lang(self) -> None:
+        new_user = 777
+        self.assertEqual(await self.database.ensure_user_and_get_lang(new_user), "en")
+        await self.database.set_user_lang(new_user, "fa")
+        acquisitions = self.database.pool_stats().acquisitions
+        self.assertEqual(await self.database.ensure_user_and_get_lang(new_user), "fa")
+        self.assertEqual(self.database.pool_stats().acquisitions, acquisitions)
+        await self.database.add_account(new_user, "Email", b"r")
+
+    async def test_summary_cache_invalidated_by_mutations(self) -> None:
+        first = await self.database.add_account(self.user_id, "Alpha", b"r")
+        self.assertEqual([entry.name for entry in await self.database.list_accounts(self.user_id)], ["Alpha"])
+        acquisitions = self.database.pool_stats().acquisitions
+        page = await self.database.list_accounts_page(self.user_id, limit=5)
+        self.assertEqual([entry.id for entry in page.items], [first])
+        self.assertEqual(self.database.pool_stats().acquisitions, acquisitions)
+
+        version = self.database.owner_version(self.user_id)
+        await self.database.add_account(self.user_id, "beta", b"r")
+        self.assertGreater(self.database.owner_version(self.user_id), version)
+        self.assertEqual([entry.name for entry in await self.database.list_accounts(self.user_id)], ["Alpha", "beta"])
+        await self.database.delete_account(first, self.user_id)
+        self.assertEqual([entry.name for entry in await self.database.list_accounts(self.user_id)], ["beta"])
+
+    async def test_oversized_vault_bypasses_summary_cache(self) -> None:
+        database = Database(os.path.join(self.temp_dir.name, "capped.db"), summary_cache_entries=10)
+        await database.init()
+        try:
+            await database.ensure_user(self.user_id)
+            await database.add_accounts_bulk(self.user_id, [(f"Entry {index:02d}", b"r") for index in range(15)])
+            page = await database.list_accounts_page(self.user_id, limit=10)
+            self.assertTrue(page.has_next)
+            self.assertEqual(len(await database.list_accounts(self.user_id)), 15)
+            self.assertEqual(database.summary_cache_stats().size, 0)
+            self.assertEqual(len(database._oversized), 1)
+            await database.add_account(self.user_id, "Entry 15", b"r")
+            self.assertEqual(len(database._oversized), 0)
+        finally:
+            await database.close()
+
+    async def test_profile_applied_to_pooled_connections(self) -> None:
+        database = Database(os.path.join(self.temp_dir.name, "fast.db"), pool_size=2, profile="fast")
+        await database.init()
+        try:
+            synchronous = await database._pool.read(lambda conn: conn.execute("PRAGMA synchronous").fetchone()[0])
+            self.assertEqual(synchronous, 0)
+            busy_timeout = await database._pool.write(lambda conn: conn.execute("PRAGMA busy_timeout").fetchone()[0])
+            self.assertEqual(busy_timeout, 5_000)
+        finally:
+            await database.close()
+        with self.assertRaises(ValueError):
+            Database(self.db_path, profile="reckless")
+
+    async def test_read_meta_accepts_a_relative_path(self) -> None:
+        await self.database.set_meta("kdf", "params")
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(os.path.dirname(self.db_path))
+        self.assertEqual(read_meta(os.path.basename(self.db_path), "kdf"), "params")
+
+    async def test_read_meta_only_treats_a_missing_table_as_unset(self) -> None:
+        self.assertIsNone(read_meta(os.path.join(self.temp_dir.name, "missing.db"), "kdf"))
+        legacy_path = os.path.join(self.temp_dir.name, "legacy.db")
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("CREATE TABLE accounts (id INTEGER PRIMARY KEY)")
+        self.assertIsNone(read_meta(legacy_path, "kdf"))
+        broken_path = os.path.join(self.temp_dir.name, "broken.db")
+        with sqlite3.connect(broken_path) as conn:
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY)")
+        with self.assertRaises(sqlite3.OperationalError):
+            read_meta(broken_path, "kdf")
+
+    async def test_new_databases_use_incremental_auto_vacuum(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+
+    async def test_migration_enables_auto_vacuum_on_existing_file(self) -> None:
+        legacy_path = os.path.join(self.temp_dir.name, "legacy.db")
+        with sqlite3.connect(legacy_path) as conn:
+            conn.executescript(
+                "CREATE TABLE users (telegram_id INTEGER PRIMARY KEY, lang TEXT NOT NULL DEFAULT 'en');"
+            )
+        database = Database(legacy_path)
+        await database.init()
+        await database.close()
+        with sqlite3.connect(legacy_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+
+    async def test_get_accounts_preserves_order_and_ownership(self) -> None:
+        ids = [await self.database.add_account(self.user_id, f"Entry {index}", b"r") for index in range(3)]
+        await self.database.ensure_user(7)
+        foreign = await self.database.add_account(7, "Other", b"r")
+        fetched = await self.database.get_accounts(self.user_id, [ids[2], foreign, ids[0], ids[2], 99999])
+        self.assertEqual([account.id for account in fetched], [ids[2], ids[0]])
+        self.assertEqual(await self.database.get_accounts(self.user_id, []), [])
+
+    async def test_get_accounts_spans_chunks(self) -> None:
+        await self.database.add_accounts_bulk(self.user_id, [(f"Entry {index}", b"r") for index in range(MULTI_GET_CHUNK + 5)])
+        ids = [entry.id for entry in await self.database.list_accounts(self.user_id)]
+        fetched = await self.database.get_accounts(self.user_id, ids)
+        self.assertEqual([account.id for account in fetched], ids)
+
+    async def test_reseal_account_only_replaces_unchanged_rows(self) -> None:
+        account_id = await self.database.add_account(self.user_id, "Alpha", b"old")
+        before = await self.database.get_account(account_id, self.user_id)
+        self.assertTrue(await self.database.reseal_account(account_id, self.user_id, b"old", b"new"))
+        after = await self.database.get_account(account_id, self.user_id)
+        self.assertEqual(after.record, b"new")
+        self.assertEqual(after.updated_at, before.updated_at)
+        # A stale expectation means the row was edited meanwhile.
+        self.assertFalse(await self.database.reseal_account(account_id, self.user_id, b"old", b"newer"))
+        self.assertEqual((await self.database.get_account(account_id, self.user_id)).record, b"new")
+
+    async def test_recent_and_changed_since_use_updated_index(self) -> None:
+        first = await self.database.add_account(self.user_id, "Alpha", b"r")
+        second = await self.database.add_account(self.user_id, "Beta", b"r")
+        account = await self.database.get_account(first, self.user_id)
+        self.assertIsInstance(account.updated_at, int)
+        recent = await self.database.list_recent_accounts(self.user_id, limit=1)
+        self.assertEqual([entry.id for entry in recent], [second])
+
+        checkpoint = epoch_ms()
+        while epoch_ms() == checkpoint:
+            await asyncio.sleep(0.001)
+        await self.database.update_account_record(first, self.user_id, b"r2")
+        changed = await self.database.changed_since(self.user_id, checkpoint)
+        self.assertEqual([entry.id for entry in changed], [first])
+        recent = await self.database.list_recent_accounts(self.user_id)
+        self.assertEqual([entry.id for entry in recent], [first, second])
+
+        with sqlite3.connect(self.db_path) as conn:
+            for sql, params in ((RECENT_ACCOUNTS_SQL, (self.user_id, 20)), (CHANGED_SINCE_SQL, (self.user_id, 0))):
+                plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+                self.assertIn("idx_accounts_owner_updated", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+    async def test_migration_converts_text_timestamps(self) -> None:
+        legacy_path = os.path.join(self.temp_dir.name, "legacy.db")
+        database = Database(legacy_path)
+        await database.init()
+        await database.close()
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("INSERT INTO users (telegram_id) VALUES (1)")
+            conn.execute(
+                "INSERT INTO accounts (owner_id, name, username, password, created_at, updated_at) "
+                "VALUES (1, 'Old', x'00', x'00', '2024-01-02T03:04:05', '2024-01-02T03:04:05')"
+            )
+            conn.execute("PRAGMA user_version=3")
+        database = Database(legacy_path)
+        await database.init()
+        try:
+            account = (await database.list_recent_accounts(1))[0]
+            stored = await database.get_account(account.id, 1)
+            self.assertEqual(stored.updated_at, 1704164645000)
+            self.assertEqual(stored.created_at, 1704164645000)
+        finally:
+            await database.close()
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
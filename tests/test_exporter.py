@@ -0,0 +1,88 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from crypto import EncryptionError
+from exporter import EXPORT_MAGIC, ExportWriter, read_export
+
+
+class ExporterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "vault.clexp")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _write(self, count: int) -> None:
+        with open(self.path, "wb") as fh:
+            writer = ExportWriter(fh, "archive-pass", chunk_size=3, iterations=1_000)
+            for index in range(count):
+                writer.write(f"Site {index}", f"user{index}", f"pässword{index}")
+            writer.close()
+
+    def test_roundtrip_across_chunks(self) -> None:
+        self._write(7)
+        records = list(read_export(self.path, "archive-pass"))
+        self.assertEqual(len(records), 7)
+        self.assertEqual(records[6], {"name": "Site 6", "username": "user6", "password": "pässword6"})
+
+    def test_extra_fields_are_exported(self) -> None:
+        with open(self.path, "wb") as fh:
+            writer = ExportWriter(fh, "archive-pass", iterations=1_000)
+            writer.write("Bank", "alice", "pw", {"url": "https://bank.example"})
+            writer.close()
+        [record] = read_export(self.path, "archive-pass")
+        self.assertEqual(record["extra"], {"url": "https://bank.example"})
+
+    def test_empty_archive(self) -> None:
+        self._write(0)
+        self.assertEqual(list(read_export(self.path, "archive-pass")), [])
+
+    def _chunks(self) -> tuple[bytes, list[bytes]]:
+        with open(self.path, "rb") as fh:
+            data = fh.read()
+        offset = len(EXPORT_MAGIC) + 4
+        offset += 1 + data[offset]
+        header, chunks = data[:offset], []
+        while offset < len(data):
+            (length,) = struct.unpack_from(">I", data, offset)
+            chunks.append(data[offset:offset + 4 + length])
+            offset += 4 + length
+        return header, chunks
+
+    def _rewrite(self, header: bytes, chunks: list[bytes]) -> None:
+        with open(self.path, "wb") as fh:
+            fh.write(header + b"".join(chunks))
+
+    def test_rejects_reordered_chunks(self) -> None:
+        self._write(7)
+        header, chunks = self._chunks()
+        chunks[0], chunks[1] = chunks[1], chunks[0]
+        self._rewrite(header, chunks)
+        with self.assertRaises(EncryptionError):
+            list(read_export(self.path, "archive-pass"))
+
+    def test_rejects_archive_cut_at_chunk_boundary(self) -> None:
+        self._write(7)
+        header, chunks = self._chunks()
+        self._rewrite(header, chunks[:-1])
+        with self.assertRaises(EncryptionError):
+            list(read_export(self.path, "archive-pass"))
+
+    def test_rejects_data_after_final_chunk(self) -> None:
+        self._write(4)
+        header, chunks = self._chunks()
+        self._rewrite(header, chunks + chunks[:1])
+        with self.assertRaises(EncryptionError):
+            list(read_export(self.path, "archive-pass"))
+
+    def test_wrong_password(self) -> None:
+        self._write(1)
+        with self.assertRaises(EncryptionError):
+            list(read_export(self.path, "not-the-pass"))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
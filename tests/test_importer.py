@@ -0,0 +1,46 @@
+import io
+import json
+import unittest
+
+from importer import ImportFormatError, chunked, iter_records
+
+
+class ImporterTests(unittest.TestCase):
+    def test_csv_with_common_headers(self) -> None:
+        data = "Title,Login,Password\nGmail,me@example.com,hunter2\nVPN,,secret\n".encode("utf-8")
+        records = list(iter_records(io.BytesIO(data), "export.csv"))
+        self.assertEqual([record.name for record in records], ["Gmail", "VPN"])
+        self.assertEqual(records[0].username, "me@example.com")
+        self.assertEqual(records[1].username, "")
+        self.assertEqual(records[1].password, "secret")
+
+    def test_bitwarden_json(self) -> None:
+        document = {"items": [{"name": "Bank", "login": {"username": "alice", "password": "pw"}}]}
+        records = list(iter_records(io.BytesIO(json.dumps(document).encode()), "bitwarden.json"))
+        self.assertEqual(len(records), 1)
+        self.assertEqual((records[0].name, records[0].username, records[0].password), ("Bank", "alice", "pw"))
+
+    def test_keepass_style_json(self) -> None:
+        document = [{"title": "Work", "username": "bob", "password": "pw"}]
+        records = list(iter_records(io.BytesIO(json.dumps(document).encode()), "keepass.JSON"))
+        self.assertEqual(records[0].name, "Work")
+
+    def test_rejects_unknown_format(self) -> None:
+        with self.assertRaises(ImportFormatError):
+            iter_records(io.BytesIO(b""), "vault.kdbx")
+        with self.assertRaises(ImportFormatError):
+            list(iter_records(io.BytesIO(b"foo,bar\n1,2\n"), "export.csv"))
+
+    def test_malformed_csv_raises_format_error(self) -> None:
+        with self.assertRaises(ImportFormatError):
+            list(iter_records(io.BytesIO(b"name,password\n\xff\xfe,pw\n"), "export.csv"))
+        oversized = b"name,password\nBank," + b"x" * 200_000 + b"\n"
+        with self.assertRaises(ImportFormatError):
+            list(iter_records(io.BytesIO(oversized), "export.csv"))
+
+    def test_chunked(self) -> None:
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
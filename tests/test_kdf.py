@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from crypto import DEFAULT_KDF, KDF_PBKDF2, KDF_SCRYPT, KdfParams
+from db import Database, read_meta
+from kdf import (
+    KDF_NEXT_META_KEY,
+    MIN_PBKDF2_ITERATIONS,
+    MIN_SCRYPT_N,
+    _apply,
+    calibrate,
+    get_kdf,
+    load_stored_kdf,
+)
+
+
+class CalibrationTests(unittest.TestCase):
+    def test_tiny_target_yields_minimum_costs(self) -> None:
+        results = calibrate(0.001, algorithms=[KDF_PBKDF2, KDF_SCRYPT])
+        self.assertEqual([result.params.algorithm for result in results], [KDF_SCRYPT, KDF_PBKDF2])
+        scrypt, pbkdf2 = (result.params for result in results)
+        self.assertEqual(scrypt.memory_kib, MIN_SCRYPT_N)
+        self.assertEqual(pbkdf2.iterations, MIN_PBKDF2_ITERATIONS)
+        self.assertTrue(all(result.seconds > 0 for result in results))
+
+
+class StoredKdfTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "cryptolocker.db")
+
+    async def asyncTearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    async def test_apply_stores_params_directly_only_while_vault_is_empty(self) -> None:
+        self.assertIsNone(load_stored_kdf(self.db_path))
+        scrypt = KdfParams(KDF_SCRYPT, iterations=1, memory_kib=MIN_SCRYPT_N)
+        await _apply(self.db_path, 1, scrypt)
+        self.assertEqual(load_stored_kdf(self.db_path), scrypt)
+
+        database = Database(self.db_path)
+        await database.init()
+        try:
+            await database.ensure_user(1)
+            await database.add_account(1, "Email", b"r")
+            self.assertEqual(await get_kdf(database), scrypt)
+        finally:
+            await database.close()
+        await _apply(self.db_path, 1, DEFAULT_KDF)
+        # Existing secrets need a rotation: the change is only scheduled.
+        self.assertEqual(load_stored_kdf(self.db_path), scrypt)
+        self.assertEqual(KdfParams.from_json(read_meta(self.db_path, KDF_NEXT_META_KEY)), DEFAULT_KDF)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from db import Database
+from maintenance import CheckpointScheduler, VacuumScheduler
+
+
+class CheckpointSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database = Database(os.path.join(self.temp_dir.name, "cryptolocker.db"))
+        await self.database.init()
+        await self.database.ensure_user(1)
+
+    async def asyncTearDown(self) -> None:
+        await self.database.close()
+        self.temp_dir.cleanup()
+
+    async def test_passive_checkpoint_only_when_idle(self) -> None:
+        scheduler = CheckpointScheduler(self.database, idle_after=3600)
+        await self.database.add_account(1, "Email", b"r")
+        self.assertIsNone(await scheduler.tick())
+        scheduler.idle_after = 0
+        result = await scheduler.tick()
+        self.assertIsNotNone(result)
+        self.assertEqual(scheduler.stats.passive, 1)
+        # Nothing written since the last checkpoint.
+        self.assertIsNone(await scheduler.tick())
+
+    async def test_truncate_when_wal_is_large(self) -> None:
+        scheduler = CheckpointScheduler(self.database, idle_after=3600, truncate_bytes=1)
+        await self.database.add_account(1, "Email", b"r")
+        self.assertGreater(self.database.wal_size(), 0)
+        await scheduler.tick()
+        self.assertEqual(scheduler.stats.truncates, 1)
+        self.assertEqual(self.database.wal_size(), 0)
+
+    async def test_incremental_vacuum_releases_deleted_pages(self) -> None:
+        await self.database.add_accounts_bulk(1, [(f"Entry {index}", b"r" * 1024) for index in range(400)])
+        for account in await self.database.list_accounts(1):
+            await self.database.delete_account(account.id, 1)
+        await self.database.checkpoint("TRUNCATE")
+        free_before = await self.database.freelist_count()
+        self.assertGreater(free_before, 0)
+        scheduler = VacuumScheduler(self.database, idle_after=0, step_pages=16, min_free_pages=1)
+        released = await scheduler.tick()
+        self.assertGreater(released, 0)
+        self.assertEqual(scheduler.stats.free_pages, await self.database.freelist_count())
+        self.assertLess(scheduler.stats.free_pages, free_before)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from crypto import CIPHER_FERNET, EncryptionError, build_context, encrypt
+from db import Account
+from records import (
+    RecordFormatError,
+    SecretRecord,
+    needs_reseal,
+    open_record,
+    open_records,
+    pack_record,
+    seal_record,
+    seal_records,
+    unpack_record,
+)
+
+
+class RecordTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.salt_path = os.path.join(self.temp_dir.name, "salt")
+        with open(self.salt_path, "wb") as fh:
+            fh.write(b"0123456789abcdef")
+        self.context = build_context("test-passphrase", self.salt_path)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _account(self, **fields) -> Account:
+        defaults = dict(id=1, owner_id=1, name="Email", username=b"", password=b"", created_at=0, updated_at=0)
+        defaults.update(fields)
+        return Account(**defaults)
+
+    def test_pack_roundtrip_with_extra_fields(self) -> None:
+        record = SecretRecord("me@example.com", "pässword", {"url": "https://example.com", "recovery": "42"})
+        self.assertEqual(unpack_record(pack_record(record)), record)
+
+    def test_unpack_rejects_unknown_version_and_truncation(self) -> None:
+        data = pack_record(SecretRecord("user", "pass"))
+        with self.assertRaises(RecordFormatError):
+            unpack_record(b"\x7f" + data[1:])
+        with self.assertRaises(RecordFormatError):
+            unpack_record(data[:-1])
+
+    def test_open_sealed_and_legacy_accounts(self) -> None:
+        record = SecretRecord("user", "pass", {"notes": "n"})
+        sealed = self._account(record=seal_record(record, self.context))
+        self.assertEqual(open_record(sealed, self.context), record)
+
+        legacy = self._account(username=encrypt("old-user", self.context), password=encrypt("old-pass", self.context))
+        self.assertEqual(open_record(legacy, self.context), SecretRecord("old-user", "old-pass"))
+
+    def test_needs_reseal_for_legacy_rows_and_other_backends(self) -> None:
+        fernet = build_context("test-passphrase", self.salt_path, backend=CIPHER_FERNET)
+        record = SecretRecord("user", "pass")
+        current = self._account(record=seal_record(record, self.context))
+        older = self._account(record=seal_record(record, fernet))
+        legacy = self._account(username=encrypt("user", fernet), password=encrypt("pass", fernet))
+        self.assertFalse(needs_reseal(current, self.context))
+        self.assertTrue(needs_reseal(older, self.context))
+        self.assertTrue(needs_reseal(legacy, self.context))
+        self.assertEqual(open_record(older, self.context), record)
+
+    def test_seal_and_open_many(self) -> None:
+        records = [SecretRecord(f"user{index}", f"pass{index}") for index in range(150)]
+
+        async def roundtrip() -> list[SecretRecord]:
+            sealed = await seal_records(records, self.context)
+            return await open_records([self._account(id=index, record=blob) for index, blob in enumerate(sealed)], self.context)
+
+        self.assertEqual(asyncio.run(roundtrip()), records)
+
+    def test_tampered_record_is_rejected(self) -> None:
+        blob = bytearray(seal_record(SecretRecord("user", "pass"), self.context))
+        blob[-1] ^= 0x01
+        with self.assertRaises(EncryptionError):
+            open_record(self._account(record=bytes(blob)), self.context)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+
+from crypto import EncryptionError, build_context, decrypt_bytes
+from db import Database
+from records import SecretRecord, open_record, seal_record
+from kdf import KEY_CHECK_META_KEY
+from rotation import ROTATION_META_KEY, KeyRotation, pin_vault, unlock_vault, verify_key
+from sharding import ShardedDatabase
+
+
+class KeyRotationTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "cryptolocker.db")
+        self.salt_path = os.path.join(self.temp_dir.name, "salt")
+        with open(self.salt_path, "wb") as fh:
+            fh.write(b"0123456789abcdef")
+        self.old = build_context("old passphrase", self.salt_path)
+        self.new = build_context("new passphrase", self.salt_path)
+
+    async def asyncTearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    async def _populate(self, database: Database | ShardedDatabase, owners: range, per_owner: int) -> None:
+        for owner_id in owners:
+            await database.ensure_user(owner_id)
+            await database.add_accounts_bulk(
+                owner_id,
+                [(f"Entry {index}", seal_record(SecretRecord(f"user{index}", "pw"), self.old)) for index in range(per_owner)],
+            )
+
+    async def test_rotation_resumes_from_checkpoint_and_retires_old_key(self) -> None:
+        database = Database(self.db_path)
+        await database.init()
+        try:
+            await self._populate(database, range(1, 3), 5)
+            await pin_vault(database, self.old)
+            rotating = replace(self.new, retired=(self.old,))
+            rotation = KeyRotation(database, rotating, batch_size=4, pause=0)
+
+            self.assertEqual(await rotation.step(database), 4)
+            self.assertEqual(json.loads(await database.get_meta(ROTATION_META_KEY)), {"after_id": 4})
+            # Both keys decrypt while the rotation is under way.
+            for account in [await database.get_account(account_id, 1) for account_id in (1, 5)]:
+                self.assertEqual(open_record(account, rotating).password, "pw")
+
+            # A row the bot rewrote meanwhile is already under the new key.
+            await database.update_account_record(6, 2, seal_record(SecretRecord("edited", "pw"), self.new))
+            resumed = KeyRotation(database, rotating, batch_size=4, pause=0)
+            stats = await resumed.run()
+            self.assertTrue(stats.completed)
+            self.assertEqual((stats.scanned, stats.rotated, stats.failed), (6, 5, 0))
+            self.assertIsNone(await database.get_meta(ROTATION_META_KEY))
+
+            for owner_id in (1, 2):
+                for summary in await database.list_accounts(owner_id):
+                    account = await database.get_account(summary.id, owner_id)
+                    with self.assertRaises(EncryptionError):
+                        decrypt_bytes(account.record, self.old)
+                    open_record(account, self.new)
+        finally:
+            await database.close()
+        # The key check now opens with the new key alone.
+        self.assertEqual(unlock_vault(self.db_path, "new passphrase", self.salt_path).context.retired, ())
+
+    async def test_pin_vault_refuses_a_key_that_opens_no_stored_record(self) -> None:
+        database = Database(self.db_path)
+        await database.init()
+        try:
+            await self._populate(database, range(1, 2), 3)
+            with self.assertRaises(EncryptionError):
+                await pin_vault(database, self.new)
+            with self.assertRaises(EncryptionError):
+                await verify_key(database, replace(self.new, retired=(self.old,)))
+            self.assertIsNone(await database.get_meta(KEY_CHECK_META_KEY))
+            await pin_vault(database, self.old)
+            self.assertIsNotNone(await database.get_meta(KEY_CHECK_META_KEY))
+        finally:
+            await database.close()
+
+    async def test_sharded_rotation_checkpoints_each_shard(self) -> None:
+        database = ShardedDatabase(self.db_path, shards=2)
+        await database.init()
+        try:
+            await self._populate(database, range(1, 9), 3)
+            await pin_vault(database, self.old)
+            stats = await KeyRotation(database, replace(self.new, retired=(self.old,)), batch_size=2, pause=0).run()
+            self.assertEqual(stats.rotated, 24)
+            for shard in database.shards:
+                self.assertIsNone(await shard.get_meta(ROTATION_META_KEY))
+            for owner_id in range(1, 9):
+                async for account in database.iter_accounts(owner_id):
+                    self.assertEqual(open_record(account, self.new).password, "pw")
+        finally:
+            await database.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+from db import Database
+from sharding import HashRing, ShardedDatabase, shard_paths
+
+
+class HashRingTests(unittest.TestCase):
+    def test_adding_a_shard_moves_a_minority_of_keys(self) -> None:
+        before = HashRing(4)
+        after = HashRing(5)
+        keys = range(10_000)
+        moved = sum(before.shard_for(key) != after.shard_for(key) for key in keys)
+        self.assertLess(moved, 3_000)
+        self.assertEqual({before.shard_for(key) for key in keys}, {0, 1, 2, 3})
+
+
+class ShardedDatabaseTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "cryptolocker.db")
+
+    async def asyncTearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    async def _populate(self, database: ShardedDatabase, owners: range) -> None:
+        for owner_id in owners:
+            await database.ensure_user(owner_id)
+            await database.add_account(owner_id, f"Entry {owner_id}", b"r")
+
+    async def test_routes_owners_and_rebalances_after_growth(self) -> None:
+        database = ShardedDatabase(self.db_path, shards=2)
+        await database.init()
+        await self._populate(database, range(1, 41))
+        await database.set_user_lang(7, "fa")
+        self.assertEqual(len(await database.shards[0].list_owner_ids()) + len(await database.shards[1].list_owner_ids()), 40)
+        await database.close()
+
+        grown = ShardedDatabase(self.db_path, shards=3)
+        await grown.init()
+        try:
+            pinned = dict(grown._overrides)
+            self.assertTrue(pinned)
+            for owner_id in range(1, 41):
+                self.assertEqual([entry.name for entry in await grown.list_accounts(owner_id)], [f"Entry {owner_id}"])
+            moved = await grown.rebalance()
+            self.assertEqual(set(moved), set(pinned))
+            self.assertEqual(grown._overrides, {})
+            for owner_id in range(1, 41):
+                self.assertEqual(grown.shard_index(owner_id), grown.ring.shard_for(owner_id))
+                self.assertEqual(len(await grown.list_accounts(owner_id)), 1)
+            self.assertEqual(await grown.get_user_lang(7), "fa")
+        finally:
+            await grown.close()
+
+    async def test_move_owner_and_reopen(self) -> None:
+        database = ShardedDatabase(self.db_path, shards=2)
+        await database.init()
+        await self._populate(database, range(1, 3))
+        target = 1 - database.shard_index(1)
+        self.assertEqual(await database.move_owner(1, target), 1)
+        await database.close()
+
+        reopened = ShardedDatabase(self.db_path, shards=2)
+        await reopened.init()
+        try:
+            self.assertEqual(reopened.shard_index(1), target)
+            self.assertEqual(len(await reopened.list_accounts(1)), 1)
+        finally:
+            await reopened.close()
+
+    async def test_adopts_unsharded_database_as_first_shard(self) -> None:
+        legacy = Database(self.db_path)
+        await legacy.init()
+        for owner_id in range(1, 21):
+            await legacy.ensure_user(owner_id)
+            await legacy.add_account(owner_id, f"Entry {owner_id}", b"r")
+        await legacy.set_meta("kdf", "params")
+        await legacy.close()
+
+        database = ShardedDatabase(self.db_path, shards=3)
+        await database.init()
+        try:
+            self.assertFalse(os.path.exists(self.db_path))
+            self.assertTrue(shard_paths(self.db_path, 3)[0].exists())
+            self.assertEqual(await database.get_meta("kdf"), "params")
+            for owner_id in range(1, 21):
+                self.assertEqual(database.shard_index(owner_id), 0)
+                self.assertEqual([entry.name for entry in await database.list_accounts(owner_id)], [f"Entry {owner_id}"])
+            await database.rebalance()
+            self.assertEqual(database._overrides, {})
+            self.assertEqual(len(await database.list_owner_ids()), 20)
+        finally:
+            await database.close()
+
+    async def test_refuses_unsharded_database_next_to_shards(self) -> None:
+        database = ShardedDatabase(self.db_path, shards=2)
+        await database.init()
+        await database.close()
+        legacy = Database(self.db_path)
+        await legacy.init()
+        await legacy.close()
+        with self.assertRaises(RuntimeError):
+            await ShardedDatabase(self.db_path, shards=2).init()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
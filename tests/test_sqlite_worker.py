@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from sqlite_worker import SQLiteWorker, is_busy_error
+
+
+def _no_busy_wait(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA busy_timeout=0")
+
+
+def _insert(conn: sqlite3.Connection, value: int) -> int:
+    cursor = conn.execute("INSERT INTO items (value) VALUES (?)", (value,))
+    conn.commit()
+    return cursor.lastrowid
+
+
+class SQLiteWorkerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "worker.db")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)")
+        self.worker = SQLiteWorker(self.db_path, setup=_no_busy_wait, busy_backoff=0.005)
+        await self.worker.start()
+
+    async def asyncTearDown(self) -> None:
+        await self.worker.close()
+        self.temp_dir.cleanup()
+
+    async def test_runs_operations_on_one_thread(self) -> None:
+        names = await asyncio.gather(*(self.worker.run(lambda _conn: threading.current_thread().name) for _ in range(5)))
+        self.assertEqual(set(names), {"sqlite-worker"})
+        self.assertEqual(await self.worker.run(_insert, 7), 1)
+
+    async def test_retries_busy_database(self) -> None:
+        blocker = sqlite3.connect(self.db_path, isolation_level=None)
+        blocker.execute("BEGIN EXCLUSIVE")
+        asyncio.get_running_loop().call_later(0.03, blocker.rollback)
+        try:
+            self.assertEqual(await self.worker.run(_insert, 1), 1)
+        finally:
+            blocker.close()
+        self.assertGreater(self.worker.retries, 0)
+
+    async def test_failed_operation_is_rolled_back(self) -> None:
+        def insert_then_fail(conn: sqlite3.Connection) -> None:
+            conn.execute("INSERT INTO items (value) VALUES (1)")
+            conn.execute("INSERT INTO items (value) VALUES (NULL)")
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            await self.worker.run(insert_then_fail)
+        count = await self.worker.run(lambda conn: conn.execute("SELECT COUNT(*) FROM items").fetchone()[0])
+        self.assertEqual(count, 0)
+        self.assertEqual(self.worker.retries, 0)
+
+    def test_is_busy_error(self) -> None:
+        self.assertTrue(is_busy_error(sqlite3.OperationalError("database is locked")))
+        self.assertFalse(is_busy_error(sqlite3.OperationalError("no such table: items")))
+        self.assertFalse(is_busy_error(ValueError("database is locked")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from bot import prepare_runtime, run_bot, shutdown_runtime
+from crypto import DEFAULT_KDF, KDF_SCRYPT, EncryptionError, KdfParams, build_context
+from db import Database, read_meta
+from kdf import KDF_NEXT_META_KEY, load_stored_kdf
+from records import SecretRecord, open_record, seal_record
+
+
+class _Application:
+    def __init__(self, runtime) -> None:
+        self.bot_data = {"runtime": runtime}
+
+
+class _FailingApplication:
+    async def initialize(self) -> None:
+        raise ConnectionError("Bot API unreachable")
+
+
+class StartupTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "cryptolocker.db")
+        self.salt_path = os.path.join(self.temp_dir.name, "salt")
+        with open(self.salt_path, "wb") as fh:
+            fh.write(b"0123456789abcdef")
+
+    async def asyncTearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    async def test_prepare_runtime_times_each_phase(self) -> None:
+        timings: dict[str, float] = {}
+        runtime = await prepare_runtime(self.db_path, self.salt_path, "passphrase", 1, timings=timings)
+        try:
+            self.assertEqual(set(timings), {"key derivation", "database"})
+            self.assertIsNotNone(runtime.encryption.key)
+            await runtime.db.ensure_user(1)
+        finally:
+            await shutdown_runtime(_Application(runtime))
+
+    async def test_prepare_runtime_pins_key_and_rotates_to_pending_kdf(self) -> None:
+        runtime = await prepare_runtime(self.db_path, self.salt_path, "passphrase", 1)
+        await runtime.db.ensure_user(1)
+        account_id = await runtime.db.add_account(1, "Email", seal_record(SecretRecord("u", "p"), runtime.encryption))
+        self.assertIsNone(runtime.rotation)
+        await shutdown_runtime(_Application(runtime))
+        self.assertEqual(load_stored_kdf(self.db_path), DEFAULT_KDF)
+
+        scrypt = KdfParams(KDF_SCRYPT, iterations=1, memory_kib=1024)
+        database = Database(self.db_path)
+        await database.init()
+        await database.set_meta(KDF_NEXT_META_KEY, scrypt.to_json())
+        await database.close()
+        runtime = await prepare_runtime(self.db_path, self.salt_path, "passphrase", 1)
+        try:
+            self.assertEqual(runtime.encryption.kdf, scrypt)
+            self.assertIsNotNone(runtime.rotation)
+            while not runtime.rotation.stats.completed:
+                await asyncio.sleep(0.01)
+            self.assertEqual(runtime.encryption.retired, ())
+            account = await runtime.db.get_account(account_id, 1)
+            self.assertEqual(open_record(account, runtime.encryption), SecretRecord("u", "p"))
+        finally:
+            await shutdown_runtime(_Application(runtime))
+        self.assertEqual(load_stored_kdf(self.db_path), scrypt)
+
+    async def test_prepare_runtime_rejects_wrong_passphrase(self) -> None:
+        runtime = await prepare_runtime(self.db_path, self.salt_path, "passphrase", 1)
+        await shutdown_runtime(_Application(runtime))
+        with self.assertRaises(EncryptionError):
+            await prepare_runtime(self.db_path, self.salt_path, "not the passphrase", 1)
+        with mock.patch.dict(os.environ, {"PREVIOUS_ENCRYPTION_PASSPHRASE": "passphrase"}):
+            runtime = await prepare_runtime(self.db_path, self.salt_path, "new passphrase", 1)
+        try:
+            self.assertTrue(runtime.encryption.retired)
+        finally:
+            await shutdown_runtime(_Application(runtime))
+
+    async def test_prepare_runtime_refuses_to_pin_a_key_that_opens_no_record(self) -> None:
+        # A vault written before key checks existed has records but no check.
+        database = Database(self.db_path)
+        await database.init()
+        await database.ensure_user(1)
+        await database.add_account(1, "Email", seal_record(SecretRecord("u", "p"), build_context("passphrase", self.salt_path)))
+        await database.close()
+        with self.assertRaises(EncryptionError):
+            await prepare_runtime(self.db_path, self.salt_path, "not the passphrase", 1)
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith("sqlite-")])
+        runtime = await prepare_runtime(self.db_path, self.salt_path, "passphrase", 1)
+        await shutdown_runtime(_Application(runtime))
+
+    async def test_prepare_runtime_rotates_an_unpinned_vault_to_pending_kdf(self) -> None:
+        database = Database(self.db_path)
+        await database.init()
+        await database.ensure_user(1)
+        account_id = await database.add_account(
+            1, "Email", seal_record(SecretRecord("u", "p"), build_context("passphrase", self.salt_path))
+        )
+        scrypt = KdfParams(KDF_SCRYPT, iterations=1, memory_kib=1024)
+        await database.set_meta(KDF_NEXT_META_KEY, scrypt.to_json())
+        await database.close()
+        runtime = await prepare_runtime(self.db_path, self.salt_path, "passphrase", 1)
+        try:
+            self.assertEqual(runtime.encryption.kdf, scrypt)
+            self.assertIsNotNone(runtime.rotation)
+            while not runtime.rotation.stats.completed:
+                await asyncio.sleep(0.01)
+            self.assertEqual(runtime.rotation.stats.rotated, 1)
+            account = await runtime.db.get_account(account_id, 1)
+            self.assertEqual(open_record(account, runtime.encryption), SecretRecord("u", "p"))
+        finally:
+            await shutdown_runtime(_Application(runtime))
+        self.assertEqual(load_stored_kdf(self.db_path), scrypt)
+        self.assertIsNone(read_meta(self.db_path, KDF_NEXT_META_KEY))
+
+    async def test_prepare_runtime_adopts_unsharded_vault(self) -> None:
+        runtime = await prepare_runtime(self.db_path, self.salt_path, "passphrase", 1)
+        await runtime.db.ensure_user(1)
+        account_id = await runtime.db.add_account(1, "Email", seal_record(SecretRecord("u", "p"), runtime.encryption))
+        await shutdown_runtime(_Application(runtime))
+        with mock.patch.dict(os.environ, {"DB_SHARDS": "3"}):
+            with self.assertRaises(EncryptionError):
+                await prepare_runtime(self.db_path, self.salt_path, "not the passphrase", 1)
+            runtime = await prepare_runtime(self.db_path, self.salt_path, "passphrase", 1)
+        try:
+            account = await runtime.db.get_account(account_id, 1)
+            self.assertEqual(open_record(account, runtime.encryption), SecretRecord("u", "p"))
+        finally:
+            await shutdown_runtime(_Application(runtime))
+
+    async def test_prepare_runtime_closes_database_when_key_derivation_fails(self) -> None:
+        with self.assertRaises(EncryptionError):
+            await prepare_runtime(self.db_path, os.path.join(self.temp_dir.name, "missing"), "passphrase", 1)
+        # The pool's worker threads were shut down again.
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith("sqlite-")])
+
+    async def test_prepare_runtime_closes_database_when_a_later_step_fails(self) -> None:
+        backup_dir = os.path.join(self.temp_dir.name, "backups")
+        with mock.patch.dict(os.environ, {"BACKUP_DIR": backup_dir}), mock.patch(
+            "bot.BackupManager.start", side_effect=OSError("backup directory is read-only")
+        ):
+            with self.assertRaises(OSError):
+                await prepare_runtime(self.db_path, self.salt_path, "passphrase", 1)
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith("sqlite-")])
+
+    async def test_run_bot_stops_background_tasks_when_initialize_fails(self) -> None:
+        with self.assertRaises(ConnectionError):
+            await run_bot(_FailingApplication(), self.db_path, self.salt_path, "passphrase", 1)
+        self.assertEqual(asyncio.all_tasks() - {asyncio.current_task()}, set())
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith("sqlite-")])
+
+
+if __name__ == "__main__":
+    unittest.main()